@@ -12,6 +12,7 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
+import bpy
 from bpy.utils import register_class, unregister_class
 from bpy.types import Scene
 from bpy.props import PointerProperty
@@ -19,9 +20,15 @@ from bpy.props import PointerProperty
 
 # necessary to import modules so they can get registered
 from . import properties, utils, panels, operators
-from .utils.utils import classes_to_register
+from .utils.utils import classes_to_register, init_user_dir
 from .properties.properties import RendergateProperties
-from .utils.async_loop import setup_asyncio_executor
+from .utils.async_loop import setup_asyncio_executor, erase_async_loop
+from .utils.rest_client import close_client
+from .utils import tasks
+from .data.job_cache import restore_jobs_handler, restore_jobs_timer
+from .data.job_poll import stop_polling
+from .data.job_events import stop_events
+from .utils.auth import restore_session_timer
 
 bl_info = {
     "name": "Rendergate",
@@ -42,16 +49,37 @@ def register() -> None:
     """Initialize addon by registering its classes."""
 
     setup_asyncio_executor()
+    # the addon data is read and written in the background thread
+    init_user_dir()
 
     for c in classes_to_register:
         register_class(c)
 
     Scene.rendergate_properties = PointerProperty(type=RendergateProperties)
 
+    # show the cached jobs right away, until they are fetched from rendergate.ch
+    bpy.app.handlers.load_post.append(restore_jobs_handler)
+    bpy.app.timers.register(restore_jobs_timer, first_interval=0.1)
+    # log in with the saved login, without the password
+    bpy.app.timers.register(restore_session_timer, first_interval=0.1)
+
 
 def unregister() -> None:
     """Unregister addon classes."""
 
+    stop_events()
+    stop_polling()
+    close_client()
+    erase_async_loop()
+    tasks.clear_tasks()
+
+    if restore_jobs_handler in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(restore_jobs_handler)
+    if bpy.app.timers.is_registered(restore_jobs_timer):
+        bpy.app.timers.unregister(restore_jobs_timer)
+    if bpy.app.timers.is_registered(restore_session_timer):
+        bpy.app.timers.unregister(restore_session_timer)
+
     del Scene.rendergate_properties
     for c in reversed(classes_to_register):
         if c.is_registered:
@@ -0,0 +1,145 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Download render jobs in the background as soon as they finished rendering,
+if enabled in the preferences.
+
+Only jobs that were seen in a stage before FINISHED get downloaded,
+not the jobs that were already done, e.g. when the job list is received the first time.
+"""
+
+
+import bpy
+import asyncio
+import concurrent.futures
+from ..utils import async_loop, download, tasks
+from ..utils.tasks import Task
+from ..utils.models import Job
+from ..utils.enums import Stage
+from ..utils.utils import is_string_blank, redraw_areas
+from ..utils.global_vars import rendergate_logger
+from . import jobs, job_poll, session
+
+# how many jobs get downloaded at the same time, the others wait
+MAX_DOWNLOADS: int = 2
+
+# the last seen stage of the jobs by job id, to notice when a job finished
+_stages: dict[str, Stage] = {}
+# the version of the jobs when they were last checked
+_version: int = -1
+# limits the downloads that run at the same time, created in the background loop,
+# a new loop gets new slots, the old ones are bound to the old loop once waited for
+_download_slots: asyncio.Semaphore | None = None
+_download_slots_loop: asyncio.AbstractEventLoop | None = None
+
+
+def check_jobs() -> None:
+    """
+    Download the jobs that finished since the last check, if enabled.
+    Must be called in the main thread, after the jobs changed.
+    """
+
+    global _stages, _version
+
+    if jobs.get_version() == _version:
+        return
+    _version = jobs.get_version()
+
+    finished_jobs: list[Job] = []
+    stages: dict[str, Stage] = {}
+    for job in jobs.get_jobs():
+        last_stage: Stage | None = _stages.get(job.identifier)
+        if job.stage == Stage.FINISHED and last_stage in job_poll.POLLED_STAGES:
+            finished_jobs.append(job)
+        stages[job.identifier] = job.stage
+    _stages = stages
+
+    if not finished_jobs:
+        return
+
+    from ..properties.preferences import get_preferences
+
+    scene = getattr(bpy.context, "scene", None)
+    if (
+        scene is None
+        or not get_preferences().auto_download
+        or not session.is_logged_in()
+        or not bpy.app.online_access
+    ):
+        return
+
+    props = scene.rendergate_properties
+    if is_string_blank(props.download_folder):
+        rendergate_logger.warning(
+            "Finished jobs not downloaded, no download folder specified."
+        )
+        return
+
+    for job in finished_jobs:
+        _start_download(job, props.rendergate_api_url, props.download_folder)
+
+
+def _start_download(job: Job, api_url: str, download_folder: str) -> None:
+    """Download a job in the background, unless it's already downloading."""
+
+    task: Task = Task(
+        resource=tasks.download_resource(job.identifier),
+        label=f"Downloading {job.name}",
+        job_id=job.identifier,
+        progress_text="Waiting to download...",
+    )
+    if not tasks.start_task(task):
+        return
+
+    rendergate_logger.info(f"Job {job.name} finished, downloading it.")
+    future: concurrent.futures.Future = async_loop.submit(
+        _download(task, job, api_url, download_folder)
+    )
+    future.add_done_callback(lambda _: tasks.finish_task(task))
+
+
+def _get_download_slots() -> asyncio.Semaphore:
+    """The download slots of the running loop. Must be called in the background loop."""
+
+    global _download_slots, _download_slots_loop
+
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    if _download_slots is None or _download_slots_loop is not loop:
+        _download_slots = asyncio.Semaphore(MAX_DOWNLOADS)
+        _download_slots_loop = loop
+
+    return _download_slots
+
+
+async def _download(task: Task, job: Job, api_url: str, download_folder: str) -> None:
+    """Download a job, when it's its turn."""
+
+    try:
+        async with _get_download_slots():
+            report_type, message = await download.download_job(
+                task, None, job, api_url, download_folder
+            )
+    except Exception:
+        rendergate_logger.exception(f"Could not download job {job.name}")
+    else:
+        if "INFO" in report_type:
+            rendergate_logger.info(f"{job.name}: {message}")
+        else:
+            rendergate_logger.warning(f"{job.name}: {message}")
+    finally:
+        # the task is done, show the download button again, without waiting
+        # for the main thread, that may be stopping the loop
+        tasks.finish_task(task)
+        async_loop.call_in_main_thread(redraw_areas)
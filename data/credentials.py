@@ -0,0 +1,144 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+"""
+Saved login of the user, outside of the blend-file,
+so Blender can log in again on start with a cheap token refresh
+instead of the username and password.
+
+Only the username and the Cognito refresh token are saved, never the password.
+The file is only readable by the user. On Windows the refresh token
+can also be encrypted with the Windows account of the user (DPAPI).
+"""
+
+
+import os
+import sys
+import json
+import base64
+import ctypes
+import traceback
+from typing import Any
+from ..utils.utils import get_user_data_dir, is_string_blank
+from ..utils.global_vars import rendergate_logger
+
+# how the refresh token is protected in the file
+PLAIN: str = "plain"
+DPAPI: str = "dpapi"
+
+
+def _credentials_path() -> str:
+    """The path of the credentials file."""
+
+    data_dir: str = get_user_data_dir("credentials")
+    if os.name == "posix":
+        os.chmod(data_dir, 0o700)
+    return os.path.join(data_dir, "session.json")
+
+
+def can_encrypt() -> bool:
+    """If the refresh token can be encrypted on this platform."""
+
+    return sys.platform == "win32"
+
+
+class _DataBlob(ctypes.Structure):
+    _fields_ = [
+        ("cbData", ctypes.c_uint32),
+        ("pbData", ctypes.POINTER(ctypes.c_char)),
+    ]
+
+
+def _dpapi(data: bytes, protect: bool) -> bytes:
+    """Encrypt or decrypt data with the Windows account of the user."""
+
+    crypt32 = ctypes.windll.crypt32
+    kernel32 = ctypes.windll.kernel32
+
+    buffer = ctypes.create_string_buffer(data, len(data))
+    blob_in: _DataBlob = _DataBlob(len(data), buffer)
+    blob_out: _DataBlob = _DataBlob()
+
+    function = crypt32.CryptProtectData if protect else crypt32.CryptUnprotectData
+    # 0x01: CRYPTPROTECT_UI_FORBIDDEN
+    if not function(
+        ctypes.byref(blob_in), None, None, None, None, 0x01, ctypes.byref(blob_out)
+    ):
+        raise ctypes.WinError()
+
+    try:
+        return ctypes.string_at(blob_out.pbData, blob_out.cbData)
+    finally:
+        kernel32.LocalFree(blob_out.pbData)
+
+
+def save_credentials(username: str, refresh_token: str, encrypt: bool = True) -> None:
+    """Save the login, encrypted if possible and wanted."""
+
+    if is_string_blank(username) or is_string_blank(refresh_token):
+        return
+
+    protection: str = DPAPI if encrypt and can_encrypt() else PLAIN
+    token: bytes = refresh_token.encode("utf-8")
+    if protection == DPAPI:
+        token = _dpapi(token, protect=True)
+
+    credentials: dict[str, str] = {
+        "username": username,
+        "protection": protection,
+        "refresh_token": base64.b64encode(token).decode("ascii"),
+    }
+
+    try:
+        path: str = _credentials_path()
+        temp_path: str = f"{path}.tmp"
+        # create the file only readable by the user, before anything is written
+        fd: int = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(credentials, f)
+        if os.name == "posix":
+            os.chmod(temp_path, 0o600)
+        # replace atomically, so a crash never leaves half written credentials
+        os.replace(temp_path, path)
+    except Exception:
+        rendergate_logger.error(traceback.format_exc())
+
+
+def load_credentials() -> tuple[str, str] | None:
+    """The saved username and refresh token, None if there are none."""
+
+    try:
+        with open(_credentials_path(), "r", encoding="utf-8") as f:
+            credentials: dict[str, Any] = json.load(f)
+        token: bytes = base64.b64decode(credentials["refresh_token"])
+        if credentials.get("protection") == DPAPI:
+            token = _dpapi(token, protect=False)
+        return credentials["username"], token.decode("utf-8")
+    except FileNotFoundError:
+        return None
+    except Exception:
+        rendergate_logger.error(traceback.format_exc())
+        return None
+
+
+def delete_credentials() -> None:
+    """Forget the saved login."""
+
+    try:
+        os.remove(_credentials_path())
+    except FileNotFoundError:
+        pass
+    except Exception:
+        rendergate_logger.error(traceback.format_exc())
@@ -0,0 +1,161 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Persistent cache of the render jobs of an account,
+so the job list can be shown right away after Blender starts,
+before the jobs are fetched from rendergate.ch.
+"""
+
+
+import os
+import bpy
+import json
+import hashlib
+import traceback
+from typing import Any
+from bpy.app.handlers import persistent
+from ..utils.utils import get_user_data_dir, is_string_blank
+from ..utils.global_vars import rendergate_logger
+from . import jobs, job_sync, session
+
+
+def _cache_path(account: str) -> str:
+    """The path of the cache file of an account."""
+
+    key: str = hashlib.sha1(account.strip().lower().encode("utf-8")).hexdigest()
+    return os.path.join(get_user_data_dir("jobs"), f"{key}.json")
+
+
+def save_job_cache(account: str, state: dict[str, Any]) -> None:
+    """
+    Save the job data as received from rendergate.ch and the sync state,
+    a snapshot of `job_sync.get_state` taken in the main thread.
+    """
+
+    if is_string_blank(account):
+        return
+
+    cache_path: str = _cache_path(account)
+    temp_path: str = f"{cache_path}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, separators=(",", ":"))
+        # replace atomically, so a crash never leaves a half written cache
+        os.replace(temp_path, cache_path)
+    except Exception:
+        rendergate_logger.error(traceback.format_exc())
+
+
+def load_job_cache(account: str) -> dict[str, Any]:
+    """Load the cached job data and sync state of an account."""
+
+    if is_string_blank(account):
+        return {}
+
+    try:
+        with open(_cache_path(account), "r", encoding="utf-8") as f:
+            state: dict[str, Any] | list = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception:
+        rendergate_logger.error(traceback.format_exc())
+        return {}
+
+    # cache of an older version, only the list of jobs
+    if isinstance(state, list):
+        return {"jobs": state}
+
+    return state if isinstance(state, dict) else {}
+
+
+def restore_jobs(account: str) -> bool:
+    """
+    Fill the job list from the cache, if it's still empty.
+    Must be called in the main thread.
+
+    Returns:
+        If jobs were restored.
+    """
+
+    if jobs.get_jobs():
+        return False
+
+    try:
+        restored: bool = job_sync.load_state(account, load_job_cache(account))
+    except Exception:
+        rendergate_logger.error(traceback.format_exc())
+        return False
+
+    if restored:
+        rendergate_logger.info(f"Restored {len(jobs.get_jobs())} jobs from cache.")
+
+    return restored
+
+
+def restore_jobs_of_scene() -> None:
+    """Restore the jobs of the account of the current scene from the cache."""
+
+    from ..properties.properties import RendergateProperties
+
+    scene = getattr(bpy.context, "scene", None)
+    if scene is None:
+        return
+
+    props: RendergateProperties = scene.rendergate_properties
+    # the session outlives the blend-file, the scene may belong to another account
+    username: str = session.get_username() or props.username
+    restore_jobs(username)
+    # remember the stages of the cached jobs,
+    # to download the jobs that finished while Blender was closed
+    from .auto_download import check_jobs
+
+    check_jobs()
+    if session.is_logged_in():
+        # reconcile the cached jobs with rendergate.ch in the background
+        _refresh_jobs()
+
+
+def _refresh_jobs() -> None:
+    """Get the jobs from rendergate.ch, if the Rendergate panel can be shown."""
+
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type != "PROPERTIES":
+                continue
+            # show that we're logged in
+            area.tag_redraw()
+            with bpy.context.temp_override(window=window, area=area):
+                if bpy.ops.rendergate.get_jobs.poll():
+                    bpy.ops.rendergate.get_jobs("INVOKE_DEFAULT")
+            return
+
+
+def restore_jobs_timer() -> None:
+    """
+    Timer to restore the jobs after the addon got registered,
+    because the scene isn't available during registration.
+    """
+
+    restore_jobs_of_scene()
+    # don't repeat
+    return None
+
+
+@persistent
+def restore_jobs_handler(*args) -> None:
+    """Restore the jobs after a blend-file got loaded."""
+
+    # wait until the window of the loaded file is ready
+    bpy.app.timers.register(restore_jobs_timer, first_interval=0.1)
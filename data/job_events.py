@@ -0,0 +1,322 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Changes of the render jobs pushed by rendergate.ch, with Server-Sent Events.
+
+While the event stream is connected, the jobs don't need to be polled.
+Every event is a change of a single job, fields that are left out keep their value:
+    id: 42
+    event: job
+    data: {"id": "...", "stage": "RENDERING", "progress": "50%"}
+
+When the connection drops, it reconnects with backoff and the Last-Event-ID,
+so rendergate.ch can send the events that were missed.
+Until then, or if rendergate.ch doesn't support pushing, the jobs get polled.
+"""
+
+
+import bpy
+import json
+import asyncio
+import concurrent.futures
+from typing import Any, TYPE_CHECKING
+from ..utils import async_loop, rest_client, auth
+from ..utils.retry import RetryPolicy
+from ..utils.models import Job
+from ..utils.utils import redraw_areas
+from ..utils.global_vars import rendergate_logger
+from . import jobs, job_sync, job_cache, job_poll, auto_download, session
+
+# only for type hints, httpx is imported on first use
+if TYPE_CHECKING:
+    from httpx import Response
+
+# wait between reconnecting with exponential backoff
+RECONNECT: RetryPolicy = RetryPolicy(base_delay=1.0, max_delay=60.0)
+# seconds without any data until the connection counts as dropped,
+# rendergate.ch sends comments to keep the connection alive in between
+READ_TIMEOUT: float = 90.0
+# seconds until trying again if rendergate.ch doesn't support pushing
+PUSH_RETRY_INTERVAL: float = 600.0
+# statuses that always mean rendergate.ch doesn't support pushing,
+# the other errors of the request (4xx) that retrying doesn't fix
+# are handled in _is_unsupported
+UNSUPPORTED_STATUSES: frozenset[int] = frozenset({501})
+# seconds between checking for changes to redraw, in the main thread
+EVENTS_TIMER_INTERVAL: float = 0.5
+
+# the event stream running in the background loop
+_listen_future: concurrent.futures.Future | None = None
+# if the event stream is connected, set in the background loop
+_connected: bool = False
+# the id of the last event, to get the missed events after reconnecting
+_last_event_id: str | None = None
+# seconds to wait before reconnecting, as asked for by rendergate.ch
+_retry: float | None = None
+# the connection state and job version the main thread knows about
+_was_connected: bool = False
+_seen_version: int = -1
+
+
+def is_connected() -> bool:
+    """If the changes of the jobs get pushed right now."""
+
+    return _connected
+
+
+def start_events() -> None:
+    """
+    Receive the changes of the jobs, if not already.
+    Must be called in the main thread.
+    """
+
+    global _listen_future
+
+    if not session.is_logged_in() or not bpy.app.online_access:
+        return
+    if _listen_future is not None and not _listen_future.done():
+        return
+
+    scene = getattr(bpy.context, "scene", None)
+    if scene is None:
+        return
+    api_url: str = scene.rendergate_properties.rendergate_api_url
+
+    # not an operator task, so it doesn't keep the main thread queue busy
+    _listen_future = asyncio.run_coroutine_threadsafe(
+        _listen(api_url), async_loop.get_loop()
+    )
+    if not bpy.app.timers.is_registered(_events_timer):
+        bpy.app.timers.register(_events_timer, first_interval=EVENTS_TIMER_INTERVAL)
+
+
+def stop_events() -> None:
+    """
+    Close the event stream, and poll the jobs instead.
+    Must be called in the main thread.
+    """
+
+    global _listen_future, _connected, _last_event_id, _retry, _was_connected
+
+    if bpy.app.timers.is_registered(_events_timer):
+        bpy.app.timers.unregister(_events_timer)
+    if _listen_future is not None:
+        _listen_future.cancel()
+        _listen_future = None
+
+    _connected = False
+    _last_event_id = None
+    _retry = None
+    if _was_connected:
+        _was_connected = False
+        job_poll.resume_polling()
+
+
+def _events_timer() -> float | None:
+    """
+    Timer that applies the received events, polls instead while the event stream
+    isn't connected, and redraws when the jobs changed.
+    """
+
+    global _was_connected, _seen_version
+
+    if not session.is_logged_in() or _listen_future is None or _listen_future.done():
+        stop_events()
+        return None
+
+    # apply the received events, the stream isn't a task that keeps them drained
+    async_loop.execute_queued_calls()
+
+    if _connected != _was_connected:
+        _was_connected = _connected
+        if _connected:
+            job_poll.pause_polling()
+        else:
+            job_poll.resume_polling()
+
+    if jobs.get_version() != _seen_version:
+        _seen_version = jobs.get_version()
+        auto_download.check_jobs()
+        redraw_areas()
+
+    return EVENTS_TIMER_INTERVAL
+
+
+async def _listen(api_url: str) -> None:
+    """Keep the event stream connected while logged in."""
+
+    attempt: int = 0
+
+    while session.is_logged_in():
+        was_connected: bool = False
+        try:
+            supported: bool = await _stream(api_url)
+        except Exception as e:
+            rendergate_logger.warning(f"Job events disconnected. {repr(e)}")
+            supported: bool = True
+        finally:
+            was_connected = _connected
+            _set_connected(False)
+
+        if not supported:
+            rendergate_logger.info("Job events not available, polling the jobs.")
+            attempt = 0
+            await asyncio.sleep(PUSH_RETRY_INTERVAL)
+            continue
+
+        # the connection worked, so the next one probably works right away again
+        if was_connected:
+            attempt = 0
+        delay: float = RECONNECT.delay(attempt, _retry if was_connected else None)
+        attempt += 1
+        rendergate_logger.debug(f"Reconnecting job events in {delay:.1f} seconds.")
+        await asyncio.sleep(delay)
+
+
+def _set_connected(connected: bool) -> None:
+    global _connected
+    _connected = connected
+
+
+async def _stream(api_url: str) -> bool:
+    """
+    Receive the job events until the connection drops.
+
+    Returns:
+        False if rendergate.ch doesn't support pushing the job changes.
+    """
+
+    from httpx import Timeout
+
+    headers: dict = {
+        "auth": await auth.ensure_token(),
+        "Accept": "text/event-stream",
+        "Cache-Control": "no-cache",
+    }
+    if _last_event_id:
+        headers["Last-Event-ID"] = _last_event_id
+
+    # its own connection, so it never waits for or blocks the API calls
+    async with rest_client.get_client(rest_client.EVENTS).stream(
+        "GET",
+        f"{api_url}/project/events",
+        headers=headers,
+        timeout=Timeout(rest_client.TIMEOUT, read=READ_TIMEOUT),
+    ) as response:
+        if response.status_code == 401:
+            # the token got rejected before it expired, reconnect with a new one
+            if session.get_refresh_token():
+                await auth.ensure_token(force_refresh=True)
+            else:
+                session.log_out()
+            return True
+        if _is_unsupported(response.status_code):
+            return False
+        if response.status_code != 200:
+            raise ConnectionError(f"{response.status_code}: Could not get job events.")
+        if not response.headers.get("Content-Type", "").startswith(
+            "text/event-stream"
+        ):
+            return False
+
+        _set_connected(True)
+        rendergate_logger.info("Job events connected.")
+        await _read_events(response)
+
+    return True
+
+
+def _is_unsupported(status_code: int) -> bool:
+    """If the status of the event stream means that rendergate.ch can't push."""
+
+    if status_code in UNSUPPORTED_STATUSES:
+        return True
+    return 400 <= status_code < 500 and status_code not in RECONNECT.retry_statuses
+
+
+async def _read_events(response: "Response") -> None:
+    """Parse the event stream and apply the events, until it ends."""
+
+    global _last_event_id, _retry
+
+    event: str = "message"
+    data: list[str] = []
+
+    async for line in response.aiter_lines():
+        # an empty line ends the event
+        if not line:
+            if data:
+                await _apply_event(event, "\n".join(data))
+            event = "message"
+            data = []
+            continue
+
+        # comment, e.g. to keep the connection alive
+        if line.startswith(":"):
+            continue
+
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+
+        if field == "data":
+            data.append(value)
+        elif field == "event":
+            event = value
+        elif field == "id":
+            _last_event_id = value
+        elif field == "retry" and value.isdigit():
+            _retry = int(value) / 1000
+
+
+async def _apply_event(event: str, data: str) -> None:
+    """Decode the change of a job, and apply it to the jobs in the main thread."""
+
+    if event not in ("job", "message"):
+        return
+
+    try:
+        job_data: dict = json.loads(data)
+    except ValueError:
+        rendergate_logger.error(f"Could not read job event. {data}")
+        return
+
+    if not isinstance(job_data, dict) or job_data.get("id") is None:
+        return
+
+    state: dict[str, Any] | None = await async_loop.run_in_main_thread(
+        _apply_job, job_data["id"], job_data
+    )
+    if state is not None:
+        job_cache.save_job_cache(session.get_username(), state)
+
+
+def _apply_job(job_id: str, job_data: dict) -> dict[str, Any] | None:
+    """
+    Apply the change of a job to the jobs. Must be called in the main thread.
+
+    Returns:
+        The sync state to cache if the stage of the job changed, otherwise None.
+    """
+
+    old_job: Job | None = jobs.get_job(job_id)
+    if not job_sync.apply_job(job_id, job_data):
+        return None
+
+    # only save the cache if the stage changed, not for every bit of progress
+    if old_job is None or jobs.get_job(job_id).stage != old_job.stage:
+        return job_sync.get_state()
+
+    return None
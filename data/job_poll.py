@@ -0,0 +1,280 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Background polling of the render jobs that aren't done yet,
+so the job list shows when a job e.g. finished rendering,
+without pressing the refresh button.
+
+Only the jobs in a stage that can still change get polled, each on its own.
+The interval of a job backs off while it doesn't change,
+and resets once it does. When no job can change anymore, the polling stops.
+"""
+
+
+import bpy
+import time
+import asyncio
+import concurrent.futures
+from typing import Any, Callable, TYPE_CHECKING
+from ..utils import async_loop, rest_client, auth
+from ..utils.enums import Stage
+from ..utils.utils import redraw_areas
+from ..utils.global_vars import rendergate_logger
+from . import jobs, job_sync, job_cache, auto_download, session
+
+# only for type hints, httpx is imported on first use
+if TYPE_CHECKING:
+    from httpx import Response
+
+# only jobs in these stages can still change
+POLLED_STAGES: frozenset[Stage] = frozenset(
+    (Stage.INIT, Stage.UPLOADED, Stage.PAYING, Stage.RENDERING)
+)
+
+# seconds between polls of a job, doubled every time the job didn't change
+POLL_MIN_INTERVAL: float = 10.0
+POLL_MAX_INTERVAL: float = 300.0
+POLL_BACKOFF: float = 2.0
+# seconds to check again if the polls are done
+POLL_WAIT_INTERVAL: float = 1.0
+
+# the clock of the poll schedule, replaced in tests
+_monotonic: Callable[[], float] = time.monotonic
+
+# interval and monotonic time of the next poll by job id,
+# only used in the main thread
+_intervals: dict[str, float] = {}
+_next_poll: dict[str, float] = {}
+# the polls that are running
+_poll_future: concurrent.futures.Future | None = None
+# rendergate.ch pushes the changes of the jobs, no need to poll them
+_paused: bool = False
+
+
+def start_polling() -> None:
+    """Poll the jobs that aren't done yet. Must be called in the main thread."""
+
+    if _paused:
+        return
+
+    if bpy.app.timers.is_registered(_poll_timer):
+        bpy.app.timers.unregister(_poll_timer)
+    bpy.app.timers.register(_poll_timer, first_interval=0.0)
+
+
+def poll_soon(*job_ids: str) -> None:
+    """
+    Poll the jobs right away and reset their interval,
+    e.g. after they were sent to render. Must be called in the main thread.
+    """
+
+    now: float = _monotonic()
+    for job_id in job_ids:
+        _intervals[job_id] = POLL_MIN_INTERVAL
+        _next_poll[job_id] = now
+
+    start_polling()
+
+
+def pause_polling() -> None:
+    """
+    Stop polling while the changes of the jobs get pushed.
+    Must be called in the main thread.
+    """
+
+    global _paused
+
+    _paused = True
+    if bpy.app.timers.is_registered(_poll_timer):
+        bpy.app.timers.unregister(_poll_timer)
+
+
+def resume_polling() -> None:
+    """Poll again, e.g. when the changes of the jobs aren't pushed anymore."""
+
+    global _paused
+
+    _paused = False
+    start_polling()
+
+
+def stop_polling() -> None:
+    """Stop polling and forget the intervals, e.g. when unregistering the addon."""
+
+    global _paused
+
+    if bpy.app.timers.is_registered(_poll_timer):
+        bpy.app.timers.unregister(_poll_timer)
+    _paused = False
+    _intervals.clear()
+    _next_poll.clear()
+
+
+def _polled_job_ids() -> list[str]:
+    """The ids of the jobs that can still change."""
+
+    return [job.identifier for job in jobs.get_jobs() if job.stage in POLLED_STAGES]
+
+
+def _poll_timer() -> float | None:
+    """Timer that starts polling the jobs that are due."""
+
+    global _poll_future
+
+    if not session.is_logged_in() or not bpy.app.online_access:
+        stop_polling()
+        return None
+
+    job_ids: list[str] = _polled_job_ids()
+
+    # forget the jobs that are done or got deleted
+    for job_id in set(_next_poll).difference(job_ids):
+        del _next_poll[job_id]
+        del _intervals[job_id]
+
+    if not job_ids:
+        rendergate_logger.debug("No jobs to poll.")
+        return None
+
+    # wait for the running polls, before polling again
+    if _poll_future is not None and not _poll_future.done():
+        return POLL_WAIT_INTERVAL
+
+    now: float = _monotonic()
+    due_job_ids: list[str] = []
+    for job_id in job_ids:
+        # the job was just received, no need to poll it right away
+        if job_id not in _next_poll:
+            _intervals[job_id] = POLL_MIN_INTERVAL
+            _next_poll[job_id] = now + POLL_MIN_INTERVAL
+        elif _next_poll[job_id] <= now:
+            due_job_ids.append(job_id)
+
+    if due_job_ids:
+        scene = getattr(bpy.context, "scene", None)
+        if scene is None:
+            return POLL_WAIT_INTERVAL
+        api_url: str = scene.rendergate_properties.rendergate_api_url
+        _poll_future = async_loop.submit(_poll_jobs(api_url, due_job_ids))
+        return POLL_WAIT_INTERVAL
+
+    return max(min(_next_poll.values()) - now, POLL_WAIT_INTERVAL)
+
+
+async def _request_job(api_url: str, token: str, job_id: str) -> "Response | str":
+    """Get a single job from rendergate.ch."""
+
+    return await rest_client.request(
+        url=f"{api_url}/project/{job_id}",
+        headers={"auth": token},
+        request="GET",
+    )
+
+
+def _is_token_rejected(response: "Response | str") -> bool:
+    return isinstance(response, str) and response.startswith("Token expired")
+
+
+def _read_job(job_id: str, response: "Response | str") -> Any:
+    """
+    Read the response of a polled job.
+
+    Returns:
+        The decoded job data, None if it couldn't be polled.
+    """
+
+    # error occured, try again later
+    if isinstance(response, str):
+        rendergate_logger.error(f"Could not poll job {job_id}. {response}")
+        return None
+
+    try:
+        return response.json()
+    except ValueError:
+        rendergate_logger.error(f"Could not read polled job {job_id}. {response.text}")
+        return None
+
+
+async def _poll_jobs(api_url: str, job_ids: list[str]) -> None:
+    """Poll the jobs and redraw, but only if a job changed."""
+
+    token: str = await auth.ensure_token()
+    responses: list[Response | str] = list(
+        await asyncio.gather(
+            *(_request_job(api_url, token, job_id) for job_id in job_ids)
+        )
+    )
+
+    rejected: list[int] = [
+        i for i, response in enumerate(responses) if _is_token_rejected(response)
+    ]
+    if rejected:
+        # the token got rejected before it expired, refresh it once and try again
+        refreshed_token: str = await auth.ensure_token(force_refresh=True)
+        if refreshed_token and refreshed_token != token:
+            retried: list[Response | str] = await asyncio.gather(
+                *(_request_job(api_url, refreshed_token, job_ids[i]) for i in rejected)
+            )
+            for i, response in zip(rejected, retried):
+                responses[i] = response
+        if refreshed_token == token or any(map(_is_token_rejected, responses)):
+            rendergate_logger.info("Token rejected and not refreshed, logging out.")
+            session.log_out()
+
+    polled_data: list[Any] = [
+        _read_job(job_id, response) for job_id, response in zip(job_ids, responses)
+    ]
+
+    state: dict[str, Any] | None = await async_loop.run_in_main_thread(
+        _polled, job_ids, polled_data
+    )
+    if state is not None:
+        job_cache.save_job_cache(session.get_username(), state)
+
+
+def _polled(job_ids: list[str], polled_data: list[Any]) -> dict[str, Any] | None:
+    """
+    Apply the polled jobs, schedule the next polls, and show the changed jobs.
+
+    Returns:
+        The sync state to cache, None if no job changed.
+    """
+
+    changed_job_ids: list[str] = [
+        job_id
+        for job_id, job_data in zip(job_ids, polled_data)
+        if job_sync.apply_job(job_id, job_data)
+    ]
+
+    now: float = _monotonic()
+    for job_id in job_ids:
+        if job_id in changed_job_ids:
+            interval: float = POLL_MIN_INTERVAL
+        else:
+            interval: float = min(
+                _intervals.get(job_id, POLL_MIN_INTERVAL) * POLL_BACKOFF,
+                POLL_MAX_INTERVAL,
+            )
+        _intervals[job_id] = interval
+        _next_poll[job_id] = now + interval
+
+    if not changed_job_ids:
+        return None
+
+    rendergate_logger.info(f"Polled {len(changed_job_ids)} changed jobs.")
+    auto_download.check_jobs()
+    redraw_areas()
+
+    return job_sync.get_state()
@@ -0,0 +1,222 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Incremental synchronisation of the render jobs with rendergate.ch.
+
+The job list is requested with the ETag of the last response (If-None-Match)
+and, if the server returned one, the cursor of the last sync (?since=).
+Depending on what the server supports, the response is either:
+    - 304 Not Modified: nothing changed, nothing to parse.
+    - A delta: {"jobs": [changed or new jobs], "deleted": [ids], "cursor": "..."}
+    - A list of all jobs: replaces all jobs.
+
+The state and the jobs are only changed in the main thread, where they are drawn.
+The responses are decoded in the background and applied with `run_in_main_thread`.
+"""
+
+
+from typing import Any, TYPE_CHECKING
+from urllib.parse import urlencode
+from ..utils.models import Job
+
+# only for type hints, httpx is imported on first use
+if TYPE_CHECKING:
+    from httpx import Response
+from ..utils.global_vars import rendergate_logger
+from . import jobs
+
+# the account the state belongs to
+_account: str = ""
+# raw job data by job id, in the order of rendergate.ch
+_job_data: dict[str, dict] = {}
+_etag: str | None = None
+_cursor: str | None = None
+# the number of the next new job, numbers need to stay unique for the enum items
+_next_number: int = 0
+
+
+def set_account(account: str) -> None:
+    """Reset the sync state if the jobs are requested for another account."""
+
+    global _account, _etag, _cursor
+
+    if account == _account:
+        return
+
+    _account = account
+    _job_data.clear()
+    _etag = None
+    _cursor = None
+
+
+def get_state() -> dict[str, Any]:
+    """
+    The sync state, to be cached on disk.
+    A snapshot, so it can be saved in the background.
+    """
+
+    return {
+        "etag": _etag,
+        "cursor": _cursor,
+        "jobs": list(_job_data.values()),
+    }
+
+
+def load_state(account: str, state: dict[str, Any]) -> bool:
+    """
+    Restore the sync state and the jobs, e.g. from the disk cache.
+
+    Returns:
+        If any jobs were restored.
+    """
+
+    global _etag, _cursor
+
+    set_account(account)
+    _job_data.clear()
+    for job_data in state.get("jobs", []):
+        if isinstance(job_data, dict) and job_data.get("id") is not None:
+            _job_data[job_data["id"]] = job_data
+    _etag = state.get("etag")
+    _cursor = state.get("cursor")
+
+    jobs.set_jobs(_construct_jobs(_job_data.values()))
+
+    return len(_job_data) > 0
+
+
+def sync_url(api_url: str) -> str:
+    """The URL to request the jobs that changed since the last sync."""
+
+    if _cursor and _job_data:
+        return f"{api_url}/project?{urlencode({'since': _cursor})}"
+    return f"{api_url}/project"
+
+
+def request_headers() -> dict[str, str]:
+    """Headers to request the jobs only if they changed since the last sync."""
+
+    if _etag and _job_data:
+        return {"If-None-Match": _etag}
+    return {}
+
+
+def apply_response(response: "Response", response_json: Any) -> bool | None:
+    """
+    Apply the response of the job list request to the jobs,
+    with its body already decoded. Must be called in the main thread.
+
+    Returns:
+        If the jobs changed, None if the response isn't a valid job list.
+    """
+
+    global _etag, _cursor, _next_number
+
+    # nothing changed since the last sync
+    if response.status_code == 304:
+        return False
+
+    if isinstance(response_json, list):
+        changed_data: list = response_json
+        deleted_ids: list = []
+        full_sync: bool = True
+    elif isinstance(response_json, dict) and isinstance(
+        response_json.get("jobs"), list
+    ):
+        changed_data: list = response_json["jobs"]
+        deleted_ids: list = response_json.get("deleted") or []
+        full_sync: bool = False
+    else:
+        return None
+
+    cursor: str | None = (
+        response_json.get("cursor") if isinstance(response_json, dict) else None
+    )
+    _etag = response.headers.get("ETag")
+    _cursor = cursor or response.headers.get("X-Rendergate-Cursor")
+
+    if full_sync:
+        _job_data.clear()
+        for job_data in changed_data:
+            if isinstance(job_data, dict) and job_data.get("id") is not None:
+                _job_data[job_data["id"]] = job_data
+        jobs.set_jobs(_construct_jobs(_job_data.values()))
+        return True
+
+    # delta, only construct the jobs that changed
+    changed_jobs: list[Job] = []
+    for job_data in changed_data:
+        if not isinstance(job_data, dict) or job_data.get("id") is None:
+            continue
+        job_id: str = job_data["id"]
+        _job_data[job_id] = job_data
+        existing_job: Job | None = jobs.get_job(job_id)
+        if existing_job is not None:
+            number: int = existing_job.number
+        else:
+            number: int = _next_number
+            _next_number += 1
+        changed_jobs.append(jobs.construct_render_job(job_data, number))
+
+    removed_ids: list[str] = [i for i in deleted_ids if i in _job_data]
+    for job_id in removed_ids:
+        del _job_data[job_id]
+
+    if not changed_jobs and not removed_ids:
+        return False
+
+    jobs.update_jobs(changed_jobs, removed_ids)
+    rendergate_logger.info(
+        f"Synced {len(changed_jobs)} changed and {len(removed_ids)} deleted jobs."
+    )
+
+    return True
+
+
+def apply_job(job_id: str, job_data: Any) -> bool:
+    """
+    Apply the data of a single job to the jobs,
+    e.g. the response of a job request or a pushed stage change.
+    Fields that are left out keep their value. Must be called in the main thread.
+
+    Returns:
+        If the job changed.
+    """
+
+    if not isinstance(job_data, dict) or job_id not in _job_data:
+        return False
+
+    job_data = {**_job_data[job_id], **job_data, "id": job_id}
+    if job_data == _job_data[job_id]:
+        return False
+
+    _job_data[job_id] = job_data
+    existing_job: Job | None = jobs.get_job(job_id)
+    if existing_job is None:
+        return False
+    jobs.add_job(jobs.construct_render_job(job_data, existing_job.number))
+
+    return True
+
+
+def _construct_jobs(job_data_list) -> list[Job]:
+    """Construct the jobs from the raw job data."""
+
+    global _next_number
+
+    constructed_jobs: list[Job] = jobs.construct_render_jobs(job_data_list)
+    _next_number = len(constructed_jobs)
+
+    return constructed_jobs
@@ -13,32 +13,88 @@
 
 
 import decimal
+from typing import Iterable
 from decimal import Decimal, InvalidOperation
-import humanize
-from dateutil import tz
-from datetime import datetime, tzinfo
+from datetime import datetime, timezone
 from bpy.types import Context
 from ..utils.models import Job
 from ..utils.enums import Stage
 from ..utils.global_vars import rendergate_logger
 
-_jobs: list[Job] = []
+# created once, instead of for every job
+_UTC: timezone = timezone.utc
+_CENT: Decimal = Decimal(".01")
+# make sure we have enough precision to quantize
+_DECIMAL_CONTEXT: decimal.Context = decimal.Context(prec=28)
+
+# jobs by identifier, in the order they were received from rendergate.ch,
+# gets replaced instead of changed, because the jobs get updated in the
+# background thread while the UI reads them in the main thread
+_jobs: dict[str, Job] = {}
+# list of the jobs, so it doesn't have to be rebuilt on every redraw
+_job_list: list[Job] = []
+# gets bumped every time the jobs change
+_version: int = 0
+
+
+def _jobs_changed(new_jobs: dict[str, Job]) -> None:
+    """Swap in the changed jobs and update the cached job list and version."""
+
+    global _jobs, _job_list, _version
+
+    _jobs = new_jobs
+    _job_list = list(new_jobs.values())
+    _version += 1
 
 
 def get_jobs() -> list[Job]:
     """Return all rendergate render jobs."""
 
-    return _jobs
+    return _job_list
+
+
+def get_job(identifier: str) -> Job | None:
+    """Return the render job with the identifier."""
+
+    return _jobs.get(identifier)
+
+
+def get_version() -> int:
+    """Return a number that changes every time the jobs change."""
+
+    return _version
 
 
 def add_job(job: Job) -> Job:
-    """Add a rendergate render job."""
+    """Add a rendergate render job, or replace the job with the same identifier."""
 
-    _jobs.append(job)
+    new_jobs: dict[str, Job] = dict(_jobs)
+    new_jobs[job.identifier] = job
+    _jobs_changed(new_jobs)
 
     return job
 
 
+def set_jobs(new_jobs: list[Job]) -> None:
+    """
+    Replace all render jobs with the jobs from rendergate.ch.
+    Jobs that don't exist anymore get removed.
+    """
+
+    _jobs_changed({job.identifier: job for job in new_jobs})
+
+
+def update_jobs(changed_jobs: list[Job], removed_ids: list[str]) -> None:
+    """Add or replace the changed jobs and remove the deleted ones."""
+
+    new_jobs: dict[str, Job] = dict(_jobs)
+    for job in changed_jobs:
+        new_jobs[job.identifier] = job
+    for identifier in removed_ids:
+        new_jobs.pop(identifier, None)
+    _jobs_changed(new_jobs)
+
+
 def get_selected_render_job(context: Context) -> Job | None:
     """Get the job that is selected in the enum property."""
 
@@ -46,15 +102,7 @@ def get_selected_render_job(context: Context) -> Job | None:
 
     props: RendergateProperties = context.scene.rendergate_properties
 
-    try:
-        selected_job: Job = next(
-            (j for j in get_jobs() if j.identifier == props.jobs), None
-        )
-    except IndexError as e:
-        rendergate_logger.error(repr(e))
-        return None
-    else:
-        return selected_job
+    return _jobs.get(props.jobs)
 
 
 def set_selected_render_job(context: Context, identifier: str) -> None:
@@ -67,69 +115,73 @@ def set_selected_render_job(context: Context, identifier: str) -> None:
     props.jobs = identifier
 
 
-def construct_render_job(job_data: dict, index: int) -> Job:
-    """Create the Job dataclass from the response job dict."""
-
-    job_id: str = job_data.get("id")
-    job_name: str = job_data.get("name", "")
-    project_name: str = job_data.get("project")
-    # parse incoming stage string onto strEnum Stage
-    try:
-        stage: Stage = Stage[job_data.get("stage", Stage.UNKNOWN)]
-    except KeyError:
-        stage: Stage = Stage.UNKNOWN
-    progress: str = job_data.get("progress", "")
+def _parse_decimal(number: float | str | None) -> Decimal:
+    """Create a decimal with 2 decimal places, to not have floating point errors."""
 
-    # create decimals for the prices to not have floating point precision errors
-    # and make sure we have enough precision to quantize
-    decimal.getcontext().prec = 28
-    cost_estimation_number: float = job_data.get("costEst", 0.00)
     try:
-        cost_estimation: Decimal = Decimal(f"{cost_estimation_number}")
-        cost_estimation = cost_estimation.quantize(Decimal(".01"))
+        return Decimal(f"{number}").quantize(_CENT, context=_DECIMAL_CONTEXT)
     except InvalidOperation:
-        cost_estimation: Decimal = Decimal("0.00")
+        return Decimal("0.00")
+
+
+def _parse_timestamp(created: str | None) -> float | None:
+    """Parse the ISO 8601 UTC creation date to a timestamp."""
+
+    if not created:
+        return None
 
-    cost_number: float = job_data.get("cost", 0.0)
     try:
-        cost: Decimal = Decimal(f"{cost_number}")
-        cost = cost.quantize(Decimal(".01"))
-    except InvalidOperation as e:
-        cost: Decimal = Decimal("0.00")
-
-    time_estimation: float = job_data.get("timeEst", 0.0)
-    time: float = job_data.get("time", 0.0)
-    preview: str = job_data.get("preview", "")
-
-    # created time
-    created: str = job_data.get("creationDate")
-    from_zone: tzinfo = tz.tzutc()
-    to_zone: tzinfo = tz.tzlocal()
-    date_time_utc: datetime = datetime.strptime(created, "%Y-%m-%dT%H:%M:%S.%fZ")
+        # fast path, e.g. "2025-01-31T12:34:56.789Z"
+        date_time_utc: datetime = datetime.fromisoformat(created)
+    except ValueError:
+        try:
+            date_time_utc: datetime = datetime.strptime(
+                created, "%Y-%m-%dT%H:%M:%S.%fZ"
+            )
+        except ValueError:
+            rendergate_logger.error(f"Could not parse creation date {created}")
+            return None
+
     # tell the datetime object that it's in UTC time zone since
     # datetime objects are naive by default
-    date_time_utc = date_time_utc.replace(tzinfo=from_zone)
-    # convert to local time zone
-    date_time_local = date_time_utc.astimezone(to_zone)
-    created_ago: str = humanize.naturaltime(date_time_local)
+    if date_time_utc.tzinfo is None:
+        date_time_utc = date_time_utc.replace(tzinfo=_UTC)
+
+    return date_time_utc.timestamp()
 
-    description: str = (
-        f"Job {index}\nCreated: {created_ago}\nProject: {project_name}\nStage: {stage}\nProgress: {progress}\nCost Estimation: ${cost_estimation}\nCost: {cost}\nTime Estimation: {time_estimation}\nTime: {time}"
-    )
+
+def construct_render_job(job_data: dict, index: int) -> Job:
+    """
+    Create the Job dataclass from the response job dict.
+    Texts that are only needed for displaying the job are created lazily.
+    """
+
+    # parse incoming stage string onto strEnum Stage
+    try:
+        stage: Stage = Stage[job_data.get("stage", Stage.UNKNOWN)]
+    except KeyError:
+        stage: Stage = Stage.UNKNOWN
 
     return Job(
-        identifier=job_id,
+        identifier=job_data.get("id"),
         number=index,
-        name=job_name,
-        display_name=f'"{job_name}" {created_ago}',
-        description=description,
-        created=created_ago,
-        project_name=project_name,
+        name=job_data.get("name", ""),
+        created_timestamp=_parse_timestamp(job_data.get("creationDate")),
+        project_name=job_data.get("project"),
         stage=stage,
-        progress=progress,
-        cost_estimation=cost_estimation,
-        cost=cost,
-        time_estimation=time_estimation,
-        time=time,
-        preview_link=preview,
+        progress=job_data.get("progress", ""),
+        cost_estimation=_parse_decimal(job_data.get("costEst", 0.00)),
+        cost=_parse_decimal(job_data.get("cost", 0.0)),
+        time_estimation=job_data.get("timeEst", 0.0),
+        time=job_data.get("time", 0.0),
+        preview_link=job_data.get("preview", ""),
     )
+
+
+def construct_render_jobs(job_data_list: Iterable[dict], start: int = 0) -> list[Job]:
+    """Create the Jobs of a whole job list response, numbered from `start`."""
+
+    return [
+        construct_render_job(job_data, index)
+        for index, job_data in enumerate(job_data_list, start)
+    ]
@@ -0,0 +1,94 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+"""
+Runtime state of the login session.
+
+Kept in memory instead of on the scene, so it doesn't get saved into
+the blend-file, doesn't mark the file as changed and isn't part of undo.
+It also stays the same when another blend-file is opened.
+"""
+
+
+# the token we get when logging into AWS Cognito, empty if not logged in
+_aws_token: str = ""
+# the account the token belongs to
+_username: str = ""
+# to get a new token before the token expires
+_refresh_token: str = ""
+# unix time when the token expires, 0 if unknown
+_expires_at: float = 0.0
+
+
+def get_aws_token() -> str:
+    """The token for the rendergate.ch API, empty if not logged in."""
+
+    return _aws_token
+
+
+def get_username() -> str:
+    """The account that is logged in."""
+
+    return _username
+
+
+def get_refresh_token() -> str:
+    """The Cognito refresh token of the session."""
+
+    return _refresh_token
+
+
+def get_expires_at() -> float:
+    """Unix time when the token expires, 0 if unknown."""
+
+    return _expires_at
+
+
+def is_logged_in() -> bool:
+    """If there is a token, it may be expired though."""
+
+    return bool(_aws_token)
+
+
+def log_in(
+    username: str, aws_token: str, refresh_token: str = "", expires_at: float = 0.0
+) -> None:
+    """Remember the tokens of the account."""
+
+    global _aws_token, _username, _refresh_token, _expires_at
+
+    _username = username
+    _aws_token = aws_token
+    _refresh_token = refresh_token
+    _expires_at = expires_at
+
+
+def update_token(aws_token: str, expires_at: float) -> None:
+    """Replace the token with a refreshed one."""
+
+    global _aws_token, _expires_at
+
+    _aws_token = aws_token
+    _expires_at = expires_at
+
+
+def log_out() -> None:
+    """Forget the tokens, e.g. when they expired."""
+
+    global _aws_token, _refresh_token, _expires_at
+
+    _aws_token = ""
+    _refresh_token = ""
+    _expires_at = 0.0
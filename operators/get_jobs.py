@@ -15,16 +15,35 @@
 # pyright: reportInvalidTypeForm=false
 
 
-from typing import Any
+import asyncio
+from typing import Any, TYPE_CHECKING
 from bpy.types import Operator, Context
-from requests import Response  # requests is included in Blender 4.4
-from ..utils.async_loop import AsyncModalOperatorMixin
-from ..utils import rest_client
-from ..utils.utils import class_to_register, catch_exception
+from ..utils.async_loop import AsyncModalOperatorMixin, run_in_main_thread
+from ..utils import rest_client, tasks, auth
+from ..utils.tasks import Task
+from ..utils.utils import (
+    class_to_register,
+    catch_exception,
+    redraw,
+    get_properties,
+    report,
+)
 from ..properties.properties import RendergateProperties
 from ..utils.global_vars import rendergate_logger
 from ..utils.models import Job
-from ..data import jobs
+from ..data import (
+    jobs,
+    job_cache,
+    job_sync,
+    job_poll,
+    job_events,
+    auto_download,
+    session,
+)
+
+# only for type hints, httpx is imported on first use
+if TYPE_CHECKING:
+    from httpx import Response
 
 
 @class_to_register
@@ -38,12 +57,8 @@ class RENDERGATE_OT_get_jobs(Operator, AsyncModalOperatorMixin):
     def description(cls, context: Context, properties: RendergateProperties):
         """Change operator description depending on required fields."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
-
-        if props.getting_jobs:
+        if tasks.is_running(tasks.JOBS):
             return "Getting jobs.."
-        elif props.async_op_running:
-            return "Wait until other Rendergate addon operation is finished"
         else:
             return "Get your render jobs from rendergate.ch"
 
@@ -51,33 +66,55 @@ class RENDERGATE_OT_get_jobs(Operator, AsyncModalOperatorMixin):
     def poll(cls, context: Context):
         """Enable the operator only if we are not already getting projects."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
-        return not props.getting_jobs and not props.async_op_running
+        return not tasks.is_running(tasks.JOBS)
+
+    def new_task(self, context: Context) -> Task:
+        """Getting the jobs conflicts only with getting the jobs."""
+
+        return Task(resource=tasks.JOBS, label="Getting jobs")
 
     def _cleanup(self, context: Context, context_pointers: dict[str, Any] = {}) -> None:
         """Cleanup on uncaught exceptions of async operator."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
-        props.getting_jobs = False
-        props.async_op_running = False
-        context.area.tag_redraw()
+        redraw(context)
+
+    @staticmethod
+    async def update_job_list(context: Context) -> None:
+        """
+        Get the jobs from another async operator.
+        Waits for a running update, so the jobs are up to date afterwards.
+        """
+
+        task: Task = Task(resource=tasks.JOBS, label="Getting jobs")
+        while not tasks.start_task(task):
+            await asyncio.sleep(0.2)
+        try:
+            # pass self as None,
+            # so self.quit() doesn't also quit the calling operator
+            await RENDERGATE_OT_get_jobs.async_execute(None, context, {})
+        finally:
+            tasks.finish_task(task)
+            await run_in_main_thread(redraw, context)
 
     @catch_exception(_cleanup)
     async def async_execute(self, context: Context, context_pointers: dict[str, Any]):
-        """Upload this blend-file and create a new render job."""
+        """Get the render jobs from rendergate.ch."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
-        props.async_op_running = True
-        props.getting_jobs = True
-        context.area.tag_redraw()
+        (api_url,) = await get_properties(context, "rendergate_api_url")
+        username: str = session.get_username()
 
         no_jobs: bool = True if not jobs.get_jobs() else False
 
-        headers: dict = {"auth": props.aws_token}
+        # only request the jobs that changed since the last sync
+        await run_in_main_thread(job_sync.set_account, username)
+        headers: dict = {
+            "auth": await auth.ensure_token(),
+            **job_sync.request_headers(),
+        }
 
-        # create rendergate job/project
+        # get rendergate jobs
         response: Response | None = await rest_client.request(
-            url=f"{props.rendergate_api_url}/project",
+            url=job_sync.sync_url(api_url),
             headers=headers,
             request="GET",
         )
@@ -86,51 +123,51 @@ class RENDERGATE_OT_get_jobs(Operator, AsyncModalOperatorMixin):
         if isinstance(response, str):
             rendergate_logger.error(f"{response}")
             if response.startswith("Token expired"):
-                props.aws_token = ""
-                if self is not None:
-                    self.report({"INFO"}, response)
+                session.log_out()
+                await report(self, {"INFO"}, response)
             else:
-                if self is not None:
-                    self.report({"ERROR"}, response)
+                await report(self, {"ERROR"}, response)
             if self is not None:
                 self.quit()
-                self._cleanup(context)
-            props.async_op_running = False
-            props.getting_jobs = False
             return
 
-        response_json: dict = response.json()
+        # decode in the background, but update existing jobs, add new ones
+        # and remove the deleted ones in the main thread, where they are drawn
+        response_json: Any = None if response.status_code == 304 else response.json()
+        changed: bool | None = await run_in_main_thread(
+            job_sync.apply_response, response, response_json
+        )
 
-        if not isinstance(response_json, list):
-            props.async_op_running = False
-            props.getting_jobs = False
+        if changed is None:
             if self is not None:
-                self._cleanup(context)
-                self.report({"WARNING"}, "No jobs.")
+                await report(self, {"WARNING"}, "No jobs.")
                 self.quit()
             return
 
-        for index, job_data in enumerate(response_json):
-            if not isinstance(job_data, dict):
-                continue
-            if job_data.get("id") is None:
-                continue
-            # add new job to list
-            new_job: Job = jobs.add_job(jobs.construct_render_job(job_data, index))
+        if changed:
+            job_cache.save_job_cache(
+                username, await run_in_main_thread(job_sync.get_state)
+            )
+            # download the jobs that finished in the meantime, if enabled
+            await run_in_main_thread(auto_download.check_jobs)
+
+        # keep the jobs that aren't done yet up to date in the background,
+        # pushed by rendergate.ch or polled if that's not possible
+        await run_in_main_thread(job_events.start_events)
+        await run_in_main_thread(job_poll.start_polling)
 
         # set last job,
-        # but only if there where no jobs before,
+        # but only if there where no jobs before or the selected job got deleted,
         # otherwise we want to still have the job that was selected before
-        if no_jobs:
-            jobs.set_selected_render_job(
-                context, jobs.get_jobs()[len(jobs.get_jobs()) - 1].identifier
+        selected_job: Job | None = await run_in_main_thread(
+            jobs.get_selected_render_job, context
+        )
+        if jobs.get_jobs() and (no_jobs or selected_job is None):
+            await run_in_main_thread(
+                jobs.set_selected_render_job, context, jobs.get_jobs()[-1].identifier
             )
 
-        props.getting_jobs = False
-        props.async_op_running = False
-        context.area.tag_redraw()
         if self is not None:
-            self._cleanup(context)
-            self.report({"INFO"}, "Job list updated.")
+            await report(self, {"INFO"}, "Job list updated.")
             self.quit()
         return
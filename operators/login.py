@@ -11,57 +11,93 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-import bpy
 import traceback
-from warrant import Cognito
+from typing import Any
 from bpy.types import Operator, Context
-from ..utils.utils import class_to_register
+from .get_jobs import RENDERGATE_OT_get_jobs
+from ..data import job_cache, session, credentials
+from ..utils import tasks, auth
+from ..utils.tasks import Task
+from ..utils.async_loop import AsyncModalOperatorMixin, run_in_main_thread
+from ..utils.utils import (
+    class_to_register,
+    catch_exception,
+    progress,
+    redraw,
+    get_properties,
+    set_properties,
+    report,
+)
 from ..utils.global_vars import rendergate_logger
-from ..properties.properties import RendergateProperties
+from ..properties.preferences import get_preferences
 
 
 @class_to_register
-class RENDERGATE_OT_login(Operator):
+class RENDERGATE_OT_login(Operator, AsyncModalOperatorMixin):
     bl_idname = "rendergate.login"
     bl_label = "Login"
     bl_description = "Login into you Rendergate.ch account."
     bl_options = {"REGISTER", "INTERNAL"}
 
-    def execute(self, context: Context):
-        """
-        Logs into AWS cognito with warrant (using boto3).
-        """
+    @classmethod
+    def poll(cls, context: Context):
+        """Enable the operator only if we are not already logging in."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
+        return not tasks.is_running(tasks.LOGIN)
 
-        # aws authentication
-        REGION: str = "us-east-2"
-        USER_POOL_ID: str = "us-east-2_0iJztlRUB"
-        USER_POOL_WEB_CLIENT_ID: str = "6m7eldka3q9f20nmev7smovnf6"
+    def new_task(self, context: Context) -> Task:
+        """Logging in conflicts only with logging in."""
 
-        try:
-            user: Cognito = Cognito(
-                user_pool_id=USER_POOL_ID,
-                client_id=USER_POOL_WEB_CLIENT_ID,
-                user_pool_region=REGION,
-                username=props.username,
-            )
-            user.authenticate(password=props.password)
+        return Task(resource=tasks.LOGIN, label="Logging in")
+
+    def _cleanup(self, context: Context, context_pointers: dict[str, Any] = {}) -> None:
+        """Cleanup on uncaught exceptions of async operator."""
+
+        redraw(context)
+
+    @catch_exception(_cleanup)
+    async def async_execute(self, context: Context, context_pointers: dict[str, Any]):
+        """Log in without blocking Blender, then get the jobs."""
+
+        task: Task = self.task
+        await progress(task, "progress", 0.1, context, text="10% - Logging in...")
+
+        username, password = await get_properties(context, "username", "password")
 
+        try:
+            aws_token, refresh_token = await auth.authenticate(username, password)
         except Exception as e:
             rendergate_logger.error(traceback.format_exc())
-            props.aws_token = ""
-            self.report({"ERROR"}, f"Login failed: {str(e)}")
-            return {"CANCELLED"}
+            session.log_out()
+            await report(self, {"ERROR"}, f"Login failed: {str(e)}")
+            self.quit()
+            return
+
+        session.log_in(
+            username, aws_token, refresh_token, auth.token_expiry(aws_token)
+        )
+        auth.keep_token_fresh()
+
+        # the password isn't needed anymore, don't save it in the blend-file
+        await set_properties(context, password="")
+        remember_login, encrypt_login = await run_in_main_thread(
+            lambda: (
+                get_preferences(context).remember_login,
+                get_preferences(context).encrypt_login,
+            )
+        )
+        if remember_login:
+            credentials.save_credentials(username, refresh_token, encrypt_login)
 
-        else:
-            props.aws_token = user.id_token
+        # show the cached jobs until they are fetched
+        await run_in_main_thread(job_cache.restore_jobs, username)
 
-            # get jobs
-            try:
-                bpy.ops.rendergate.get_jobs("EXEC_DEFAULT")
-            except Exception as e:
-                rendergate_logger.error(f"{repr(e)}")
+        await progress(task, "progress", 0.5, context, text="50% - Getting Jobs...")
+        try:
+            await RENDERGATE_OT_get_jobs.update_job_list(context)
+        except Exception as e:
+            rendergate_logger.error(f"{repr(e)}")
 
-        self.report({"INFO"}, "Login successfull.")
-        return {"FINISHED"}
+        await report(self, {"INFO"}, "Login successfull.")
+        self.quit()
+        return
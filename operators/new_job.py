@@ -15,15 +15,15 @@
 # pyright: reportInvalidTypeForm=false
 
 import bpy
-import math
 from bpy.props import BoolProperty
 from bpy.types import Operator, Context, Event, UILayout
-from typing import Any
-from requests import Response  # requests is included in Blender 4.4
+from typing import Any, TYPE_CHECKING
 from .get_jobs import RENDERGATE_OT_get_jobs
-from ..data import jobs
-from ..utils.async_loop import AsyncModalOperatorMixin
-from ..utils import rest_client
+from ..data import jobs, session
+from ..utils.async_loop import AsyncModalOperatorMixin, run_in_main_thread
+from ..utils import rest_client, upload, tasks, auth
+from ..utils.tasks import Task
+from ..utils.progress import ProgressChannel
 from ..utils.global_vars import rendergate_logger
 from ..utils.utils import (
     class_to_register,
@@ -32,9 +32,16 @@ from ..utils.utils import (
     path_leaf,
     is_string_blank,
     progress,
+    redraw,
+    get_properties,
+    report,
 )
 from ..properties.properties import RendergateProperties
 
+# only for type hints, httpx is imported on first use
+if TYPE_CHECKING:
+    from httpx import Response
+
 
 @class_to_register
 class RENDERGATE_OT_new_job(Operator, AsyncModalOperatorMixin):
@@ -45,59 +52,65 @@ class RENDERGATE_OT_new_job(Operator, AsyncModalOperatorMixin):
 
     @classmethod
     def poll(cls, context: Context):
-        """Enable the operator only if we are not already running other async ops."""
+        """Enable the operator only if this blend-file isn't being uploaded already."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
-        return not props.async_op_running
+        return not tasks.is_running(tasks.upload_resource(bpy.data.filepath))
 
     @classmethod
     def description(cls, context: Context, properties: RendergateProperties):
         """Change operator description depending on required fields."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
-
-        if props.async_op_running:
-            return "Wait until other Rendergate addon operation is finished"
+        if tasks.is_running(tasks.upload_resource(bpy.data.filepath)):
+            return "Wait until the upload of this blend-file is finished"
         else:
             return "Upload this blend-file and create a new render job"
 
+    def new_task(self, context: Context) -> Task:
+        """Uploading conflicts only with uploading the same blend-file."""
+
+        return Task(
+            resource=tasks.upload_resource(bpy.data.filepath),
+            label=f"Uploading {path_leaf(bpy.data.filepath)}",
+        )
+
     def _cleanup(self, context: Context, context_pointers: dict[str, Any] = {}) -> None:
         """Cleanup on uncaught exceptions of async operator."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
-        props.create_job_progress = 1.0
-        props.async_op_running = False
-        context.area.tag_redraw()
+        redraw(context)
 
     @catch_exception(_cleanup)
     async def async_execute(self, context: Context, context_pointers: dict[str, Any]):
         """Upload this blend-file and create a new render job."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
-        props.async_op_running = True
+        task: Task = self.task
+        await progress(task, "progress", 0.1, context, text="10% - Creating Job...")
 
-        props.create_job_progress_text = "10% - Creating Job..."
-        await progress(props, "create_job_progress", 0.1, context)
-
-        headers: dict = {"auth": props.aws_token}
+        api_url, blend_file_path, job_name, project_name = await get_properties(
+            context,
+            "rendergate_api_url",
+            "blend_file_path",
+            "job_name",
+            "project_name",
+        )
+        headers: dict = {"auth": await auth.ensure_token()}
 
         # construct payload
-        file_name: str = path_leaf(props.blend_file_path)
+        file_name: str = path_leaf(blend_file_path)
         if not file_name:
             file_name = "unknown_blend_file"
         payload: dict = {
-            "name": props.job_name,
+            "name": job_name,
             "file": {
                 "type": "blend",
                 "name": file_name,
             },
         }
-        if not is_string_blank(props.project_name):
-            payload.update({"project": props.project_name})
+        if not is_string_blank(project_name):
+            payload.update({"project": project_name})
 
         # create rendergate job/project
         response: Response | None = await rest_client.request(
-            url=f"{props.rendergate_api_url}/project",
+            url=f"{api_url}/project",
             headers=headers,
             payload=payload,
             request="POST",
@@ -105,13 +118,11 @@ class RENDERGATE_OT_new_job(Operator, AsyncModalOperatorMixin):
 
         # error occured
         if isinstance(response, str):
-            await progress(props, "create_job_progress", 1.0, context)
             if response.startswith("Token expired"):
-                props.aws_token = ""
-                self.report({"INFO"}, response)
+                session.log_out()
+                await report(self, {"INFO"}, response)
             else:
-                self.report({"ERROR"}, response)
-            self._cleanup(context)
+                await report(self, {"ERROR"}, response)
             self.quit()
             return
 
@@ -124,114 +135,201 @@ class RENDERGATE_OT_new_job(Operator, AsyncModalOperatorMixin):
         upload_urls: list[str] = upload_data.get("uploadUrls", [])
         complete_url: str = upload_data.get("completeUrl")
 
-        # multipart upload
-        props.create_job_progress_text = "20% - Uploading Blend-file..."
-        await progress(props, "create_job_progress", 0.2, context)
-
-        MB: int = 2**20
-        min_part_size: int = 10 * MB  # actual min: 5MB
-        part_count: int = len(upload_urls)
-        part_size: int = math.ceil(props.blend_file_size / part_count)
-        upload_step: float = 0.6 / part_count
-        if part_size < min_part_size:
-            part_count = math.ceil(props.blend_file_size / min_part_size)
-            part_size = min_part_size
-
-        rendergate_logger.info(
-            f"Uploading blend-file in {part_count} parts each {part_size} bytes."
+        # remember the upload, so it can be resumed if it gets interrupted
+        manifest: upload.UploadManifest = upload.UploadManifest.create(
+            job_id=job_id,
+            upload_id=upload_id,
+            file_path=blend_file_path,
+            upload_urls=upload_urls,
+            complete_url=complete_url,
         )
+        manifest.save()
 
-        entity_tags: list[str | None] = [None for _ in range(part_count)]
-        with open(props.blend_file_path, "rb") as f:
-            for i, upload_url in enumerate(upload_urls[:part_count]):
+        await self._upload_blend_file(context, manifest)
 
-                props.create_job_progress_text = f"{math.floor((props.create_job_progress + upload_step)*100)}% - Uploading Blend-file..."
-                await progress(
-                    props,
-                    "create_job_progress",
-                    props.create_job_progress + upload_step,
-                    context,
-                )
+    async def _upload_blend_file(
+        self, context: Context, manifest: upload.UploadManifest
+    ) -> None:
+        """Upload the missing parts of the blend-file and complete the upload."""
 
-                f.seek(i * min_part_size)
-                segment: bytes = f.read(part_size)
+        task: Task = self.task
+        (upload_concurrency,) = await get_properties(context, "upload_concurrency")
 
-                part_response: Response | None = await rest_client.request(
-                    url=upload_url,
-                    payload=segment,
-                    request="PUT",
-                )
+        # multipart upload
+        await progress(
+            task,
+            "progress",
+            0.2,
+            context,
+            text="20% - Uploading Blend-file...",
+        )
 
-                # error occured
-                if isinstance(part_response, str):
-                    await progress(props, "create_job_progress", 1.0, context)
-                    self._cleanup(context)
-                    self.report({"ERROR"}, part_response)
-                    self.quit()
-                    return
+        rendergate_logger.info(
+            f"Uploading {len(manifest.missing_parts)} of {len(manifest.parts)} "
+            f"blend-file parts, {upload_concurrency} at the same time."
+        )
 
-                entity_tags[i] = part_response.headers["ETag"]
+        # uploading is between 20% and 80%
+        upload_progress: ProgressChannel = ProgressChannel(
+            task,
+            context,
+            label="Upload blend-file",
+            start=0.2,
+            end=0.8,
+            done=manifest.uploaded_bytes,
+        )
 
-                rendergate_logger.info(f"Part: {i} - {len(segment)} bytes")
+        def part_uploaded(index: int, entity_tag: str) -> None:
+            # persist every finished part
+            manifest.save()
+
+        entity_tags: list[str] | str = await upload.upload_parts(
+            file_path=manifest.file_path,
+            upload_urls=manifest.upload_urls,
+            parts=manifest.parts,
+            concurrency=upload_concurrency,
+            progress_callback=upload_progress.update,
+            entity_tags=manifest.entity_tags,
+            part_callback=part_uploaded,
+        )
 
-        # completing upload
-        props.create_job_progress_text = f"80% - Finishing Upload..."
-        await progress(props, "create_job_progress", 0.8, context)
+        # error occured
+        if isinstance(entity_tags, str):
+            # only promise to resume, if the upload URLs can still be used
+            if entity_tags.startswith(upload.URLS_EXPIRED) or manifest.urls_expired():
+                manifest.delete()
+                await report(
+                    self, {"ERROR"}, f"{entity_tags}\nPlease create the job again."
+                )
+            else:
+                await report(
+                    self, {"ERROR"}, f"{entity_tags}\nYou can resume the upload later."
+                )
+            self.quit()
+            return
 
-        complete_body: str = (
-            '<CompleteMultipartUpload xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+        # completing upload
+        await progress(
+            task, "progress", 0.8, context, text="80% - Finishing Upload..."
         )
-        for i, entity_tag in enumerate(entity_tags):
-            complete_body += f"<Part><PartNumber>{i + 1}</PartNumber><ETag>{entity_tag}</ETag></Part>"
-        complete_body += "</CompleteMultipartUpload>"
 
         complete_resp: Response | None = await rest_client.request(
-            url=complete_url,
-            payload=complete_body,
+            url=manifest.complete_url,
+            payload=upload.complete_multipart_body(entity_tags),
             request="POST-DATA",
         )
         # error occured
         if isinstance(complete_resp, str):
-            await progress(props, "create_job_progress", 1.0, context)
-            self._cleanup(context)
-            self.report({"ERROR"}, complete_resp)
+            await report(self, {"ERROR"}, complete_resp)
             self.quit()
             return
 
         if complete_resp.status_code == 200:
             rendergate_logger.info("Blend-file uploaded.")
+            manifest.delete()
         else:
-            await progress(props, "create_job_progress", 1.0, context)
             rendergate_logger.info(f"Upload: {complete_resp.status_code}")
-            self._cleanup(context)
-            self.report(
-                {"WARNING"}, "Could not upload Blend-File, please check online."
+            await report(
+                self, {"WARNING"}, "Could not upload Blend-File, please check online."
             )
             self.quit()
             return
 
-        # needs to be last,
-        # because the self.quit() in the other async_execute also quits this method
-        props.create_job_progress_text = "90% - Updating Job List..."
-        await progress(props, "create_job_progress", 0.9, context)
+        await progress(
+            task,
+            "progress",
+            0.9,
+            context,
+            text="90% - Updating Job List...",
+        )
         try:
-            # pass self as None,
-            # so self.quit() in get_jobs.async_execute doesn't also quit this async method here
-            await RENDERGATE_OT_get_jobs.async_execute(None, context, {})
+            await RENDERGATE_OT_get_jobs.update_job_list(context)
         except Exception as e:
             rendergate_logger.error(f"{repr(e)}")
         else:
-            jobs.set_selected_render_job(context, job_id)
+            await run_in_main_thread(
+                jobs.set_selected_render_job, context, manifest.job_id
+            )
 
-        props.create_job_progress_text = "100% - Job created"
-        await progress(props, "create_job_progress", 0.999, context, sleep=1)
-        await progress(props, "create_job_progress", 1.0, context)
-        self._cleanup(context)
-        self.report({"INFO"}, "New job created.")
+        await progress(
+            task,
+            "progress",
+            0.999,
+            context,
+            sleep=1,
+            text="100% - Job created",
+        )
+        await report(self, {"INFO"}, "New job created.")
         self.quit()
         return
 
 
+@class_to_register
+class RENDERGATE_OT_resume_upload(RENDERGATE_OT_new_job):
+    bl_idname = "rendergate.resume_upload"
+    bl_label = "Resume Upload"
+    bl_description = ""
+    bl_options = {"REGISTER", "INTERNAL"}
+
+    @classmethod
+    def poll(cls, context: Context):
+        """Enable the operator if there is an unfinished upload of this blend-file."""
+
+        if tasks.is_running(tasks.upload_resource(bpy.data.filepath)):
+            return False
+        manifest: upload.UploadManifest | None = upload.find_manifest(
+            bpy.data.filepath
+        )
+        return manifest is not None and not manifest.urls_expired()
+
+    @classmethod
+    def description(cls, context: Context, properties: RendergateProperties):
+        """Change operator description depending on required fields."""
+
+        if tasks.is_running(tasks.upload_resource(bpy.data.filepath)):
+            return "Wait until the upload of this blend-file is finished"
+        else:
+            return "Upload only the missing parts of the interrupted blend-file upload"
+
+    @catch_exception(RENDERGATE_OT_new_job._cleanup)
+    async def async_execute(self, context: Context, context_pointers: dict[str, Any]):
+        """Resume the interrupted upload of this blend-file."""
+
+        task: Task = self.task
+        await progress(task, "progress", 0.1, context, text="10% - Resuming Upload...")
+
+        blend_file_path: str = await run_in_main_thread(lambda: bpy.data.filepath)
+        manifest: upload.UploadManifest | None = upload.find_manifest(blend_file_path)
+        if manifest is None:
+            await report(self, {"WARNING"}, "No interrupted upload found.")
+            self.quit()
+            return
+
+        # parts of a changed file can't be combined with the uploaded parts
+        if not manifest.matches_file():
+            manifest.delete()
+            await report(
+                self,
+                {"WARNING"},
+                "The blend-file changed since the upload started, please create a new job.",
+            )
+            self.quit()
+            return
+
+        # the presigned upload URLs expired, rendergate.ch has to create new ones
+        if manifest.urls_expired():
+            manifest.delete()
+            await report(
+                self,
+                {"WARNING"},
+                f"{upload.URLS_EXPIRED} Please create the job again.",
+            )
+            self.quit()
+            return
+
+        await self._upload_blend_file(context, manifest)
+
+
 @class_to_register
 class RENDERGATE_OT_invoke_new_job(Operator):
     bl_idname: str = "rendergate.invoke_new_job"
@@ -247,9 +345,7 @@ class RENDERGATE_OT_invoke_new_job(Operator):
 
         props: RendergateProperties = context.scene.rendergate_properties
 
-        if props.async_op_running:
-            return "Wait until other Rendergate addon operation is finished"
-        elif props.create_job_progress < 1.0:
+        if tasks.is_running(tasks.upload_resource(bpy.data.filepath)):
             return "Creating project.."
         elif not is_string_blank(props.job_name):
             return "Create a new job under the specified project name"
@@ -261,9 +357,9 @@ class RENDERGATE_OT_invoke_new_job(Operator):
         """Enable the operator if all required fields are filled in."""
 
         props: RendergateProperties = context.scene.rendergate_properties
-        if props.async_op_running:
+        if tasks.is_running(tasks.upload_resource(bpy.data.filepath)):
             return False
-        return not is_string_blank(props.job_name) and props.create_job_progress == 1.0
+        return not is_string_blank(props.job_name)
 
     def invoke(self, context: Context, event: Event):
         """This extra operator is necessary to trigger the async operator."""
@@ -286,7 +382,7 @@ class RENDERGATE_OT_invoke_new_job(Operator):
         layout.use_property_decorate = False
 
         prerequisites: dict[str, bool] = {
-            "Logged into Rendergate": bool(props.aws_token),
+            "Logged into Rendergate": session.is_logged_in(),
             "Blend-File Saved": bpy.data.is_saved,
             "Current Changes Saved": bpy.data.is_saved and not bpy.data.is_dirty,
             "External Resources Packed": bpy.data.use_autopack,
@@ -13,21 +13,29 @@
 
 
 import bpy
-from typing import Any
-from requests import Response  # requests is included in Blender 4.4
-from ..utils.async_loop import AsyncModalOperatorMixin
+from typing import Any, TYPE_CHECKING
+from ..utils.async_loop import AsyncModalOperatorMixin, run_in_main_thread
 from bpy.types import Operator, Context, UILayout, Event
 from ..utils.utils import (
     class_to_register,
     catch_exception,
     progress,
+    redraw,
+    get_properties,
+    report,
 )
-from ..data import jobs
-from ..utils import rest_client
+from ..data import jobs, job_poll, session
+from ..utils import rest_client, tasks, auth
+from ..utils.tasks import Task
+from ..utils.retry import NO_RETRY
 from ..utils.models import Job
 from ..utils.global_vars import rendergate_logger
 from ..properties.properties import RendergateProperties
 
+# only for type hints, httpx is imported on first use
+if TYPE_CHECKING:
+    from httpx import Response
+
 
 @class_to_register
 class RENDERGATE_OT_render(Operator, AsyncModalOperatorMixin):
@@ -36,60 +44,78 @@ class RENDERGATE_OT_render(Operator, AsyncModalOperatorMixin):
     bl_description = ""
     bl_options = {"REGISTER", "INTERNAL"}
 
+    def new_task(self, context: Context) -> Task | None:
+        """Rendering conflicts only with rendering the same job."""
+
+        selected_job: Job | None = jobs.get_selected_render_job(context)
+        if selected_job is None:
+            return None
+        return Task(
+            resource=tasks.render_resource(selected_job.identifier),
+            label=f"Rendering {selected_job.name}",
+            job_id=selected_job.identifier,
+        )
+
     def _cleanup(self, context: Context, context_pointers: dict[str, Any] = {}) -> None:
         """Cleanup on uncaught exceptions of async operator."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
-        props.render_job_progress = 1.0
-        props.async_op_running = False
-        context.area.tag_redraw()
+        redraw(context)
 
     @catch_exception(_cleanup)
     async def async_execute(self, context: Context, context_pointers: dict[str, Any]):
         """Render the job on Rendergate.ch."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
-        props.async_op_running = True
+        task: Task | None = self.task
+        if task is None:
+            await report(self, {"WARNING"}, "No render job selected.")
+            self.quit()
+            return
 
-        props.render_job_progress_text = "10% - Sending..."
-        await progress(props, "render_job_progress", 0.1, context)
+        await progress(task, "progress", 0.1, context, text="10% - Sending...")
 
-        selected_job: Job = jobs.get_selected_render_job(context)
-
-        headers: dict = {"auth": props.aws_token}
+        api_url, render_credits = await get_properties(
+            context, "rendergate_api_url", "render_credits"
+        )
+        headers: dict = {"auth": await auth.ensure_token()}
         payload: dict = {
             "fromBeginning": True,
-            "chips": float(props.render_credits),
+            "chips": float(render_credits),
         }
 
-        # render the job
+        # render the job, never retried so the job can't get paid twice
         response: Response | None = await rest_client.request(
-            url=f"{props.rendergate_api_url}/project/{selected_job.identifier}/startPay",
+            url=f"{api_url}/project/{task.job_id}/startPay",
             headers=headers,
             payload=payload,
             request="POST",
+            retry=NO_RETRY,
         )
 
         # error occured
         if isinstance(response, str):
-            await progress(props, "render_job_progress", 1.0, context)
             if response.startswith("Token expired"):
-                props.aws_token = ""
-                self.report({"INFO"}, response)
+                session.log_out()
+                await report(self, {"INFO"}, response)
             else:
-                self.report({"ERROR"}, response)
-            self._cleanup(context)
+                await report(self, {"ERROR"}, response)
             self.quit()
             return
 
         response_json: dict = response.json()
         rendergate_logger.info(f"Render started {response_json}")
 
-        props.render_job_progress_text = "100% - Job rendering"
-        await progress(props, "render_job_progress", 0.999, context, sleep=1)
-        await progress(props, "render_job_progress", 1.0, context)
-        self._cleanup(context)
-        self.report({"INFO"}, "Job rendering.")
+        # show when the job starts and finishes rendering
+        await run_in_main_thread(job_poll.poll_soon, task.job_id)
+
+        await progress(
+            task,
+            "progress",
+            0.999,
+            context,
+            sleep=1,
+            text="100% - Job rendering",
+        )
+        await report(self, {"INFO"}, "Job rendering.")
         self.quit()
         return
 
@@ -105,13 +131,11 @@ class RENDERGATE_OT_invoke_render(Operator):
     def poll(cls, context: Context):
         """Enable the operator if the job is ready to render."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
-
         selected_job: Job = jobs.get_selected_render_job(context)
 
-        if props.async_op_running:
-            return False
         if selected_job is not None:
+            if tasks.is_running(tasks.render_resource(selected_job.identifier)):
+                return False
             return True if selected_job.stage in ["UPLOADED"] else False
         else:
             return False
@@ -120,12 +144,14 @@ class RENDERGATE_OT_invoke_render(Operator):
     def description(cls, context: Context, properties):
         """Change operator description depending on required fields."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
+        selected_job: Job = jobs.get_selected_render_job(context)
 
         if cls.poll(context):
             return f"Pay and render the selected job on rendergate.ch"
-        elif props.async_op_running:
-            return "Please wait until other Rendergate addon operation is finished"
+        elif selected_job is not None and tasks.is_running(
+            tasks.render_resource(selected_job.identifier)
+        ):
+            return "Please wait until the render of this job is started"
         else:
             return (
                 f"Render job is not ready to render yet, or has been rendered already"
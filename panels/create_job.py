@@ -14,10 +14,16 @@
 
 import bpy
 from bpy.types import Panel, Context, UILayout
-from .panel import RendergatePanel
+from .panel import RendergatePanel, draw_task_progress
 from ..utils.utils import class_to_register
+from ..data import session
 from ..properties.properties import RendergateProperties
-from ..operators.new_job import RENDERGATE_OT_invoke_new_job
+from ..utils import upload, tasks
+from ..utils.tasks import Task
+from ..operators.new_job import (
+    RENDERGATE_OT_invoke_new_job,
+    RENDERGATE_OT_resume_upload,
+)
 
 
 @class_to_register
@@ -40,9 +46,7 @@ class RENDERGATE_PT_create_job(RendergatePanel, Panel):
     def poll(cls, context: Context):
         """Show panel only if user is logged in and online access is allowed."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
-
-        return bpy.app.online_access and props.aws_token
+        return bpy.app.online_access and session.is_logged_in()
 
     def draw(self, context: Context):
         """Show UI for creating a new job."""
@@ -56,20 +60,27 @@ class RENDERGATE_PT_create_job(RendergatePanel, Panel):
         # create new project
         project_settings: UILayout = layout.column(align=True)
         project_settings.prop(data=props, property="job_name")
+        project_settings.prop(data=props, property="upload_concurrency")
         # project_settings.prop(data=props, property="project_name")
         new_job: UILayout = layout.row(align=True)
-        if props.create_job_progress < 1.0:
-            # fix for Blender display bug
-            progress_sandbox: UILayout = new_job.row(align=True)
-            progress_sandbox.separator(factor=0)
-            progress_sandbox.progress(
-                factor=props.create_job_progress,
-                type="BAR",
-                text=props.create_job_progress_text,
-            )
+        upload_task: Task | None = tasks.get_task(
+            tasks.upload_resource(bpy.data.filepath)
+        )
+        if upload_task is not None:
+            draw_task_progress(new_job, upload_task)
         else:
             new_job.operator(
                 operator=RENDERGATE_OT_invoke_new_job.bl_idname, icon="ADD"
             )
+            # an upload of this blend-file was interrupted
+            if upload.find_manifest(bpy.data.filepath) is not None:
+                new_job.operator(
+                    operator=RENDERGATE_OT_resume_upload.bl_idname, icon="RECOVER_LAST"
+                )
+
+        # uploads of other blend-files that were opened before
+        for task in tasks.get_tasks(tasks.UPLOAD):
+            if task is not upload_task:
+                draw_task_progress(layout.column(align=True), task, show_label=True)
 
         layout.separator()
@@ -13,13 +13,15 @@
 
 
 import bpy
-import humanize
 from decimal import Decimal
 from datetime import timedelta
 from bpy.types import Panel, Context, UILayout
-from .panel import RendergatePanel
+from .panel import RendergatePanel, draw_task_progress
 from ..utils.utils import class_to_register
+from ..data import session
 from ..utils.models import Job
+from ..utils import tasks
+from ..utils.tasks import Task
 from ..data import jobs
 from ..properties.properties import RendergateProperties
 from ..operators.get_jobs import RENDERGATE_OT_get_jobs
@@ -51,9 +53,7 @@ class RENDERGATE_PT_manage_job(RendergatePanel, Panel):
     def poll(cls, context: Context):
         """Show panel only if user is logged in and online access is allowed."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
-
-        return bpy.app.online_access and props.aws_token
+        return bpy.app.online_access and session.is_logged_in()
 
     def draw(self, context: Context):
         """
@@ -70,7 +70,9 @@ class RENDERGATE_PT_manage_job(RendergatePanel, Panel):
         jobs_row: UILayout = container.row(align=True)
         jobs_row.scale_y = 1.2
         jobs_row.prop(data=props, property="jobs", text="")
-        get_jobs_icon: str = "SORTTIME" if props.getting_jobs else "FILE_REFRESH"
+        get_jobs_icon: str = (
+            "SORTTIME" if tasks.is_running(tasks.JOBS) else "FILE_REFRESH"
+        )
         refresh_op: UILayout = jobs_row.row(align=True)
         refresh_op.scale_x = 1.2
         refresh_op.operator(
@@ -95,6 +97,8 @@ class RENDERGATE_PT_manage_job(RendergatePanel, Panel):
                     icon="TAG",
                 )
             if selected_job.time_estimation > Decimal("0.00"):
+                import humanize
+
                 delta: timedelta = timedelta(milliseconds=selected_job.time_estimation)
                 job_details.label(
                     text=f"Time Estimation: {humanize.precisedelta(delta, minimum_unit='minutes')}",
@@ -127,15 +131,13 @@ class RENDERGATE_PT_manage_job(RendergatePanel, Panel):
 
         # render
         render: UILayout = buttons.row(align=True)
-        if props.render_job_progress < 1.0:
-            # fix for Blender display bug
-            progress_sandbox: UILayout = render.row(align=True)
-            progress_sandbox.separator(factor=0)
-            progress_sandbox.progress(
-                factor=props.render_job_progress,
-                type="BAR",
-                text=props.render_job_progress_text,
+        render_task: Task | None = None
+        if selected_job:
+            render_task = tasks.get_task(
+                tasks.render_resource(selected_job.identifier)
             )
+        if render_task is not None:
+            draw_task_progress(render, render_task)
         else:
             render.operator(
                 operator=RENDERGATE_OT_invoke_render.bl_idname,
@@ -144,21 +146,25 @@ class RENDERGATE_PT_manage_job(RendergatePanel, Panel):
 
         # download render results
         download: UILayout = buttons.row(align=True)
-        if props.download_job_progress < 1.0:
-            # fix for Blender display bug
-            progress_sandbox: UILayout = download.row(align=True)
-            progress_sandbox.separator(factor=0)
-            progress_sandbox.progress(
-                factor=props.download_job_progress,
-                type="BAR",
-                text=props.download_job_progress_text,
+        download_task: Task | None = None
+        if selected_job:
+            download_task = tasks.get_task(
+                tasks.download_resource(selected_job.identifier)
             )
+        if download_task is not None:
+            draw_task_progress(download, download_task)
         else:
             download.operator(
                 operator=RENDERGATE_OT_download.bl_idname,
                 icon="RENDER_RESULT",
             )
 
+        # renders and downloads of the other jobs
+        for task in tasks.get_tasks():
+            if task.job_id is None or task in (render_task, download_task):
+                continue
+            draw_task_progress(layout.column(align=True), task, show_label=True)
+
         download_folder_row: UILayout = layout.row(align=True)
         download_folder_row.prop(
             data=props,
@@ -15,6 +15,9 @@
 import bpy
 from bpy.types import Panel, Context, UILayout
 from ..utils.utils import class_to_register
+from ..data import session
+from ..utils import tasks
+from ..utils.tasks import Task
 from ..properties.properties import RendergateProperties
 from ..operators.login import RENDERGATE_OT_login
 from ..operators.new_job import RENDERGATE_OT_invoke_new_job
@@ -30,6 +33,21 @@ class RendergatePanel:
     bl_options = {"DEFAULT_CLOSED"}
 
 
+def draw_task_progress(layout: UILayout, task: Task, show_label: bool = False) -> None:
+    """Draw the progress bar of a running task."""
+
+    if show_label:
+        layout.label(text=task.label)
+    # fix for Blender display bug
+    progress_sandbox: UILayout = layout.row(align=True)
+    progress_sandbox.separator(factor=0)
+    progress_sandbox.progress(
+        factor=task.progress,
+        type="BAR",
+        text=task.progress_text,
+    )
+
+
 @class_to_register
 class RENDERGATE_PT_rendergate(RendergatePanel, Panel):
     """
@@ -44,9 +62,7 @@ class RENDERGATE_PT_rendergate(RendergatePanel, Panel):
     def draw_header(self, context: Context):
         """Show green logged in status if user is logged in."""
 
-        props: RendergateProperties = context.scene.rendergate_properties
-
-        if props.aws_token:
+        if session.is_logged_in():
 
             layout: UILayout = self.layout
             split = layout.split(factor=1 / 5)
@@ -80,9 +96,13 @@ class RENDERGATE_PT_rendergate(RendergatePanel, Panel):
             return
 
         # not logged in yet
-        if not props.aws_token:
+        if not session.is_logged_in():
             layout.prop(data=props, property="username")
             layout.prop(data=props, property="password")
 
-            layout.operator(operator=RENDERGATE_OT_login.bl_idname)
+            login_task: Task | None = tasks.get_task(tasks.LOGIN)
+            if login_task is not None:
+                draw_task_progress(layout.row(align=True), login_task)
+            else:
+                layout.operator(operator=RENDERGATE_OT_login.bl_idname)
             return
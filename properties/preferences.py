@@ -0,0 +1,79 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+# pyright: reportInvalidTypeForm=false
+
+import bpy
+from bpy.types import AddonPreferences, Context, UILayout
+from bpy.props import BoolProperty
+from ..utils.utils import class_to_register
+from ..data import credentials
+
+# preferences belong to the root package of the addon
+ADDON_PACKAGE: str = __package__.rpartition(".")[0]
+
+
+def _update_remember_login(self, context: Context) -> None:
+    """Forget the saved login when it shouldn't be remembered anymore."""
+
+    if not self.remember_login:
+        credentials.delete_credentials()
+
+
+@class_to_register
+class RendergatePreferences(AddonPreferences):
+    bl_idname = ADDON_PACKAGE
+
+    remember_login: BoolProperty(
+        name="Stay Logged In",
+        description=(
+            "Save the login outside of the blend-file, "
+            "so you're logged in when Blender starts. The password is never saved"
+        ),
+        default=True,
+        update=_update_remember_login,
+    )
+
+    encrypt_login: BoolProperty(
+        name="Encrypt Saved Login",
+        description="Encrypt the saved login with your Windows account",
+        default=True,
+    )
+
+    auto_download: BoolProperty(
+        name="Download Finished Jobs",
+        description=(
+            "Download a render job to the download folder of the scene "
+            "as soon as it finished rendering, while Blender is open"
+        ),
+        default=False,
+    )
+
+    def draw(self, context: Context):
+        """Show the preferences of the addon."""
+
+        layout: UILayout = self.layout
+        layout.prop(self, "remember_login")
+        encrypt: UILayout = layout.row()
+        encrypt.enabled = self.remember_login and credentials.can_encrypt()
+        encrypt.prop(self, "encrypt_login")
+        layout.prop(self, "auto_download")
+
+
+def get_preferences(context: Context | None = None) -> RendergatePreferences:
+    """The preferences of the addon. Must be called in the main thread."""
+
+    context = context or bpy.context
+    return context.preferences.addons[ADDON_PACKAGE].preferences
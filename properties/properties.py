@@ -18,24 +18,16 @@ from bpy.types import PropertyGroup
 from bpy.props import (
     StringProperty,
     IntProperty,
-    BoolProperty,
     EnumProperty,
-    FloatProperty,
 )
 from ..utils.utils import class_to_register
+from ..utils.upload import DEFAULT_UPLOAD_CONCURRENCY, MAX_UPLOAD_CONCURRENCY
 from .property_updates import RendergatePropertyUpdates
 
 
 @class_to_register
 class RendergateProperties(PropertyGroup):
 
-    async_op_running: BoolProperty(
-        name="Async Operator Running",
-        description="If an asynchronous bpy operator is currently running",
-        default=False,
-        options={"HIDDEN"},
-    )
-
     username: StringProperty(
         name="Username",
         description="Your Rendergate username (e-mail address)",
@@ -44,6 +36,7 @@ class RendergateProperties(PropertyGroup):
     password: StringProperty(
         name="Password",
         description="Your Rendergate login password",
+        subtype="PASSWORD",
     )
 
     rendergate_api_url: StringProperty(
@@ -53,13 +46,6 @@ class RendergateProperties(PropertyGroup):
         options={"HIDDEN"},
     )
 
-    aws_token: StringProperty(
-        name="AWS Token",
-        description="The token we get when loggin into AWS Cognito.",
-        default="",
-        options={"HIDDEN"},
-    )
-
     blend_file_path: StringProperty(
         name="Blend File Path",
         description="The absolute path of the blend-file.",
@@ -93,11 +79,12 @@ class RendergateProperties(PropertyGroup):
         default="",
     )
 
-    getting_jobs: BoolProperty(
-        name="Getting Jobs",
-        description="If we are currently getting the render jobs from rendergate.ch",
-        default=False,
-        options={"HIDDEN"},
+    upload_concurrency: IntProperty(
+        name="Parallel Uploads",
+        description="How many parts of the blend-file are uploaded at the same time",
+        default=DEFAULT_UPLOAD_CONCURRENCY,
+        min=1,
+        max=MAX_UPLOAD_CONCURRENCY,
     )
 
     jobs: EnumProperty(
@@ -107,42 +94,6 @@ class RendergateProperties(PropertyGroup):
         default=0,
     )
 
-    jobs_dict: StringProperty(
-        name="Jobs",
-        description="The internal representation of the jobs, with all information",
-        default="[]",
-    )
-
-    create_job_progress: FloatProperty(
-        soft_min=0.0,
-        soft_max=1.0,
-        min=0.0,
-        max=1.0,
-        default=1.0,
-    )
-
-    create_job_progress_text: StringProperty()
-
-    download_job_progress: FloatProperty(
-        soft_min=0.0,
-        soft_max=1.0,
-        min=0.0,
-        max=1.0,
-        default=1.0,
-    )
-
-    download_job_progress_text: StringProperty()
-
-    render_job_progress: FloatProperty(
-        soft_min=0.0,
-        soft_max=1.0,
-        min=0.0,
-        max=1.0,
-        default=1.0,
-    )
-
-    render_job_progress_text: StringProperty()
-
     render_credits: StringProperty(
         name="Render Credits",
         description="Your rendergate.ch render credit balance. You can add more on rendergate.ch",
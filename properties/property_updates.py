@@ -12,9 +12,18 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
+import time
 from bpy.types import Context
-from ..utils.models import Job
+from ..utils.models import Job, TEXT_TTL
 from ..data import jobs
+from ..utils import tasks
+
+# The enum items of the jobs dropdown, and for which state they were created.
+# Blender asks for the items on every draw, so they are only recreated if
+# the jobs changed or the texts are outdated. Keeping a reference to the list
+# also prevents Blender from showing garbage collected strings.
+_job_items: list[tuple[str, str, str, int]] = []
+_job_items_key: tuple[int, bool, int] | None = None
 
 
 class RendergatePropertyUpdates:
@@ -22,35 +31,40 @@ class RendergatePropertyUpdates:
     def create_job_list(self, context: Context):
         """Create the enum list to show jobs in a dropdown."""
 
-        from .properties import RendergateProperties
+        global _job_items, _job_items_key
+
+        getting_jobs: bool = tasks.is_running(tasks.JOBS)
 
-        props: RendergateProperties = context.scene.rendergate_properties
+        items_key: tuple[int, bool, int] = (
+            jobs.get_version(),
+            getting_jobs,
+            int(time.monotonic() // TEXT_TTL),
+        )
+        if items_key == _job_items_key:
+            return _job_items
 
         enums: list[tuple[str, str, str, int]] = []
 
         for job in jobs.get_jobs():
             if not isinstance(job, Job):
                 continue
-            # make tuple for enum
-            enums.append(
-                (
-                    job.identifier,
-                    job.display_name,
-                    job.description,
-                    job.number,
-                )
-            )
+            # tuple for enum
+            enums.append(job.enum_item)
 
         if len(enums) == 0:
-            if props.getting_jobs:
+            if getting_jobs:
                 enums = [("0", "Loading...", "Loading...", 0)]
             else:
                 enums = [
                     (
                         "0",
                         "Please Refresh ->",
-                        "Please refresh the jobs with the button on the right of this list",0
+                        "Please refresh the jobs with the button on the right of this list",
+                        0,
                     )
                 ]
 
-        return enums
+        _job_items = enums
+        _job_items_key = items_key
+
+        return _job_items
@@ -0,0 +1,69 @@
+import support
+
+support.setup_paths()
+support.import_addon()
+
+import bpy
+import httpx
+import pytest
+from types import SimpleNamespace
+from rendergate.utils import rest_client, tasks, utils
+from rendergate.properties.preferences import ADDON_PACKAGE
+from rendergate.data import jobs, job_sync, job_events, job_poll, session
+
+
+@pytest.fixture(autouse=True)
+def clean_state(tmp_path):
+    """Every test starts logged out, without jobs, tasks or timers."""
+
+    bpy.utils.user_dir = str(tmp_path)
+    utils.init_user_dir()
+    bpy.app.timers.registered.clear()
+    bpy.context.area = None
+    bpy.context.scene = SimpleNamespace(
+        rendergate_properties=SimpleNamespace(
+            rendergate_api_url="https://api.test",
+            download_folder=str(tmp_path),
+            username="",
+            jobs="",
+        )
+    )
+    bpy.context.preferences = SimpleNamespace(
+        addons={
+            ADDON_PACKAGE: SimpleNamespace(
+                preferences=SimpleNamespace(
+                    remember_login=False, encrypt_login=True, auto_download=False
+                )
+            )
+        }
+    )
+    rest_client._circuit_breakers.clear()
+
+    yield
+
+    job_events.stop_events()
+    job_poll.stop_polling()
+    session.log_out()
+    tasks.clear_tasks()
+    job_sync.set_account("")
+    jobs.set_jobs([])
+
+
+@pytest.fixture
+def mock_api():
+    """
+    Route the requests of the addon to a handler instead of the network.
+
+    Usage: `mock_api(handler)`, the handler gets a `httpx.Request`
+    and returns a `httpx.Response`, it can be async.
+    """
+
+    def install(handler) -> None:
+        for kind in rest_client.POOL_MAX_CONNECTIONS:
+            rest_client._clients[kind] = httpx.AsyncClient(
+                transport=httpx.MockTransport(handler)
+            )
+
+    yield install
+
+    rest_client.close_client()
@@ -0,0 +1,145 @@
+"""
+A local HTTP(S) server to stand in for rendergate.ch, for the tests that
+need real connections, e.g. to count handshakes or to stream events.
+"""
+
+
+import ssl
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable
+
+REASONS: dict[int, str] = {200: "OK", 304: "Not Modified", 404: "Not Found"}
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    headers: dict[str, str]
+    body: bytes
+
+
+@dataclass
+class Response:
+    status: int = 200
+    headers: dict[str, str] = field(default_factory=dict)
+    # a streamed body is sent until it ends, then the connection gets closed
+    body: bytes | AsyncIterator[bytes] = b""
+
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+class StandInServer:
+    """Serves the responses of an async handler, in its own thread and loop."""
+
+    def __init__(self, handler: Handler, ssl_context: ssl.SSLContext | None = None):
+        self.handler: Handler = handler
+        self.ssl_context: ssl.SSLContext | None = ssl_context
+        # how many connections were opened, e.g. to count handshakes
+        self.connections: int = 0
+        self.requests: list[Request] = []
+        self._loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        self._thread: threading.Thread | None = None
+        self._server: asyncio.Server | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def url(self) -> str:
+        port: int = self._server.sockets[0].getsockname()[1]
+        scheme: str = "https" if self.ssl_context else "http"
+        return f"{scheme}://127.0.0.1:{port}"
+
+    def start(self) -> "StandInServer":
+        started: threading.Event = threading.Event()
+
+        async def serve() -> None:
+            self._server = await asyncio.start_server(
+                self._serve, "127.0.0.1", 0, ssl=self.ssl_context
+            )
+            started.set()
+
+        def run() -> None:
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(serve())
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait(5)
+
+        return self
+
+    def stop(self) -> None:
+        async def close() -> None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            # end the streams that are still waiting for their next chunk
+            serving: set[asyncio.Task] = asyncio.all_tasks() - {asyncio.current_task()}
+            for task in serving:
+                task.cancel()
+            await asyncio.gather(*serving, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+    def drop_connections(self) -> None:
+        """Close all open connections, e.g. to interrupt a stream."""
+
+        def close() -> None:
+            for writer in list(self._writers):
+                writer.close()
+
+        self._loop.call_soon_threadsafe(close)
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    head: bytes = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = request_line.split(" ", 2)
+                headers: dict[str, str] = {}
+                for line in header_lines:
+                    if line:
+                        name, _, value = line.partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                body: bytes = await reader.readexactly(
+                    int(headers.get("content-length", 0))
+                )
+                request: Request = Request(method, path, headers, body)
+                self.requests.append(request)
+
+                response: Response = await self.handler(request)
+                reason: str = REASONS.get(response.status, "Status")
+                head_out: str = f"HTTP/1.1 {response.status} {reason}\r\n"
+                for name, value in response.headers.items():
+                    head_out += f"{name}: {value}\r\n"
+
+                if isinstance(response.body, bytes):
+                    head_out += f"Content-Length: {len(response.body)}\r\n\r\n"
+                    writer.write(head_out.encode("latin-1") + response.body)
+                    await writer.drain()
+                    continue
+
+                head_out += "Connection: close\r\n\r\n"
+                writer.write(head_out.encode("latin-1"))
+                async for chunk in response.body:
+                    writer.write(chunk)
+                    await writer.drain()
+                return
+        except (ConnectionError, asyncio.CancelledError):
+            return
+        finally:
+            self._writers.discard(writer)
+            writer.close()
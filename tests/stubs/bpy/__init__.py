@@ -0,0 +1,135 @@
+"""
+Stand-in of Blender's python API, to run the tests outside of Blender.
+
+Only has what the addon uses when it's imported and what the tests need.
+Timers don't run by themselves, the tests call them with `run_timers`.
+Like in Blender, the functions that need the main thread fail in other threads.
+"""
+
+
+import os
+import sys
+import tempfile
+import threading
+from types import ModuleType, SimpleNamespace
+
+
+def _main_thread_only(func):
+    def wrapper(*args, **kwargs):
+        if threading.current_thread() is not threading.main_thread():
+            raise RuntimeError(f"bpy {func.__name__} called outside the main thread")
+        return func(*args, **kwargs)
+
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+
+def _module(name: str) -> ModuleType:
+    module: ModuleType = ModuleType(f"bpy.{name}")
+    sys.modules[module.__name__] = module
+    return module
+
+
+# classes the addon subclasses or uses for type hints
+types: ModuleType = _module("types")
+for _name in (
+    "AddonPreferences",
+    "Area",
+    "Context",
+    "Event",
+    "Operator",
+    "Panel",
+    "PropertyGroup",
+    "Scene",
+    "UILayout",
+    "Window",
+    "WindowManager",
+):
+    setattr(types, _name, type(_name, (), {}))
+
+# properties are only declared in annotations
+props: ModuleType = _module("props")
+for _name in (
+    "BoolProperty",
+    "CollectionProperty",
+    "EnumProperty",
+    "FloatProperty",
+    "IntProperty",
+    "PointerProperty",
+    "StringProperty",
+):
+    setattr(props, _name, lambda *args, **kwargs: None)
+
+utils: ModuleType = _module("utils")
+utils.register_class = lambda cls: None
+utils.unregister_class = lambda cls: None
+utils.user_dir = tempfile.mkdtemp(prefix="rendergate-tests-")
+
+
+@_main_thread_only
+def extension_path_user(package: str, path: str = "", create: bool = False) -> str:
+    return os.path.join(utils.user_dir, path)
+
+
+@_main_thread_only
+def user_resource(resource_type: str, path: str = "", create: bool = False) -> str:
+    return os.path.join(utils.user_dir, path)
+
+
+utils.extension_path_user = extension_path_user
+utils.user_resource = user_resource
+
+app: ModuleType = _module("app")
+app.version = (4, 4, 0)
+app.online_access = True
+
+handlers: ModuleType = _module("app.handlers")
+handlers.persistent = lambda func: func
+handlers.load_post = []
+app.handlers = handlers
+
+timers: ModuleType = _module("app.timers")
+# the registered timer functions and their next interval
+timers.registered = {}
+
+
+@_main_thread_only
+def register(func, first_interval: float = 0.0, persistent: bool = False) -> None:
+    timers.registered[func] = first_interval
+
+
+@_main_thread_only
+def unregister(func) -> None:
+    timers.registered.pop(func)
+
+
+timers.register = register
+timers.is_registered = lambda func: func in timers.registered
+timers.unregister = unregister
+app.timers = timers
+
+
+def run_timers() -> None:
+    """Call every registered timer once, and unregister the ones that are done."""
+
+    for func in list(timers.registered):
+        interval = func()
+        if interval is None:
+            timers.registered.pop(func, None)
+        elif func in timers.registered:
+            timers.registered[func] = interval
+
+
+path: ModuleType = _module("path")
+path.abspath = lambda file_path: os.path.abspath(file_path)
+
+data = SimpleNamespace(
+    filepath="", is_saved=False, is_dirty=False, use_autopack=False
+)
+ops = SimpleNamespace()
+context = SimpleNamespace(
+    area=None,
+    scene=None,
+    preferences=None,
+    window_manager=SimpleNamespace(windows=[]),
+)
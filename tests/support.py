@@ -0,0 +1,105 @@
+"""
+Import the addon outside of Blender, with the stand-in of bpy
+and the dependencies from the wheels the extension ships with.
+"""
+
+
+import os
+import sys
+import glob
+import time
+import asyncio
+import importlib.util
+from types import ModuleType
+from typing import Any, Coroutine
+
+TESTS_DIR: str = os.path.dirname(os.path.abspath(__file__))
+ADDON_DIR: str = os.path.dirname(TESTS_DIR)
+# the package name of the addon, as installed by Blender
+ADDON_NAME: str = "rendergate"
+
+
+def setup_paths() -> None:
+    """Make the stand-in of bpy and the wheels importable."""
+
+    stubs_dir: str = os.path.join(TESTS_DIR, "stubs")
+    if stubs_dir not in sys.path:
+        sys.path.insert(0, stubs_dir)
+
+    # pure python wheels can be imported from the zip-file,
+    # installed packages take precedence
+    for wheel in sorted(glob.glob(os.path.join(ADDON_DIR, "wheels", "*.whl"))):
+        if wheel not in sys.path:
+            sys.path.append(wheel)
+
+
+def import_addon() -> ModuleType:
+    """Import the addon as the package `rendergate`."""
+
+    if ADDON_NAME in sys.modules:
+        return sys.modules[ADDON_NAME]
+
+    spec = importlib.util.spec_from_file_location(
+        ADDON_NAME,
+        os.path.join(ADDON_DIR, "__init__.py"),
+        submodule_search_locations=[ADDON_DIR],
+    )
+    addon: ModuleType = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_NAME] = addon
+    spec.loader.exec_module(addon)
+
+    return addon
+
+
+def run(coroutine: Coroutine, timeout: float = 10.0) -> Any:
+    """
+    Run a coroutine in the background loop of the addon and wait for its result.
+    Meanwhile this thread plays Blender's main thread and executes the queued calls.
+    """
+
+    from rendergate.utils import async_loop
+
+    future = asyncio.run_coroutine_threadsafe(coroutine, async_loop.get_loop())
+    deadline: float = time.monotonic() + timeout
+    while not future.done():
+        if time.monotonic() > deadline:
+            future.cancel()
+            raise TimeoutError(f"{coroutine} didn't finish in {timeout} seconds")
+        async_loop._drain_main_queue()
+        time.sleep(0.001)
+    async_loop._drain_main_queue()
+
+    return future.result()
+
+
+def drain(seconds: float = 0.0) -> None:
+    """Execute the calls queued for the main thread, for a while."""
+
+    from rendergate.utils import async_loop
+
+    deadline: float = time.monotonic() + seconds
+    while True:
+        async_loop._drain_main_queue()
+        if time.monotonic() >= deadline:
+            return
+        time.sleep(0.001)
+
+
+class FakeLayout:
+    """Stands in for a UILayout, every call returns another layout."""
+
+    def __getattr__(self, name: str):
+        return lambda *args, **kwargs: FakeLayout()
+
+
+def best_time(func, number: int, repeat: int = 5) -> float:
+    """The fastest of `repeat` runs of `number` calls, in seconds per call."""
+
+    best: float = float("inf")
+    for _ in range(repeat):
+        started: float = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - started) / number)
+
+    return best
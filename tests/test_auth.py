@@ -0,0 +1,68 @@
+import time
+import asyncio
+import pytest
+from support import run
+from rendergate.data import session
+from rendergate.utils import auth
+
+CHECK_INTERVAL: float = 0.05
+
+
+@pytest.fixture
+def keep_fresh(monkeypatch):
+    """Count the passes of the background refresh, with a short check interval."""
+
+    passes: list[float] = []
+
+    def expires_soon(*args) -> bool:
+        passes.append(time.monotonic())
+        return expires_soon_before(*args)
+
+    expires_soon_before = auth.expires_soon
+    monkeypatch.setattr(auth, "expires_soon", expires_soon)
+    monkeypatch.setattr(auth, "REFRESH_CHECK_INTERVAL", CHECK_INTERVAL)
+    yield passes
+    auth._keep_fresh_future.cancel()
+
+
+def test_unknown_expiry_is_checked_every_interval(keep_fresh):
+    session.log_in("user@test", "token", "refresh", expires_at=0.0)
+    auth.keep_token_fresh()
+
+    # the loop stays responsive, the refresh sleeps instead of spinning
+    run(asyncio.sleep(CHECK_INTERVAL * 4), timeout=2)
+
+    assert 2 <= len(keep_fresh) <= 6
+
+
+def test_token_is_refreshed_before_it_expires(keep_fresh, monkeypatch):
+    async def renew(refresh_token: str) -> str:
+        assert refresh_token == "refresh"
+        return "new token"
+
+    monkeypatch.setattr(auth, "renew", renew)
+    monkeypatch.setattr(auth, "token_expiry", lambda token: time.time() + 3600)
+    session.log_in("user@test", "token", "refresh", expires_at=time.time() + 10)
+    auth.keep_token_fresh()
+
+    run(asyncio.sleep(CHECK_INTERVAL * 4), timeout=2)
+
+    assert session.get_aws_token() == "new token"
+    assert 2 <= len(keep_fresh) <= 6
+
+
+def test_failed_refresh_is_retried_later(keep_fresh, monkeypatch):
+    attempts: list[str] = []
+
+    async def renew(refresh_token: str) -> str:
+        attempts.append(refresh_token)
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(auth, "renew", renew)
+    session.log_in("user@test", "token", "refresh", expires_at=time.time() + 10)
+    auth.keep_token_fresh()
+
+    run(asyncio.sleep(CHECK_INTERVAL * 4), timeout=2)
+
+    assert session.get_aws_token() == "token"
+    assert 2 <= len(attempts) <= 6
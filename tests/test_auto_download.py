@@ -0,0 +1,153 @@
+import time
+import asyncio
+import threading
+import pytest
+from typing import Callable
+from support import drain
+from rendergate.data import auto_download, jobs, job_sync, session
+from rendergate.properties.preferences import ADDON_PACKAGE
+from rendergate.utils import async_loop, download, tasks
+from rendergate.utils.models import Job
+import bpy
+
+
+class FakeDownloads:
+    """Stands in for downloading the jobs, they finish once released."""
+
+    def __init__(self):
+        self.job_ids: list[str] = []
+        self.running: int = 0
+        self.max_running: int = 0
+        self.release: threading.Event = threading.Event()
+
+    async def download_job(self, task, operator, job: Job, api_url, download_folder):
+        self.job_ids.append(job.identifier)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            while not self.release.is_set():
+                await asyncio.sleep(0.01)
+        finally:
+            self.running -= 1
+        return {"INFO"}, "Downloaded."
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    """Play Blender's main thread until the condition is met."""
+
+    deadline: float = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        drain(0.01)
+
+
+def is_downloading(job_id: str) -> bool:
+    return tasks.get_task(tasks.download_resource(job_id)) is not None
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    fake: FakeDownloads = FakeDownloads()
+    monkeypatch.setattr(download, "download_job", fake.download_job)
+    monkeypatch.setattr(auto_download, "_stages", {})
+    monkeypatch.setattr(auto_download, "_version", -1)
+    bpy.context.preferences.addons[ADDON_PACKAGE].preferences.auto_download = True
+    session.log_in("user@test", "token", "refresh")
+    yield fake
+    fake.release.set()
+
+
+def load_jobs(*stages: str) -> None:
+    job_data: list[dict] = [
+        {"id": f"job-{i}", "stage": stage} for i, stage in enumerate(stages)
+    ]
+    job_sync.load_state("user@test", {"jobs": job_data})
+
+
+def test_only_jobs_seen_before_finishing_are_downloaded(downloads):
+    load_jobs("RENDERING", "FINISHED", "PAYING", "RENDERING")
+    auto_download.check_jobs()
+
+    job_sync.apply_job("job-0", {"stage": "FINISHED"})
+    job_sync.apply_job("job-2", {"stage": "FINISHED"})
+    auto_download.check_jobs()
+    wait_for(lambda: len(downloads.job_ids) == 2)
+
+    # the job that was already done when the job list was received isn't
+    assert sorted(downloads.job_ids) == ["job-0", "job-2"]
+    assert is_downloading("job-0") and is_downloading("job-2")
+    assert not is_downloading("job-1") and not is_downloading("job-3")
+
+    downloads.release.set()
+    wait_for(lambda: not is_downloading("job-0") and not is_downloading("job-2"))
+
+
+def test_nothing_is_downloaded_if_disabled(downloads):
+    bpy.context.preferences.addons[ADDON_PACKAGE].preferences.auto_download = False
+    load_jobs("RENDERING")
+    auto_download.check_jobs()
+
+    job_sync.apply_job("job-0", {"stage": "FINISHED"})
+    auto_download.check_jobs()
+    drain(0.1)
+
+    assert not downloads.job_ids
+    assert not is_downloading("job-0")
+
+
+def test_a_downloading_job_is_not_downloaded_again(downloads):
+    load_jobs("FINISHED")
+    job: Job = jobs.get_job("job-0")
+    props = bpy.context.scene.rendergate_properties
+
+    auto_download._start_download(job, props.rendergate_api_url, props.download_folder)
+    auto_download._start_download(job, props.rendergate_api_url, props.download_folder)
+    wait_for(lambda: downloads.running == 1)
+    drain(0.1)
+
+    assert downloads.job_ids == ["job-0"]
+
+
+def test_downloads_wait_for_a_free_slot(downloads):
+    load_jobs(*["RENDERING"] * 4)
+    auto_download.check_jobs()
+    for i in range(4):
+        job_sync.apply_job(f"job-{i}", {"stage": "FINISHED"})
+    auto_download.check_jobs()
+
+    wait_for(lambda: downloads.running == auto_download.MAX_DOWNLOADS)
+    drain(0.1)
+    assert downloads.running == auto_download.MAX_DOWNLOADS
+    assert all(is_downloading(f"job-{i}") for i in range(4))
+
+    downloads.release.set()
+    wait_for(lambda: not any(is_downloading(f"job-{i}") for i in range(4)))
+    assert sorted(downloads.job_ids) == [f"job-{i}" for i in range(4)]
+    assert downloads.max_running == auto_download.MAX_DOWNLOADS
+
+
+def test_a_new_loop_gets_new_download_slots(downloads):
+    load_jobs(*["FINISHED"] * 6)
+    props = bpy.context.scene.rendergate_properties
+
+    def start_downloads(job_ids: list[str]) -> None:
+        for job_id in job_ids:
+            auto_download._start_download(
+                jobs.get_job(job_id), props.rendergate_api_url, props.download_folder
+            )
+
+    # a download waiting for a slot binds the slots to the loop
+    start_downloads(["job-0", "job-1", "job-2"])
+    wait_for(lambda: downloads.running == auto_download.MAX_DOWNLOADS)
+    drain(0.1)
+    assert "job-2" not in downloads.job_ids
+
+    async_loop.erase_async_loop()
+    tasks.clear_tasks()
+    assert downloads.running == 0
+
+    start_downloads(["job-3", "job-4", "job-5"])
+    wait_for(lambda: downloads.running == auto_download.MAX_DOWNLOADS)
+    downloads.release.set()
+    wait_for(lambda: not any(is_downloading(f"job-{i}") for i in range(3, 6)))
+    assert sorted(downloads.job_ids) == ["job-0", "job-1", "job-3", "job-4", "job-5"]
@@ -0,0 +1,135 @@
+import hmac
+import json
+import base64
+import hashlib
+import secrets
+import httpx
+import pytest
+from support import run
+from rendergate.utils import auth, cognito
+from rendergate.utils.cognito import BIG_N, G, SRP, _hex_hash, _hkdf, _pad_hex
+
+USERNAME: str = "user@test"
+USER_ID: str = "user-1"
+PASSWORD: str = "secret password"
+SALT: str = "5a1b"
+SECRET_BLOCK: bytes = b"secret block"
+REFRESH_TOKEN: str = "refresh token"
+
+
+class CognitoStandIn:
+    """
+    The InitiateAuth and RespondToAuthChallenge actions of a Cognito user pool,
+    that verify the password claim like Cognito does, with the SRP verifier.
+    """
+
+    def __init__(self):
+        self.pool_name: str = auth.USER_POOL_ID.split("_")[1]
+        password_hash: str = hashlib.sha256(
+            f"{self.pool_name}{USER_ID}:{PASSWORD}".encode()
+        ).hexdigest()
+        x: int = int(_hex_hash(_pad_hex(SALT) + password_hash), 16)
+        self.verifier: int = pow(G, x, BIG_N)
+        self.actions: list[str] = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        action: str = request.headers["X-Amz-Target"].rpartition(".")[2]
+        body: dict = json.loads(request.content)
+        self.actions.append(action)
+        assert body["ClientId"] == auth.USER_POOL_WEB_CLIENT_ID
+
+        if action == "InitiateAuth" and body["AuthFlow"] == "USER_SRP_AUTH":
+            assert body["AuthParameters"]["USERNAME"] == USERNAME
+            self.large_a = int(body["AuthParameters"]["SRP_A"], 16)
+            self.small_b = secrets.randbits(1024)
+            self.large_b = (SRP.K * self.verifier + pow(G, self.small_b, BIG_N)) % BIG_N
+            return httpx.Response(
+                200,
+                json={
+                    "ChallengeName": "PASSWORD_VERIFIER",
+                    "ChallengeParameters": {
+                        "USER_ID_FOR_SRP": USER_ID,
+                        "SALT": SALT,
+                        "SRP_B": f"{self.large_b:x}",
+                        "SECRET_BLOCK": base64.b64encode(SECRET_BLOCK).decode(),
+                    },
+                },
+            )
+
+        if action == "RespondToAuthChallenge":
+            responses: dict = body["ChallengeResponses"]
+            if responses["PASSWORD_CLAIM_SIGNATURE"] != self._signature(responses):
+                return self._not_authorized("Incorrect username or password.")
+            return httpx.Response(
+                200,
+                json={
+                    "AuthenticationResult": {
+                        "IdToken": "id token",
+                        "RefreshToken": REFRESH_TOKEN,
+                    }
+                },
+            )
+
+        if action == "InitiateAuth" and body["AuthFlow"] == "REFRESH_TOKEN_AUTH":
+            if body["AuthParameters"]["REFRESH_TOKEN"] != REFRESH_TOKEN:
+                return self._not_authorized("Invalid Refresh Token")
+            return httpx.Response(
+                200, json={"AuthenticationResult": {"IdToken": "new id token"}}
+            )
+
+        return httpx.Response(400, json={"__type": "InvalidParameterException"})
+
+    def _signature(self, responses: dict) -> str:
+        """The password claim the client must send, computed with the verifier."""
+
+        u: int = int(_hex_hash(_pad_hex(self.large_a) + _pad_hex(self.large_b)), 16)
+        secret: int = pow(
+            self.large_a * pow(self.verifier, u, BIG_N), self.small_b, BIG_N
+        )
+        key: bytes = _hkdf(
+            bytes.fromhex(_pad_hex(secret)), bytes.fromhex(_pad_hex(f"{u:x}"))
+        )
+        message: bytes = (
+            self.pool_name.encode()
+            + USER_ID.encode()
+            + SECRET_BLOCK
+            + responses["TIMESTAMP"].encode()
+        )
+        return base64.b64encode(
+            hmac.new(key, message, hashlib.sha256).digest()
+        ).decode()
+
+    def _not_authorized(self, message: str) -> httpx.Response:
+        return httpx.Response(
+            400, json={"__type": "NotAuthorizedException", "message": message}
+        )
+
+
+@pytest.fixture
+def cognito_pool(mock_api) -> CognitoStandIn:
+    pool: CognitoStandIn = CognitoStandIn()
+    mock_api(pool.handle)
+    return pool
+
+
+def test_login_with_srp(cognito_pool):
+    tokens = run(auth.authenticate(USERNAME, PASSWORD))
+
+    assert tokens == ("id token", REFRESH_TOKEN)
+    assert cognito_pool.actions == ["InitiateAuth", "RespondToAuthChallenge"]
+
+
+def test_wrong_password_is_not_authorized(cognito_pool):
+    with pytest.raises(cognito.CognitoError) as error:
+        run(auth.authenticate(USERNAME, "wrong password"))
+
+    assert error.value.code == "NotAuthorizedException"
+    assert auth._is_not_authorized(error.value)
+
+
+def test_refresh(cognito_pool):
+    assert run(auth.renew(REFRESH_TOKEN)) == "new id token"
+
+    with pytest.raises(cognito.CognitoError) as error:
+        run(auth.renew("revoked"))
+    assert auth._is_not_authorized(error.value)
@@ -0,0 +1,135 @@
+import os
+import sys
+import subprocess
+import importlib.util
+import pytest
+from support import TESTS_DIR
+
+# must only be imported on first use, not when Blender starts
+HEAVY_MODULES: tuple[str, ...] = (
+    "httpx",
+    "jose",
+    "cryptography",
+    "warrant",
+    "boto3",
+    "botocore",
+    "requests",
+    "humanize",
+    "dateutil",
+)
+MB: int = 2**20
+# seconds to import and register the addon, it was about 0.03 seconds
+REGISTER_BUDGET: float = 0.25
+
+SCRIPT: str = """
+import sys
+import time
+import support
+
+support.setup_paths()
+started = time.perf_counter()
+addon = support.import_addon()
+addon.register()
+print(time.perf_counter() - started)
+print(",".join(sys.modules))
+"""
+
+
+def test_register_doesnt_import_heavy_dependencies():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT],
+        cwd=TESTS_DIR,
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    )
+    register_time, modules = result.stdout.splitlines()[-2:]
+    imported: set[str] = {
+        line.rpartition("|")[2].strip().partition(".")[0]
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+    loaded: set[str] = {module.partition(".")[0] for module in modules.split(",")}
+
+    print(f"register: {float(register_time) * 1000:.0f} ms")
+    assert imported.isdisjoint(HEAVY_MODULES)
+    assert loaded.isdisjoint(HEAVY_MODULES)
+    assert float(register_time) < REGISTER_BUDGET
+
+
+# What it takes to be ready to log in, in a new process. Not counted is the TLS
+# context, both need it for their first request: boto3 creates it on connecting,
+# httpx when the client is created.
+LOGIN_SCRIPT: str = """
+import os
+import time
+import support
+
+support.setup_paths()
+support.import_addon()
+from rendergate.utils import auth
+
+
+def memory():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+before = memory()
+started = time.perf_counter()
+{login}
+print(time.perf_counter() - started)
+print(memory() - before)
+"""
+WARRANT_LOGIN: str = """
+from warrant import Cognito
+
+Cognito(
+    user_pool_id=auth.USER_POOL_ID,
+    client_id=auth.USER_POOL_WEB_CLIENT_ID,
+    user_pool_region=auth.REGION,
+    username="user@test",
+)
+"""
+COGNITO_LOGIN: str = """
+import httpx
+from rendergate.utils import cognito
+
+cognito.SRP(auth.USER_POOL_ID)
+"""
+
+
+def measure_login(login: str) -> tuple[float, int]:
+    """Seconds and bytes of resident memory to get ready to log in."""
+
+    result = subprocess.run(
+        [sys.executable, "-c", LOGIN_SCRIPT.format(login=login)],
+        cwd=TESTS_DIR,
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    )
+    seconds, memory = result.stdout.splitlines()[-2:]
+    return float(seconds), int(memory)
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("warrant") is None,
+    reason="warrant isn't installed, it's only needed to compare with",
+)
+@pytest.mark.skipif(
+    not os.path.exists("/proc/self/statm"), reason="measures the memory on Linux"
+)
+def test_cognito_client_is_lighter_than_warrant():
+    warrant_time, warrant_memory = measure_login(WARRANT_LOGIN)
+    cognito_time, cognito_memory = measure_login(COGNITO_LOGIN)
+    print(
+        f"ready to log in: warrant {warrant_time * 1000:.0f} ms, "
+        f"{warrant_memory / MB:.1f} MB; built-in {cognito_time * 1000:.0f} ms, "
+        f"{cognito_memory / MB:.1f} MB"
+    )
+
+    assert cognito_time < warrant_time
+    assert cognito_memory < warrant_memory
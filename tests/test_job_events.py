@@ -0,0 +1,160 @@
+import time
+import asyncio
+import pytest
+from typing import AsyncIterator, Callable
+from support import drain
+from standin import StandInServer, Request, Response
+from rendergate.data import jobs, job_cache, job_events, job_poll, job_sync, session
+from rendergate.utils import async_loop, auth, rest_client
+from rendergate.utils.retry import RetryPolicy
+import bpy
+
+
+class EventServer:
+    """Stands in for the job events of rendergate.ch, one stream per connection."""
+
+    def __init__(self):
+        # the status to answer with, anything but 200 isn't a stream
+        self.status: int = 200
+        # only this token is accepted, if set
+        self.token: str | None = None
+        self.streams: list[asyncio.Queue] = []
+        self.server: StandInServer = StandInServer(self.handle)
+
+    async def handle(self, request: Request) -> Response:
+        if request.path != "/project/events":
+            return Response(404)
+        if self.token is not None and request.headers.get("auth") != self.token:
+            return Response(401)
+        if self.status != 200:
+            return Response(self.status)
+
+        stream: asyncio.Queue = asyncio.Queue()
+        self.streams.append(stream)
+
+        async def events() -> AsyncIterator[bytes]:
+            while True:
+                yield (await stream.get()).encode()
+
+        return Response(200, {"Content-Type": "text/event-stream"}, events())
+
+    def send(self, event: str) -> None:
+        """Send an event on the newest stream."""
+
+        self.server._loop.call_soon_threadsafe(self.streams[-1].put_nowait, event)
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    """Play Blender's main thread with its timers until the condition is met."""
+
+    deadline: float = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        drain(0.01)
+        bpy.run_timers()
+
+
+def run_timers_until(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    """Only run Blender's timers until the condition is met."""
+
+    deadline: float = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+        bpy.run_timers()
+
+
+@pytest.fixture
+def event_server(monkeypatch):
+    events: EventServer = EventServer()
+    events.server.start()
+    monkeypatch.setattr(
+        job_events, "RECONNECT", RetryPolicy(base_delay=0.01, max_delay=0.01)
+    )
+    bpy.context.scene.rendergate_properties.rendergate_api_url = events.server.url
+    session.log_in("user@test", "token", "refresh")
+    job_sync.load_state("user@test", {"jobs": [{"id": "job-0", "stage": "RENDERING"}]})
+    yield events
+    job_events.stop_events()
+    rest_client.close_client()
+    events.server.stop()
+
+
+def test_events_are_applied_and_resumed_after_reconnecting(event_server):
+    job_events.start_events()
+    wait_for(job_events.is_connected)
+    wait_for(lambda: job_poll._paused)
+
+    event_server.send('id: 1\nevent: job\ndata: {"id": "job-0", "stage": "PAYING"}\n\n')
+    wait_for(lambda: jobs.get_job("job-0").stage == "PAYING")
+    cached_jobs: list[dict] = job_cache.load_job_cache("user@test")["jobs"]
+    assert cached_jobs[0]["stage"] == "PAYING"
+
+    # the events that were missed get requested after reconnecting
+    event_server.server.drop_connections()
+    wait_for(lambda: len(event_server.streams) == 2 and job_events.is_connected())
+    assert "last-event-id" not in event_server.server.requests[0].headers
+    assert event_server.server.requests[1].headers["last-event-id"] == "1"
+
+    event_server.send('id: 2\ndata: {"id": "job-0", "progress": "50%"}\n\n')
+    wait_for(lambda: jobs.get_job("job-0").progress == "50%")
+    assert jobs.get_job("job-0").stage == "PAYING"
+    # the stream has its own connection, not one of the API calls
+    assert rest_client.EVENTS in rest_client._clients
+
+
+def test_events_are_applied_by_the_timers_alone(event_server):
+    job_events.start_events()
+    run_timers_until(job_events.is_connected)
+    run_timers_until(lambda: job_poll._paused)
+    # no task is running, that would keep the main thread queue drained
+    run_timers_until(
+        lambda: not bpy.app.timers.is_registered(async_loop._drain_main_queue)
+    )
+
+    event_server.send('id: 1\nevent: job\ndata: {"id": "job-0", "stage": "PAYING"}\n\n')
+    run_timers_until(lambda: jobs.get_job("job-0").stage == "PAYING")
+
+
+@pytest.mark.parametrize("status", [403, 404, 405, 501])
+def test_jobs_are_polled_if_events_are_unavailable(event_server, status):
+    event_server.status = status
+    job_events.start_events()
+    job_poll.start_polling()
+
+    wait_for(lambda: len(event_server.server.requests) == 1)
+    drain(0.1)
+    bpy.run_timers()
+
+    # no reconnecting until it's time to try pushing again
+    assert len(event_server.server.requests) == 1
+    assert not job_events.is_connected()
+    assert not job_poll._paused
+    assert bpy.app.timers.is_registered(job_poll._poll_timer)
+
+
+def test_transient_errors_reconnect(event_server):
+    event_server.status = 503
+    job_events.start_events()
+
+    wait_for(lambda: len(event_server.server.requests) >= 3)
+    event_server.status = 200
+    wait_for(job_events.is_connected)
+
+
+def test_rejected_token_is_refreshed(event_server, monkeypatch):
+    async def renew(refresh_token: str) -> str:
+        return "new token"
+
+    monkeypatch.setattr(auth, "renew", renew)
+    monkeypatch.setattr(auth, "token_expiry", lambda token: time.time() + 3600)
+    event_server.token = "new token"
+    job_events.start_events()
+
+    wait_for(job_events.is_connected)
+
+    assert [r.headers["auth"] for r in event_server.server.requests] == [
+        "token",
+        "new token",
+    ]
+    assert session.is_logged_in()
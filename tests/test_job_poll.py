@@ -0,0 +1,151 @@
+import json
+import time
+import pytest
+from standin import StandInServer, Request, Response
+from rendergate.data import jobs, job_poll, job_sync, session
+from rendergate.utils import auth, rest_client
+import bpy
+
+
+class JobServer:
+    """Stands in for the jobs of rendergate.ch."""
+
+    def __init__(self):
+        self.job: dict = {"stage": "RENDERING", "progress": "0%"}
+        # only this token is accepted
+        self.token: str = "token"
+        self.server: StandInServer = StandInServer(self.handle)
+
+    async def handle(self, request: Request) -> Response:
+        if request.path != "/project/job-0":
+            return Response(404)
+        if request.headers.get("auth") != self.token:
+            return Response(401)
+        return Response(200, {}, json.dumps({"id": "job-0", **self.job}).encode())
+
+
+class Clock:
+    def __init__(self):
+        self.now: float = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def job_server(monkeypatch):
+    server: JobServer = JobServer()
+    server.server.start()
+    bpy.context.scene.rendergate_properties.rendergate_api_url = server.server.url
+    session.log_in("user@test", "token", "refresh")
+    job_sync.load_state("user@test", {"jobs": [{"id": "job-0", **server.job}]})
+    yield server
+    job_poll.stop_polling()
+    rest_client.close_client()
+    server.server.stop()
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock: Clock = Clock()
+    monkeypatch.setattr(job_poll, "_monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def redraws(monkeypatch) -> list[None]:
+    redraws: list[None] = []
+    monkeypatch.setattr(job_poll, "redraw_areas", lambda: redraws.append(None))
+    return redraws
+
+
+def tick(clock: Clock, seconds: float, timeout: float = 5.0) -> None:
+    """Let time pass and run Blender's timers until the started polls are done."""
+
+    clock.now += seconds
+    bpy.run_timers()
+    deadline: float = time.monotonic() + timeout
+    while job_poll._poll_future is not None and not job_poll._poll_future.done():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+        bpy.run_timers()
+
+
+def test_unchanged_jobs_back_off(job_server, clock, redraws):
+    job_poll.start_polling()
+    tick(clock, 0)
+    # the job was just received, it isn't polled right away
+    assert not job_server.server.requests
+    assert job_poll._next_poll["job-0"] == clock.now + job_poll.POLL_MIN_INTERVAL
+
+    intervals: list[float] = []
+    for _ in range(7):
+        tick(clock, job_poll._next_poll["job-0"] - clock.now)
+        intervals.append(job_poll._intervals["job-0"])
+
+    assert intervals == [20, 40, 80, 160, 300, 300, 300]
+    assert len(job_server.server.requests) == 7
+    # nothing changed, nothing to show
+    assert not redraws
+
+    # not due yet
+    tick(clock, job_poll.POLL_MAX_INTERVAL - 1)
+    assert len(job_server.server.requests) == 7
+
+
+def test_changed_job_resets_interval_and_redraws(job_server, clock, redraws):
+    job_poll.start_polling()
+    tick(clock, 0)
+    tick(clock, job_poll.POLL_MIN_INTERVAL)
+    tick(clock, job_poll._next_poll["job-0"] - clock.now)
+    assert job_poll._intervals["job-0"] == 40
+    assert not redraws
+
+    job_server.job["progress"] = "50%"
+    tick(clock, job_poll._next_poll["job-0"] - clock.now)
+    assert job_poll._intervals["job-0"] == job_poll.POLL_MIN_INTERVAL
+    assert jobs.get_job("job-0").progress == "50%"
+    assert len(redraws) == 1
+
+    # a finished job can't change anymore, so the polling stops
+    job_server.job["stage"] = "FINISHED"
+    tick(clock, job_poll.POLL_MIN_INTERVAL)
+    assert len(redraws) == 2
+    tick(clock, job_poll.POLL_MAX_INTERVAL)
+    assert len(job_server.server.requests) == 4
+    assert not bpy.app.timers.is_registered(job_poll._poll_timer)
+
+
+def test_rejected_token_is_refreshed(job_server, clock, monkeypatch):
+    async def renew(refresh_token: str) -> str:
+        return "new token"
+
+    monkeypatch.setattr(auth, "renew", renew)
+    monkeypatch.setattr(auth, "token_expiry", lambda token: time.time() + 3600)
+    job_server.token = "new token"
+    job_server.job["progress"] = "50%"
+
+    job_poll.poll_soon("job-0")
+    tick(clock, 0)
+
+    assert session.is_logged_in()
+    assert session.get_aws_token() == "new token"
+    assert jobs.get_job("job-0").progress == "50%"
+    assert [request.headers["auth"] for request in job_server.server.requests] == [
+        "token",
+        "new token",
+    ]
+
+
+def test_rejected_token_logs_out_if_not_refreshed(job_server, clock, monkeypatch):
+    async def renew(refresh_token: str) -> str:
+        raise ValueError("refresh token revoked")
+
+    monkeypatch.setattr(auth, "renew", renew)
+    job_server.token = "new token"
+
+    job_poll.poll_soon("job-0")
+    tick(clock, 0)
+
+    assert not session.is_logged_in()
+    assert len(job_server.server.requests) == 1
@@ -0,0 +1,98 @@
+import json
+import pytest
+from urllib.parse import urlsplit, parse_qs
+from support import run
+from standin import StandInServer, Request, Response
+from rendergate.data import jobs, session
+from rendergate.operators.get_jobs import RENDERGATE_OT_get_jobs
+from rendergate.utils import rest_client
+import bpy
+
+
+class JobServer:
+    """Stands in for the job list of rendergate.ch, with ETags and a since-cursor."""
+
+    def __init__(self):
+        self.version: int = 0
+        # job data and the version it last changed in, by job id
+        self.jobs: dict[str, tuple[dict, int]] = {}
+        self.deleted: dict[str, int] = {}
+
+    def change(self, job_data: dict) -> None:
+        self.version += 1
+        self.jobs[job_data["id"]] = (job_data, self.version)
+
+    def delete(self, job_id: str) -> None:
+        self.version += 1
+        del self.jobs[job_id]
+        self.deleted[job_id] = self.version
+
+    async def handle(self, request: Request) -> Response:
+        etag: str = f'"{self.version}"'
+        headers: dict = {"ETag": etag, "Content-Type": "application/json"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(304, headers)
+
+        since: list[str] = parse_qs(urlsplit(request.path).query).get("since", [])
+        if since:
+            cursor: int = int(since[0])
+            body = {
+                "jobs": [data for data, v in self.jobs.values() if v > cursor],
+                "deleted": [i for i, v in self.deleted.items() if v > cursor],
+                "cursor": str(self.version),
+            }
+        else:
+            body = [data for data, _ in self.jobs.values()]
+            headers["X-Rendergate-Cursor"] = str(self.version)
+
+        return Response(200, headers, json.dumps(body).encode())
+
+
+def job_data(index: int, stage: str = "RENDERING") -> dict:
+    return {"id": f"job-{index}", "name": f"Job {index}", "stage": stage}
+
+
+@pytest.fixture
+def job_server():
+    server: JobServer = JobServer()
+    for i in range(3):
+        server.change(job_data(i))
+    standin: StandInServer = StandInServer(server.handle).start()
+    bpy.context.scene.rendergate_properties.rendergate_api_url = standin.url
+    bpy.app.online_access = False
+    session.log_in("user@test", "token")
+    yield server, standin
+    bpy.app.online_access = True
+    rest_client.close_client()
+    standin.stop()
+
+
+def get_jobs() -> None:
+    run(RENDERGATE_OT_get_jobs.update_job_list(bpy.context))
+
+
+def test_only_changed_jobs_are_requested_and_applied(job_server):
+    server, standin = job_server
+
+    get_jobs()
+    assert [job.identifier for job in jobs.get_jobs()] == ["job-0", "job-1", "job-2"]
+    assert standin.requests[0].path == "/project"
+    assert "if-none-match" not in standin.requests[0].headers
+
+    # nothing changed, nothing to parse
+    version: int = jobs.get_version()
+    get_jobs()
+    assert standin.requests[1].headers["if-none-match"] == f'"{server.version}"'
+    assert standin.requests[1].path == f"/project?since={server.version}"
+    assert jobs.get_version() == version
+
+    unchanged_job = jobs.get_job("job-2")
+    server.change(job_data(1, "FINISHED"))
+    server.change(job_data(3))
+    server.delete("job-0")
+    get_jobs()
+
+    assert [job.identifier for job in jobs.get_jobs()] == ["job-1", "job-2", "job-3"]
+    assert jobs.get_job("job-1").stage == "FINISHED"
+    # only the changed jobs are constructed again
+    assert jobs.get_job("job-2") is unchanged_job
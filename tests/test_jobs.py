@@ -0,0 +1,114 @@
+import json
+import dataclasses
+import pytest
+from types import SimpleNamespace
+from support import FakeLayout, best_time
+from rendergate.data import jobs
+from rendergate.utils import models
+from rendergate.panels.manage_job import RENDERGATE_PT_manage_job
+
+DRAWS: int = 1000
+
+
+def job_data(index: int, stage: str = "RENDERING") -> dict:
+    return {
+        "id": f"job-{index}",
+        "name": f"Job {index}",
+        "stage": stage,
+        "creationDate": "2025-01-31T12:34:56.789Z",
+        "costEst": 1.5,
+        "timeEst": 60_000,
+    }
+
+
+def test_jobs_are_upserted_in_a_stable_order():
+    jobs.set_jobs(jobs.construct_render_jobs(job_data(i) for i in range(3)))
+
+    jobs.update_jobs(
+        jobs.construct_render_jobs([job_data(1, "FINISHED"), job_data(3)], start=1),
+        removed_ids=["job-0"],
+    )
+
+    assert [job.identifier for job in jobs.get_jobs()] == ["job-1", "job-2", "job-3"]
+    assert jobs.get_job("job-1").stage == "FINISHED"
+    assert jobs.get_job("job-0") is None
+
+
+def draw_time(job_count: int) -> float:
+    """Seconds to draw the manage job panel once, with the last job selected."""
+
+    jobs.set_jobs(jobs.construct_render_jobs(job_data(i) for i in range(job_count)))
+    context = SimpleNamespace(
+        scene=SimpleNamespace(
+            rendergate_properties=SimpleNamespace(
+                jobs=f"job-{job_count - 1}", download_folder=""
+            )
+        )
+    )
+    panel = SimpleNamespace(layout=FakeLayout())
+
+    return best_time(lambda: RENDERGATE_PT_manage_job.draw(panel, context), DRAWS)
+
+
+def test_panel_draw_cost_does_not_grow_with_the_jobs():
+    few_jobs: float = draw_time(10)
+    many_jobs: float = draw_time(10_000)
+
+    # how the selected job was found before, scanning a list of all jobs
+    job_list: list = jobs.get_jobs()
+    linear_scan: float = best_time(
+        lambda: next(job for job in job_list if job.identifier == "job-9999"), 100
+    )
+
+    print(
+        f"\ndraw: 10 jobs {few_jobs * 1e6:.1f} µs, 10k jobs {many_jobs * 1e6:.1f} µs, "
+        f"linear scan of 10k jobs {linear_scan * 1e6:.1f} µs"
+    )
+    assert many_jobs < few_jobs * 2
+    assert many_jobs < linear_scan
+
+
+def test_creation_date_is_parsed_as_utc():
+    job = jobs.construct_render_job(job_data(0), 0)
+
+    assert job.created_timestamp == 1738326896.789
+
+
+def test_jobs_are_frozen():
+    job = jobs.construct_render_job(job_data(0), 0)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        job.stage = "FINISHED"
+
+
+def test_texts_are_created_lazily_and_expire(monkeypatch):
+    job = jobs.construct_render_job(job_data(0), 0)
+    assert job._texts is None
+
+    description: str = job.description
+    assert job.description is description
+
+    monkeypatch.setattr(models, "TEXT_TTL", 0.0)
+    assert job.description is not description
+    assert job.description == description
+
+
+def test_parsing_10k_jobs():
+    payload: str = json.dumps([job_data(i) for i in range(10_000)])
+
+    def parse() -> list:
+        return jobs.construct_render_jobs(json.loads(payload))
+
+    def parse_with_texts() -> list:
+        # what every job cost before the texts were created lazily
+        return [job.description for job in parse()]
+
+    parse_time: float = best_time(parse, number=1)
+    eager_time: float = best_time(parse_with_texts, number=1)
+    print(
+        f"10k jobs: parsed in {parse_time * 1000:.0f} ms, "
+        f"{eager_time * 1000:.0f} ms with texts"
+    )
+
+    assert len(parse()) == 10_000
+    assert parse_time * 1.5 < eager_time
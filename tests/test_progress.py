@@ -0,0 +1,47 @@
+import pytest
+from support import drain
+from rendergate.utils import progress
+from rendergate.utils.progress import ProgressChannel, MB
+from rendergate.utils.tasks import Task
+
+
+class Clock:
+    def __init__(self):
+        self.now: float = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock: Clock = Clock()
+    monkeypatch.setattr(progress, "_monotonic", clock)
+    yield clock
+    drain()
+
+
+def test_resumed_transfer_counts_only_the_new_bytes(clock):
+    task: Task = Task("upload:scene.blend", "Uploading")
+    channel: ProgressChannel = ProgressChannel(task, None, "Upload", done=900 * MB)
+
+    clock.now += 1.0
+    channel.update(910 * MB, 1000 * MB)
+
+    assert channel.throughput == 10 * MB
+    assert channel.eta == 9.0
+    drain()
+    assert task.progress == pytest.approx(0.91)
+
+
+def test_retried_part_is_no_negative_throughput(clock):
+    channel: ProgressChannel = ProgressChannel(Task("upload:x", "Uploading"), None, "x")
+
+    clock.now += 1.0
+    channel.update(100 * MB, 1000 * MB)
+    # a part of 50 MB gets retried
+    clock.now += 1.0
+    channel.update(50 * MB, 1000 * MB)
+
+    assert channel.throughput == pytest.approx(0.7 * 100 * MB)
+    assert channel.eta > 0
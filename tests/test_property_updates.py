@@ -0,0 +1,43 @@
+from support import best_time
+from test_jobs import job_data
+from rendergate.data import jobs
+from rendergate.properties import property_updates
+from rendergate.properties.property_updates import RendergatePropertyUpdates
+import bpy
+
+DRAWS: int = 1000
+
+
+def job_items() -> list:
+    return RendergatePropertyUpdates.create_job_list(None, bpy.context)
+
+
+def test_items_are_the_same_list_until_the_jobs_change():
+    jobs.set_jobs(jobs.construct_render_jobs(job_data(i) for i in range(3)))
+
+    items: list = job_items()
+    assert [item[0] for item in items] == ["job-0", "job-1", "job-2"]
+    assert job_items() is items
+
+    jobs.update_jobs(jobs.construct_render_jobs([job_data(3)], start=3), [])
+    assert job_items() is not items
+    assert len(job_items()) == 4
+
+
+def test_draw_loop_with_10k_jobs():
+    jobs.set_jobs(jobs.construct_render_jobs(job_data(i) for i in range(10_000)))
+    job_items()
+
+    def rebuild_items() -> list:
+        # what every draw cost before the items were cached
+        property_updates._job_items_key = None
+        return job_items()
+
+    cached_time: float = best_time(job_items, number=DRAWS)
+    rebuild_time: float = best_time(rebuild_items, number=10)
+    print(
+        f"job items of 10k jobs: {cached_time * 1e6:.2f} µs cached, "
+        f"{rebuild_time * 1e6:.1f} µs rebuilt"
+    )
+
+    assert cached_time * 100 < rebuild_time
@@ -0,0 +1,147 @@
+import time
+import shutil
+import asyncio
+import subprocess
+import httpx
+import pytest
+from support import run
+from standin import StandInServer, Request, Response
+from rendergate.utils import rest_client, upload, async_loop
+from rendergate.utils.retry import NO_RETRY
+
+REQUESTS: int = 30
+
+
+@pytest.fixture
+def https_server(tmp_path, monkeypatch):
+    """A local HTTPS stand-in of the API, with a self-signed certificate."""
+
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is needed to create the certificate")
+
+    import ssl
+
+    cert, key = tmp_path / "cert.pem", tmp_path / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes"]
+        + ["-keyout", str(key), "-out", str(cert), "-days", "1"]
+        + ["-subj", "/CN=localhost", "-addext", "subjectAltName=IP:127.0.0.1"],
+        check=True,
+        capture_output=True,
+    )
+    ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    ssl_context.load_cert_chain(cert, key)
+    # trusted by the clients of httpx
+    monkeypatch.setenv("SSL_CERT_FILE", str(cert))
+
+    async def api(request: Request) -> Response:
+        return Response(200, {"Content-Type": "application/json"}, b"[]")
+
+    server: StandInServer = StandInServer(api, ssl_context).start()
+    rest_client.close_client()
+    yield server
+    rest_client.close_client()
+    server.stop()
+
+
+def test_pooled_client_reuses_the_connection(https_server):
+    url: str = f"{https_server.url}/project"
+
+    async def pooled() -> None:
+        for _ in range(REQUESTS):
+            response = await rest_client.request(url, request="GET")
+            assert response.status_code == 200
+
+    async def new_client_per_request() -> None:
+        # how every request was sent before the shared client
+        for _ in range(REQUESTS):
+            async with httpx.AsyncClient() as client:
+                response = await client.get(url)
+                assert response.status_code == 200
+
+    # creating the shared client and the first handshake happen once
+    run(rest_client.request(url, request="GET"))
+
+    started: float = time.perf_counter()
+    run(pooled(), timeout=30)
+    pooled_latency: float = (time.perf_counter() - started) / REQUESTS
+    pooled_connections: int = https_server.connections
+
+    started = time.perf_counter()
+    run(new_client_per_request(), timeout=30)
+    new_client_latency: float = (time.perf_counter() - started) / REQUESTS
+
+    print(
+        f"\nper request: pooled {pooled_latency * 1000:.2f} ms, "
+        f"new client {new_client_latency * 1000:.2f} ms"
+    )
+    # one TLS handshake for all requests, instead of one for each
+    assert pooled_connections == 1
+    assert https_server.connections == pooled_connections + REQUESTS
+    assert pooled_latency < new_client_latency
+
+
+def test_api_calls_dont_wait_for_uploads(tmp_path, monkeypatch):
+    """All parts in flight use up the upload pool, not the one of the API."""
+
+    release_parts: asyncio.Event = asyncio.Event()
+
+    async def api(request: Request) -> Response:
+        if request.path.startswith("/part/"):
+            await release_parts.wait()
+            return Response(200, {"ETag": f'"{request.path}"'})
+        return Response(200, {"Content-Type": "application/json"}, b"[]")
+
+    server: StandInServer = StandInServer(api).start()
+    monkeypatch.setattr(upload, "MIN_PART_SIZE", 1000)
+    file_path = tmp_path / "scene.blend"
+    file_path.write_bytes(b"x" * 1000 * upload.MAX_UPLOAD_CONCURRENCY)
+    parts = upload.compute_parts(1000 * upload.MAX_UPLOAD_CONCURRENCY, 10)
+    urls = [f"{server.url}/part/{i}" for i in range(len(parts))]
+
+    try:
+        uploading = asyncio.run_coroutine_threadsafe(
+            upload.upload_parts(
+                str(file_path), urls, parts, concurrency=upload.MAX_UPLOAD_CONCURRENCY
+            ),
+            async_loop.get_loop(),
+        )
+        deadline: float = time.monotonic() + 5
+        while len(server.requests) < len(parts) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert server.connections == len(parts)
+
+        started: float = time.perf_counter()
+        response = run(rest_client.request(f"{server.url}/project", request="GET"))
+        assert not isinstance(response, str), response
+        assert time.perf_counter() - started < 1.0
+
+        server._loop.call_soon_threadsafe(release_parts.set)
+        assert len(uploading.result(5)) == len(parts)
+    finally:
+        rest_client.close_client()
+        server.stop()
+
+
+@pytest.mark.parametrize(
+    "error, counted",
+    [
+        (httpx.PoolTimeout, False),
+        (httpx.WriteTimeout, False),
+        (httpx.ConnectError, True),
+        (httpx.ConnectTimeout, True),
+        (httpx.ReadTimeout, True),
+    ],
+)
+def test_only_failures_of_the_host_open_the_circuit(mock_api, error, counted):
+    def api(request: httpx.Request) -> httpx.Response:
+        raise error("failed", request=request)
+
+    mock_api(api)
+    url: str = "https://api.test/project"
+
+    for _ in range(10):
+        response = run(rest_client.request(url, request="GET", retry=NO_RETRY))
+        assert isinstance(response, str)
+
+    assert rest_client.get_circuit_breaker(url).is_open == counted
@@ -0,0 +1,94 @@
+import json
+import time
+import asyncio
+from support import run
+from standin import StandInServer, Request, Response
+from rendergate.data import jobs, session
+from rendergate.operators.download import RENDERGATE_OT_download
+from rendergate.operators.get_jobs import RENDERGATE_OT_get_jobs
+from rendergate.operators.new_job import RENDERGATE_OT_new_job
+from rendergate.utils import async_loop, download, rest_client, tasks, upload
+from rendergate.utils.tasks import Task
+import bpy
+
+RESULTS: bytes = b"zip" * 100_000
+
+
+def test_jobs_and_downloads_dont_wait_for_an_upload(tmp_path, monkeypatch):
+    """An upload at max concurrency doesn't block getting jobs or downloading."""
+
+    release_parts: asyncio.Event = asyncio.Event()
+
+    async def api(request: Request) -> Response:
+        json_headers: dict = {"Content-Type": "application/json"}
+        if request.path.startswith("/part/"):
+            await release_parts.wait()
+            return Response(200, {"ETag": f'"{request.path}"'})
+        if request.path == "/project":
+            job: dict = {"id": "job-0", "name": "Job 0", "stage": "FINISHED"}
+            return Response(200, json_headers, json.dumps([job]).encode())
+        if request.path == "/project/job-0/download":
+            link: str = f"{server.url}/results.zip"
+            return Response(200, json_headers, json.dumps({"link": link}).encode())
+        if request.path == "/results.zip":
+            return Response(200, {"Content-Type": "application/zip"}, RESULTS)
+        return Response(404)
+
+    server: StandInServer = StandInServer(api).start()
+    props = bpy.context.scene.rendergate_properties
+    props.rendergate_api_url = server.url
+    monkeypatch.setattr(bpy.app, "online_access", False)
+    session.log_in("user@test", "token")
+
+    monkeypatch.setattr(upload, "MIN_PART_SIZE", 1000)
+    file_path = tmp_path / "scene.blend"
+    file_path.write_bytes(b"x" * 1000 * upload.MAX_UPLOAD_CONCURRENCY)
+    monkeypatch.setattr(bpy.data, "filepath", str(file_path))
+    parts = upload.compute_parts(1000 * upload.MAX_UPLOAD_CONCURRENCY, 10)
+    urls = [f"{server.url}/part/{i}" for i in range(len(parts))]
+
+    upload_task: Task = Task(tasks.upload_resource(str(file_path)), "Uploading")
+    assert tasks.start_task(upload_task)
+    try:
+        uploading = asyncio.run_coroutine_threadsafe(
+            upload.upload_parts(
+                str(file_path), urls, parts, concurrency=upload.MAX_UPLOAD_CONCURRENCY
+            ),
+            async_loop.get_loop(),
+        )
+        deadline: float = time.monotonic() + 5
+        while len(server.requests) < len(parts) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(server.requests) == len(parts)
+
+        # only uploading the same blend-file conflicts
+        assert not RENDERGATE_OT_new_job.poll(bpy.context)
+        assert not tasks.start_task(Task(upload_task.resource, "Uploading"))
+        assert RENDERGATE_OT_get_jobs.poll(bpy.context)
+
+        run(RENDERGATE_OT_get_jobs.update_job_list(bpy.context))
+        assert [job.identifier for job in jobs.get_jobs()] == ["job-0"]
+
+        assert RENDERGATE_OT_download.poll(bpy.context)
+        download_task: Task = Task(tasks.download_resource("job-0"), "Downloading")
+        assert tasks.start_task(download_task)
+        assert not RENDERGATE_OT_download.poll(bpy.context)
+        result = run(
+            download.download_job(
+                download_task, None, jobs.get_job("job-0"), server.url, str(tmp_path)
+            )
+        )
+        tasks.finish_task(download_task)
+        assert result == ({"INFO"}, "Zip-file downloaded.")
+        assert (tmp_path / "Job 0.zip").read_bytes() == RESULTS
+
+        # the upload was held the whole time
+        assert not uploading.done()
+        assert [task.kind for task in tasks.get_tasks()] == [tasks.UPLOAD]
+
+        server._loop.call_soon_threadsafe(release_parts.set)
+        assert len(uploading.result(5)) == len(parts)
+    finally:
+        tasks.finish_task(upload_task)
+        rest_client.close_client()
+        server.stop()
@@ -0,0 +1,59 @@
+import os
+import json
+import threading
+import httpx
+from support import run
+from rendergate.data import jobs, job_cache, job_events, job_poll, session
+from rendergate.operators.get_jobs import RENDERGATE_OT_get_jobs
+from rendergate.utils.utils import get_user_data_dir
+import bpy
+
+
+def test_user_data_dir_is_resolved_in_the_main_thread():
+    data_dirs: list[str] = []
+    thread = threading.Thread(
+        target=lambda: data_dirs.append(get_user_data_dir("jobs"))
+    )
+    thread.start()
+    thread.join()
+
+    # the bpy stub raises if it's asked for the directory in another thread
+    assert data_dirs == [os.path.join(bpy.utils.user_dir, "jobs")]
+
+
+def test_jobs_change_only_in_the_main_thread(mock_api, monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/project":
+            return httpx.Response(
+                200,
+                headers={"ETag": '"1"'},
+                json=[
+                    {"id": "job-0", "stage": "RENDERING"},
+                    {"id": "job-1", "stage": "RENDERING"},
+                ],
+            )
+        return httpx.Response(200, json={"id": "job-0", "stage": "FINISHED"})
+
+    mock_api(handler)
+    monkeypatch.setattr(bpy.app, "online_access", False)
+    session.log_in("user@test", "token")
+
+    threads: set[threading.Thread] = set()
+    for name in ("set_jobs", "update_jobs", "add_job"):
+        func = getattr(jobs, name)
+
+        def record(*args, func=func):
+            threads.add(threading.current_thread())
+            return func(*args)
+
+        monkeypatch.setattr(jobs, name, record)
+
+    # the job list, a polled job and a pushed job
+    run(RENDERGATE_OT_get_jobs.update_job_list(bpy.context))
+    run(job_poll._poll_jobs("https://api.test", ["job-0"]))
+    run(job_events._apply_event("job", json.dumps({"id": "job-1", "stage": "PAYING"})))
+
+    assert threads == {threading.main_thread()}
+    assert [job.stage for job in jobs.get_jobs()] == ["FINISHED", "PAYING"]
+    cached_jobs: list[dict] = job_cache.load_job_cache("user@test")["jobs"]
+    assert [job["stage"] for job in cached_jobs] == ["FINISHED", "PAYING"]
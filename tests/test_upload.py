@@ -0,0 +1,139 @@
+import time
+import random
+import asyncio
+import httpx
+import pytest
+from support import run
+from rendergate.utils import upload
+
+PART_SIZE: int = 100_000
+
+
+@pytest.fixture
+def blend_file(tmp_path, monkeypatch):
+    """A file of 3 parts, the last one shorter."""
+
+    monkeypatch.setattr(upload, "MIN_PART_SIZE", PART_SIZE)
+    file_path = tmp_path / "scene.blend"
+    file_path.write_bytes(random.randbytes(2 * PART_SIZE + 12_345))
+    return str(file_path)
+
+
+def upload_urls(count: int) -> list[str]:
+    return [f"https://s3.test/part/{i}" for i in range(count)]
+
+
+def test_parts_are_uploaded_in_order_with_their_etags(blend_file, mock_api):
+    received: dict[int, httpx.Request] = {}
+
+    async def s3(request: httpx.Request) -> httpx.Response:
+        index = int(request.url.path.rsplit("/", 1)[1])
+        # finish in another order than started
+        await asyncio.sleep(random.uniform(0.0, 0.05))
+        received[index] = request
+        return httpx.Response(200, headers={"ETag": f'"etag-{index}"'})
+
+    mock_api(s3)
+    data = open(blend_file, "rb").read()
+    parts = upload.compute_parts(len(data), 3)
+
+    entity_tags = run(
+        upload.upload_parts(blend_file, upload_urls(3), parts, concurrency=3)
+    )
+
+    assert entity_tags == ['"etag-0"', '"etag-1"', '"etag-2"']
+    body = upload.complete_multipart_body(entity_tags)
+    assert body.index("<PartNumber>1</PartNumber><ETag>\"etag-0\"") < body.index(
+        "<PartNumber>3</PartNumber><ETag>\"etag-2\""
+    )
+    for index, (offset, length) in enumerate(parts):
+        request = received[index]
+        assert request.content == data[offset : offset + length]
+        # presigned S3 URLs don't accept chunked uploads
+        assert request.headers["Content-Length"] == str(length)
+        assert "Transfer-Encoding" not in request.headers
+
+
+def test_retried_part_is_sent_again_from_the_start(blend_file, mock_api):
+    attempts: list[int] = []
+    bodies: list[bytes] = []
+
+    def s3(request: httpx.Request) -> httpx.Response:
+        index = int(request.url.path.rsplit("/", 1)[1])
+        if index == 1:
+            attempts.append(index)
+            bodies.append(request.content)
+            if len(attempts) == 1:
+                return httpx.Response(503, headers={"Retry-After": "0"})
+        return httpx.Response(200, headers={"ETag": f'"etag-{index}"'})
+
+    mock_api(s3)
+    data = open(blend_file, "rb").read()
+    parts = upload.compute_parts(len(data), 3)
+    progress: list[tuple[int, int]] = []
+
+    entity_tags = run(
+        upload.upload_parts(
+            blend_file,
+            upload_urls(3),
+            parts,
+            progress_callback=lambda done, total: progress.append((done, total)),
+        )
+    )
+
+    assert entity_tags == ['"etag-0"', '"etag-1"', '"etag-2"']
+    offset, length = parts[1]
+    assert bodies == [data[offset : offset + length]] * 2
+    # the bytes of the failed attempt are not counted twice
+    assert progress[-1] == (len(data), len(data))
+    assert max(done for done, _ in progress) <= len(data)
+
+
+def test_progress_is_reported_while_a_part_is_sent(blend_file, mock_api):
+    mock_api(lambda request: httpx.Response(200, headers={"ETag": '"etag"'}))
+    data = open(blend_file, "rb").read()
+    parts = upload.compute_parts(len(data), 1)
+    progress: list[int] = []
+
+    run(
+        upload.upload_parts(
+            blend_file,
+            upload_urls(1),
+            parts,
+            progress_callback=lambda done, total: progress.append(done),
+        )
+    )
+
+    # one update per chunk, not a single one when the part is done
+    assert len(progress) >= len(data) // upload.CHUNK_SIZE
+    assert progress == sorted(progress)
+    assert progress[-1] == len(data)
+
+
+def test_parts_are_uploaded_concurrently(blend_file, mock_api):
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    async def slow_s3(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.1)
+        in_flight -= 1
+        return httpx.Response(200, headers={"ETag": '"etag"'})
+
+    mock_api(slow_s3)
+    data = open(blend_file, "rb").read()
+    parts = upload.compute_parts(len(data), 3)
+
+    started: float = time.perf_counter()
+    run(upload.upload_parts(blend_file, upload_urls(3), parts, concurrency=1))
+    sequential: float = time.perf_counter() - started
+
+    max_in_flight = 0
+    started = time.perf_counter()
+    run(upload.upload_parts(blend_file, upload_urls(3), parts, concurrency=3))
+    concurrent: float = time.perf_counter() - started
+
+    assert max_in_flight == 3
+    assert concurrent < sequential / 2
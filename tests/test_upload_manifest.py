@@ -0,0 +1,158 @@
+import os
+import time
+import httpx
+import pytest
+from datetime import datetime, timezone
+from support import run
+from test_upload import blend_file, PART_SIZE  # noqa: F401, the fixture
+from rendergate.data import session
+from rendergate.operators.new_job import RENDERGATE_OT_resume_upload
+from rendergate.utils import tasks, upload
+from rendergate.utils.tasks import Task
+import bpy
+
+
+def presigned_url(path: str, signed: float, expires: int = 3600) -> str:
+    """A presigned S3 URL, signed at the timestamp."""
+
+    amz_date: str = datetime.fromtimestamp(signed, timezone.utc).strftime(
+        "%Y%m%dT%H%M%SZ"
+    )
+    return f"https://s3.test{path}?X-Amz-Date={amz_date}&X-Amz-Expires={expires}"
+
+
+def create_manifest(file_path: str, signed: float) -> upload.UploadManifest:
+    """The manifest of an upload of 3 parts, interrupted after the first one."""
+
+    manifest: upload.UploadManifest = upload.UploadManifest.create(
+        job_id="job-0",
+        upload_id="upload-0",
+        file_path=file_path,
+        upload_urls=[presigned_url(f"/part/{i}", signed) for i in range(3)],
+        complete_url=presigned_url("/complete", signed),
+    )
+    manifest.entity_tags[0] = '"etag-0"'
+    manifest.save()
+    # forget the loaded manifests, like after restarting Blender
+    upload._manifests.clear()
+    return manifest
+
+
+class ResumeUpload(RENDERGATE_OT_resume_upload):
+    """The resume operator, with its reports collected instead of shown."""
+
+    def __init__(self):
+        self.reports: list[tuple[set[str], str]] = []
+        self.task = Task(tasks.upload_resource(bpy.data.filepath), "Uploading")
+
+    def report(self, report_type: set[str], message: str) -> None:
+        self.reports.append((report_type, message))
+
+
+@pytest.fixture
+def s3(blend_file, mock_api, monkeypatch):
+    """Stand-in of S3 and rendergate.ch, that records the requests."""
+
+    requests: list[httpx.Request] = []
+    responses: dict[str, int] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        status: int = responses.get(request.url.path, 200)
+        if request.url.path.startswith("/part/"):
+            index: str = request.url.path.rsplit("/", 1)[1]
+            return httpx.Response(status, headers={"ETag": f'"etag-{index}"'})
+        if request.url.path == "/project":
+            return httpx.Response(200, json=[])
+        return httpx.Response(status)
+
+    mock_api(handler)
+    monkeypatch.setattr(bpy.data, "filepath", blend_file)
+    monkeypatch.setattr(bpy.app, "online_access", False)
+    bpy.context.scene.rendergate_properties.upload_concurrency = 2
+    session.log_in("user@test", "token")
+    upload._manifests.clear()
+    yield requests, responses
+    upload._manifests.clear()
+
+
+def test_manifest_is_found_until_the_file_changes(blend_file):
+    signed: float = time.time()
+    manifest: upload.UploadManifest = create_manifest(blend_file, signed)
+
+    found: upload.UploadManifest = upload.find_manifest(blend_file)
+    assert found == manifest
+    assert found.parts[0] == (0, PART_SIZE)
+    assert found.missing_parts == [1, 2]
+    assert found.urls_expire_at == pytest.approx(int(signed) + 3600)
+    assert found.matches_file()
+
+    with open(blend_file, "ab") as f:
+        f.write(b"changed")
+    assert not found.matches_file()
+
+
+def test_resume_uploads_only_the_missing_parts(s3):
+    requests, _ = s3
+    create_manifest(bpy.data.filepath, time.time())
+    assert RENDERGATE_OT_resume_upload.poll(bpy.context)
+
+    operator: ResumeUpload = ResumeUpload()
+    run(operator.async_execute(bpy.context, {}), timeout=15)
+
+    assert [r.url.path for r in requests if r.method == "PUT"] == [
+        "/part/1",
+        "/part/2",
+    ]
+    complete: httpx.Request = next(r for r in requests if r.url.path == "/complete")
+    for index in range(3):
+        assert f'<ETag>"etag-{index}"</ETag>'.encode() in complete.content
+    assert operator.reports[-1] == ({"INFO"}, "New job created.")
+    assert upload.find_manifest(bpy.data.filepath) is None
+
+
+def test_expired_upload_is_not_resumed(s3):
+    requests, _ = s3
+    create_manifest(bpy.data.filepath, time.time() - 3600)
+    assert not RENDERGATE_OT_resume_upload.poll(bpy.context)
+
+    operator: ResumeUpload = ResumeUpload()
+    run(operator.async_execute(bpy.context, {}))
+
+    assert requests == []
+    assert operator.reports == [
+        ({"WARNING"}, f"{upload.URLS_EXPIRED} Please create the job again.")
+    ]
+    assert upload.find_manifest(bpy.data.filepath) is None
+    assert not os.listdir(os.path.join(bpy.utils.user_dir, "uploads"))
+
+
+def test_rejected_upload_urls_are_not_resumed(s3):
+    _, responses = s3
+    responses["/part/2"] = 403
+    create_manifest(bpy.data.filepath, time.time())
+
+    operator: ResumeUpload = ResumeUpload()
+    run(operator.async_execute(bpy.context, {}))
+
+    report_type, message = operator.reports[-1]
+    assert report_type == {"ERROR"}
+    assert message.startswith(upload.URLS_EXPIRED)
+    assert message.endswith("Please create the job again.")
+    assert upload.find_manifest(bpy.data.filepath) is None
+
+
+def test_failed_upload_can_be_resumed_later(s3):
+    _, responses = s3
+    responses["/part/2"] = 400
+    create_manifest(bpy.data.filepath, time.time())
+
+    operator: ResumeUpload = ResumeUpload()
+    run(operator.async_execute(bpy.context, {}))
+
+    report_type, message = operator.reports[-1]
+    assert report_type == {"ERROR"}
+    assert message.endswith("You can resume the upload later.")
+    manifest: upload.UploadManifest = upload.find_manifest(bpy.data.filepath)
+    assert manifest.missing_parts == [2]
+    assert RENDERGATE_OT_resume_upload.poll(bpy.context)
@@ -0,0 +1,50 @@
+import os
+import tracemalloc
+import httpx
+from support import run
+from rendergate.utils import upload, rest_client
+
+MB: int = 2**20
+
+
+class StreamingS3(httpx.AsyncBaseTransport):
+    """
+    Consumes the streamed parts without keeping them,
+    unlike `httpx.MockTransport`, which reads the whole body into memory.
+    """
+
+    def __init__(self):
+        self.received: dict[int, int] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        index = int(request.url.path.rsplit("/", 1)[1])
+        self.received[index] = 0
+        async for chunk in request.stream:
+            self.received[index] += len(chunk)
+        return httpx.Response(200, headers={"ETag": f'"etag-{index}"'})
+
+
+def test_peak_memory_does_not_depend_on_the_part_size(tmp_path):
+    file_path = tmp_path / "big.blend"
+    with open(file_path, "wb") as f:
+        for _ in range(64):
+            f.write(os.urandom(MB))
+    file_size: int = os.path.getsize(file_path)
+    # 2 parts of 32 MB each
+    parts = upload.compute_parts(file_size, 2)
+    s3: StreamingS3 = StreamingS3()
+    rest_client._clients[rest_client.UPLOAD] = httpx.AsyncClient(transport=s3)
+    urls = [f"https://s3.test/part/{i}" for i in range(2)]
+
+    tracemalloc.start()
+    try:
+        entity_tags = run(upload.upload_parts(str(file_path), urls, parts))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        rest_client.close_client()
+
+    assert entity_tags == ['"etag-0"', '"etag-1"']
+    assert s3.received == {i: length for i, (_, length) in enumerate(parts)}
+    # a few chunks in flight, not the 32 MB parts
+    assert peak < 4 * MB
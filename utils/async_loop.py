@@ -21,185 +21,295 @@ Manages the asyncio loop.
 (Copied from https://github.com/lampysprites/blender-asyncio,
 who copied it from Blender Cloud plugin with minor changes)
 And I made some changes.
+
+The loop runs in its own background thread, so file reads, JSON decoding
+and network transfers don't compete with drawing the viewport.
+Everything that touches bpy (property updates, redraws, reports)
+must run in Blender's main thread, with `run_in_main_thread` or
+`call_in_main_thread`. These calls are queued and a bpy.app.timers callback
+executes them in the main thread.
 """
 
 
-import gc
 import bpy
+import time
+import queue
 import typing
 import asyncio
 import logging
-import traceback
+import threading
 import concurrent.futures
-from typing import Any
+from typing import Any, Callable
 from concurrent.futures import ThreadPoolExecutor
-from asyncio import AbstractEventLoop, Task
-from bpy.types import WindowManager, Context
+from asyncio import AbstractEventLoop
+from bpy.types import Context
 from .global_vars import rendergate_logger
-from .utils import class_to_register
+from . import tasks
+from .tasks import Task
+
 
+# Intervals in seconds between draining the main thread queue.
+# The queue is drained fast while calls come in,
+# and backs off while waiting for long network operations.
+MIN_DRAIN_INTERVAL: float = 0.001
+MAX_DRAIN_INTERVAL: float = 0.1
+DRAIN_BACKOFF: float = 2.0
+# max seconds of main thread calls per drain, so the UI doesn't freeze
+MAX_DRAIN_TIME: float = 0.01
 
-# Keeps track of whether a loop-kicking operator is already running.
-_loop_kicking_operator_running: bool = False
+_loop: AbstractEventLoop | None = None
+_loop_thread: threading.Thread | None = None
+# calls that need to be executed in Blender's main thread
+_main_queue: queue.SimpleQueue = queue.SimpleQueue()
+# tasks submitted to the loop that are not done yet
+_running_tasks: set[concurrent.futures.Future] = set()
+_running_tasks_lock: threading.Lock = threading.Lock()
+
+_drain_interval: float = MIN_DRAIN_INTERVAL
+# wall clock time the draining started and CPU time spent draining since
+_drain_start_time: float = 0.0
+_drain_cpu_time: float = 0.0
 
 
 def setup_asyncio_executor() -> None:
-    """Sets up AsyncIO to run properly on each platform."""
+    """Starts the asyncio loop in a background thread."""
 
-    if kick_async_loop():
-        erase_async_loop()
-        global _loop_kicking_operator_running
-        _loop_kicking_operator_running = False
+    global _loop, _loop_thread
 
-    # On windows, ProactorEventLoop is now also the default event loop
-    # Source: https://docs.python.org/3.11/library/asyncio-platforms.html#asyncio-windows-subprocess
-    loop: AbstractEventLoop = asyncio.get_event_loop()
+    if _loop_thread is not None and _loop_thread.is_alive():
+        return
 
+    _loop = asyncio.new_event_loop()
     executor: ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor(max_workers=10)
-    loop.set_default_executor(executor)
-    loop.set_debug(
+    _loop.set_default_executor(executor)
+    _loop.set_debug(
         True if rendergate_logger.getEffectiveLevel() == logging.DEBUG else False
     )
 
+    _loop_thread = threading.Thread(
+        target=_run_loop, args=(_loop,), name="RendergateAsyncLoop", daemon=True
+    )
+    _loop_thread.start()
+
+
+def _run_loop(loop: AbstractEventLoop) -> None:
+    """Runs the loop in the background thread until it gets stopped."""
+
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_forever()
+    finally:
+        # cancel what is left, and give it a chance to clean up
+        tasks: set[asyncio.Task] = asyncio.all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
+        rendergate_logger.debug("Asyncio loop closed")
+
+
+def get_loop() -> AbstractEventLoop:
+    """The asyncio loop running in the background thread."""
+
+    if _loop is None or _loop.is_closed():
+        setup_asyncio_executor()
+    return _loop
+
+
+def erase_async_loop() -> None:
+    """Stop the loop and its thread, cancelling all running tasks."""
+
+    global _loop, _loop_thread
+
+    rendergate_logger.debug("Erasing async loop")
+
+    if bpy.app.timers.is_registered(_drain_main_queue):
+        bpy.app.timers.unregister(_drain_main_queue)
+
+    if _loop is not None and not _loop.is_closed():
+        _loop.call_soon_threadsafe(_loop.stop)
+    if _loop_thread is not None:
+        _loop_thread.join(timeout=5)
+        if _loop_thread.is_alive():
+            rendergate_logger.warning("Asyncio loop thread didn't stop in time.")
+
+    _loop = None
+    _loop_thread = None
+    with _running_tasks_lock:
+        _running_tasks.clear()
 
-def kick_async_loop(*args) -> bool:
+
+def submit(coroutine: typing.Coroutine) -> concurrent.futures.Future:
     """
-    Performs a single iteration of the asyncio event loop.
+    Run a coroutine in the background loop.
+    Must be called from the main thread.
 
-    :return: whether the asyncio loop should stop after this kick.
+    Returns:
+        A thread-safe future of the result of the coroutine.
     """
 
-    loop: AbstractEventLoop = asyncio.get_event_loop()
+    future: concurrent.futures.Future = asyncio.run_coroutine_threadsafe(
+        coroutine, get_loop()
+    )
+    with _running_tasks_lock:
+        _running_tasks.add(future)
+    future.add_done_callback(_task_done)
 
-    # Even when we want to stop, we always need to do one more
-    # 'kick' to handle task-done callbacks.
-    stop_after_this_kick: bool = False
+    ensure_async_loop()
 
-    if loop.is_closed():
-        rendergate_logger.warning("Loop closed, stopping immediately.")
-        return True
+    return future
 
-    all_tasks: set[Task[Any]] = asyncio.all_tasks(loop)
-    if not len(all_tasks):
-        rendergate_logger.debug("No more scheduled tasks, stopping after this kick.")
-        stop_after_this_kick = True
 
-    elif all(task.done() for task in all_tasks):
-        rendergate_logger.debug(
-            f"All {len(all_tasks)} tasks are done, fetching results and stopping after this kick."
-        )
-        stop_after_this_kick = True
+def _task_done(future: concurrent.futures.Future) -> None:
+    with _running_tasks_lock:
+        _running_tasks.discard(future)
 
-        # Clean up circular references between tasks.
-        gc.collect()
 
-        for task_idx, task in enumerate(all_tasks):
-            if not task.done():
-                continue
+def call_in_main_thread(func: Callable, *args, **kwargs) -> None:
+    """Queue a call to be executed in Blender's main thread, without waiting."""
 
-            try:
-                res: Any = task.result()
-                rendergate_logger.debug(f"Task #{task_idx}: result = {res}")
-            except asyncio.CancelledError:
-                # No problem, we want to stop anyway.
-                rendergate_logger.debug(f"Task #{task_idx}: cancelled")
-            except Exception:
-                rendergate_logger.error(f"{repr(task)}: resulted in exception")
-                traceback.print_exc()
+    _main_queue.put((func, args, kwargs, None))
 
-    loop.stop()
-    loop.run_forever()
 
-    return stop_after_this_kick
+async def run_in_main_thread(func: Callable, *args, **kwargs) -> Any:
+    """
+    Execute a call in Blender's main thread and wait for its result.
+    Must be awaited in the background loop.
+    """
 
+    loop: AbstractEventLoop = asyncio.get_running_loop()
+    future: asyncio.Future = loop.create_future()
+    _main_queue.put((func, args, kwargs, future))
 
-def ensure_async_loop() -> None:
-    rendergate_logger.debug("Starting asyncio loop")
-    # is {'RUNNING_MODAL'} or {'PASS_THROUGH'} or ...
-    result: set = bpy.ops.rendergate.loop()
-    rendergate_logger.debug("Result of starting modal operator is %r", result)
+    return await future
 
 
-def erase_async_loop() -> None:
-    global _loop_kicking_operator_running
+def _set_future_result(future: asyncio.Future, result: Any) -> None:
+    if not future.done():
+        future.set_result(result)
 
-    rendergate_logger.debug("Erasing async loop")
 
-    loop: AbstractEventLoop = asyncio.get_event_loop()
-    loop.stop()
+def _set_future_exception(future: asyncio.Future, exception: BaseException) -> None:
+    if not future.done():
+        future.set_exception(exception)
 
 
-@class_to_register
-class AsyncLoopModalOperator(bpy.types.Operator):
+def _drain_main_queue() -> float | None:
     """
-    Kicks the asyncio loop every 0.00001 seconds.
-    This is required to make sure the loop runs in the background.
+    Timer that executes the queued calls in Blender's main thread,
+    until no tasks are running anymore.
     """
 
-    bl_idname = "rendergate.loop"
-    bl_label = "Runs the asyncio main loop"
+    global _drain_interval, _drain_cpu_time
 
-    timer = None
+    cpu_start: float = time.thread_time()
+    deadline: float = time.perf_counter() + MAX_DRAIN_TIME
+    handled: int = 0
 
-    def __del__(self):
-        global _loop_kicking_operator_running 
-        rendergate_logger.debug("Deleting Async Operator")
-        # This can be required when the operator is running while Blender
-        # (re)loads a file. The operator then doesn't get the chance to
-        # finish the async tasks, hence stop_after_this_kick is never True.
-        _loop_kicking_operator_running = False
+    while time.perf_counter() < deadline:
+        try:
+            func, args, kwargs, future = _main_queue.get_nowait()
+        except queue.Empty:
+            break
 
-    def execute(self, context: Context):
-        return self.invoke(context, None)
+        handled += 1
+        try:
+            result: Any = func(*args, **kwargs)
+        except Exception as e:
+            if future is None:
+                rendergate_logger.exception(f"Exception in main thread call {func}")
+            else:
+                future.get_loop().call_soon_threadsafe(
+                    _set_future_exception, future, e
+                )
+        else:
+            if future is not None:
+                future.get_loop().call_soon_threadsafe(
+                    _set_future_result, future, result
+                )
 
-    def invoke(self, context: Context, event):
-        global _loop_kicking_operator_running
+    _drain_cpu_time += time.thread_time() - cpu_start
 
-        if _loop_kicking_operator_running:
-            rendergate_logger.debug("Another loop-kicking operator is already running.")
-            return {"PASS_THROUGH"}
+    if handled:
+        _drain_interval = MIN_DRAIN_INTERVAL
+        return _drain_interval
 
-        context.window_manager.modal_handler_add(self)
-        _loop_kicking_operator_running = True
+    with _running_tasks_lock:
+        tasks_running: bool = len(_running_tasks) > 0
+    if not tasks_running and _main_queue.empty():
+        rendergate_logger.debug(
+            f"Stopped draining main thread queue after {time.monotonic() - _drain_start_time:.1f}s, "
+            f"using {get_loop_cpu_usage():.1%} CPU of the main thread"
+        )
+        return None
 
-        wm: WindowManager = context.window_manager
-        self.timer = wm.event_timer_add(0.00001, window=context.window)
+    _drain_interval = min(_drain_interval * DRAIN_BACKOFF, MAX_DRAIN_INTERVAL)
+    return _drain_interval
 
-        return {"RUNNING_MODAL"}
 
-    def modal(self, context: Context, event):
-        global _loop_kicking_operator_running
+def execute_queued_calls() -> None:
+    """
+    Execute the calls queued for Blender's main thread right away,
+    for coroutines that aren't tasks, so the queue isn't drained for them.
+    Must be called from the main thread.
+    """
 
-        # If _loop_kicking_operator_running is set to False, someone called
-        # erase_async_loop(). This is a signal that we really should stop
-        # running.
-        if not _loop_kicking_operator_running:
-            return {"FINISHED"}
+    _drain_main_queue()
 
-        if event.type != "TIMER":
-            return {"PASS_THROUGH"}
 
-        rendergate_logger.debug("KICKING LOOP")
-        # stop after this kick?
-        if kick_async_loop():
-            context.window_manager.event_timer_remove(self.timer)
-            _loop_kicking_operator_running = False
+def get_loop_cpu_usage() -> float:
+    """Share of the main thread's time used for Rendergate calls since draining started."""
 
-            rendergate_logger.debug("Stopped asyncio loop kicking")
-            return {"FINISHED"}
+    wall_time: float = time.monotonic() - _drain_start_time
+    if wall_time <= 0.0:
+        return 0.0
+    return _drain_cpu_time / wall_time
 
-        return {"RUNNING_MODAL"}
+
+def ensure_async_loop() -> None:
+    """Start draining the main thread queue, if it isn't drained already."""
+
+    global _drain_interval, _drain_start_time, _drain_cpu_time
+
+    # there is new work, drain fast
+    _drain_interval = MIN_DRAIN_INTERVAL
+
+    if bpy.app.timers.is_registered(_drain_main_queue):
+        return
+
+    rendergate_logger.debug("Start draining main thread queue")
+    _drain_start_time = time.monotonic()
+    _drain_cpu_time = 0.0
+    bpy.app.timers.register(_drain_main_queue, first_interval=0.0)
 
 
 class AsyncModalOperatorMixin:
-    async_task = None  # asyncio task for fetching thumbnails
-    # asyncio future for signalling that we want to cancel everything.
-    signalling_future = None
+    # future of the async task running in the background loop
+    async_task: concurrent.futures.Future | None = None
+
+    # the task of this operator, only conflicting tasks are rejected
+    task: Task | None = None
 
     _state = "INITIALIZING"
     stop_upon_exception = True
 
+    def new_task(self, context: Context) -> Task | None:
+        """The task this operator runs, or None if it can run any time.
+
+        Implement in a subclass.
+        """
+        return None
+
     def invoke(self, context: Context, event):
+        self.task = self.new_task(context)
+        if self.task is not None and not tasks.start_task(self.task):
+            self.report({"WARNING"}, f"Already running: {self.task.label}")
+            self.task = None
+            return {"CANCELLED"}
+
         context.window_manager.modal_handler_add(self)
         self.timer = context.window_manager.event_timer_add(
             1 / 15, window=context.window
@@ -220,12 +330,17 @@ class AsyncModalOperatorMixin:
                 )
 
         self._new_async_task(self.async_execute(context, context_pointers))
+        # also ends the task if the modal operator gets killed, e.g. by loading a file
+        if self.task is not None:
+            task: Task = self.task
+            self.async_task.add_done_callback(lambda _: tasks.finish_task(task))
 
         return {"RUNNING_MODAL"}
 
     async def async_execute(self, context: Context, context_pointers: dict[Any]):
         """Entry point of the asynchronous operator.
 
+        Runs in the background loop, use `run_in_main_thread` to touch bpy.
         Implement in a subclass.
         """
         return
@@ -252,6 +367,10 @@ class AsyncModalOperatorMixin:
 
                 return {"RUNNING_MODAL"}
 
+        # the async task ended without quitting, e.g. after a caught exception
+        if task and task.done():
+            self.quit()
+
         if self._state == "QUIT":
             self._finish(context)
             return {"FINISHED"}
@@ -261,10 +380,13 @@ class AsyncModalOperatorMixin:
     def _finish(self, context: Context):
         self._stop_async_task()
         context.window_manager.event_timer_remove(self.timer)
+        if self.task is not None:
+            tasks.finish_task(self.task)
+            self.task = None
+            if context.area:
+                context.area.tag_redraw()
 
-    def _new_async_task(
-        self, async_task: typing.Coroutine, future: asyncio.Future = None
-    ):
+    def _new_async_task(self, async_task: typing.Coroutine):
         """Stops the currently running async task, and starts another one."""
 
         rendergate_logger.debug(
@@ -272,14 +394,9 @@ class AsyncModalOperatorMixin:
         )
         self._stop_async_task()
 
-        # Download the previews asynchronously.
-        self.signalling_future = future or asyncio.Future()
-        self.async_task = asyncio.ensure_future(async_task)
+        self.async_task = submit(async_task)
         rendergate_logger.debug("Created new task %r", self.async_task)
 
-        # Start the async manager so everything happens.
-        ensure_async_loop()
-
     def _stop_async_task(self):
         rendergate_logger.debug("Stopping async task")
         if self.async_task is None:
@@ -287,28 +404,23 @@ class AsyncModalOperatorMixin:
             return
 
         # Signal that we want to stop.
-        self.async_task.cancel()
-        if not self.signalling_future.done():
+        if not self.async_task.done():
             rendergate_logger.info(
                 "Signalling that we want to cancel anything that's running."
             )
-            self.signalling_future.cancel()
+            self.async_task.cancel()
 
-        # Wait until the asynchronous task is done.
+        # Don't block the main thread waiting for the task,
+        # it might wait for a call in the main thread itself.
         if not self.async_task.done():
-            rendergate_logger.info("blocking until async task is done.")
-            loop = asyncio.get_event_loop()
-            try:
-                loop.run_until_complete(self.async_task)
-            except asyncio.CancelledError:
-                rendergate_logger.info("Asynchronous task was cancelled")
-                return
+            rendergate_logger.info("Async task is still being cancelled.")
+            return
 
         # noinspection PyBroadException
         try:
             # This re-raises any exception of the task.
             self.async_task.result()
-        except asyncio.CancelledError:
+        except concurrent.futures.CancelledError:
             rendergate_logger.info("Asynchronous task was cancelled")
         except Exception:
             rendergate_logger.exception("Exception from asynchronous task")
@@ -0,0 +1,227 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+"""
+Login to AWS Cognito and keeping the token of the session fresh.
+
+The id token expires after a while. Instead of finding out from a 401
+in the middle of an operation, the expiry is read from the token itself
+and the token is refreshed with the Cognito refresh token before it expires.
+"""
+
+
+import time
+import asyncio
+import traceback
+import concurrent.futures
+from . import async_loop, cognito
+from .global_vars import rendergate_logger
+from ..data import session, credentials, job_cache
+
+# aws authentication
+REGION: str = "us-east-2"
+USER_POOL_ID: str = "us-east-2_0iJztlRUB"
+USER_POOL_WEB_CLIENT_ID: str = "6m7eldka3q9f20nmev7smovnf6"
+
+# refresh the token this many seconds before it expires
+REFRESH_MARGIN: float = 300.0
+# longest sleep of the background refresh, so it notices when the computer slept
+REFRESH_CHECK_INTERVAL: float = 60.0
+
+# the refresh that is running, all requests that need a token wait for it
+_refresh_task: asyncio.Task | None = None
+# keeps the token fresh in the background while logged in
+_keep_fresh_future: concurrent.futures.Future | None = None
+
+
+def token_expiry(token: str) -> float:
+    """
+    Unix time when the token expires, 0 if unknown.
+    The signature isn't verified, the server does that,
+    we only need to know when to refresh.
+    """
+
+    # imported on first use, so it doesn't slow down registering the addon
+    from jose import jwt
+
+    try:
+        return float(jwt.get_unverified_claims(token).get("exp", 0))
+    except Exception:
+        rendergate_logger.error(traceback.format_exc())
+        return 0.0
+
+
+async def authenticate(username: str, password: str) -> tuple[str, str]:
+    """
+    Log into AWS cognito with SRP, the password never leaves Blender.
+
+    Returns:
+        The id token and the refresh token.
+    """
+
+    result: dict[str, str] = await cognito.authenticate(
+        REGION, USER_POOL_ID, USER_POOL_WEB_CLIENT_ID, username, password
+    )
+
+    return result["IdToken"], result["RefreshToken"]
+
+
+async def renew(refresh_token: str) -> str:
+    """Get a new id token with the refresh token."""
+
+    result: dict[str, str] = await cognito.refresh(
+        REGION, USER_POOL_WEB_CLIENT_ID, refresh_token
+    )
+
+    return result["IdToken"]
+
+
+def expires_soon(margin: float = REFRESH_MARGIN) -> bool:
+    """If the token of the session expires within the margin."""
+
+    expires_at: float = session.get_expires_at()
+    return bool(expires_at) and expires_at - margin <= time.time()
+
+
+async def _refresh() -> None:
+    """Refresh the token of the session, or log out if that's not possible."""
+
+    refresh_token: str = session.get_refresh_token()
+    if not refresh_token:
+        return
+
+    try:
+        aws_token: str = await renew(refresh_token)
+    except Exception:
+        rendergate_logger.error(traceback.format_exc())
+        # the refresh token expired or got revoked, the user needs to log in again
+        if time.time() >= session.get_expires_at():
+            session.log_out()
+        return
+
+    session.update_token(aws_token, token_expiry(aws_token))
+    rendergate_logger.info("Token refreshed.")
+
+
+async def ensure_token(force_refresh: bool = False) -> str:
+    """
+    The token of the session, refreshed first if it expires soon.
+    Concurrent callers all wait for the same refresh.
+    Must be awaited in the background loop.
+
+    Args:
+        force_refresh: Refresh even if the token doesn't expire soon,
+            e.g. after rendergate.ch rejected it.
+    """
+
+    global _refresh_task
+
+    if session.is_logged_in() and (force_refresh or expires_soon()):
+        if _refresh_task is None or _refresh_task.done():
+            _refresh_task = asyncio.ensure_future(_refresh())
+        # a cancelled caller must not cancel the refresh of the others
+        await asyncio.shield(_refresh_task)
+
+    return session.get_aws_token()
+
+
+async def _keep_token_fresh() -> None:
+    """Refresh the token shortly before it expires, as long as we're logged in."""
+
+    while session.is_logged_in() and session.get_refresh_token():
+        if expires_soon():
+            await ensure_token()
+
+        # Wait until shortly before the token expires. If the refresh failed
+        # or the expiry is unknown, check again later instead of right away.
+        delay: float = session.get_expires_at() - REFRESH_MARGIN - time.time()
+        if session.get_expires_at() <= 0 or delay <= 0:
+            delay = REFRESH_CHECK_INTERVAL
+        await asyncio.sleep(min(delay, REFRESH_CHECK_INTERVAL))
+
+
+def keep_token_fresh() -> None:
+    """
+    Start refreshing the token in the background, e.g. after logging in.
+    Runs in the background loop without being an operator task,
+    so it doesn't keep the main thread queue busy.
+    """
+
+    global _keep_fresh_future
+
+    if _keep_fresh_future is not None and not _keep_fresh_future.done():
+        _keep_fresh_future.cancel()
+
+    _keep_fresh_future = asyncio.run_coroutine_threadsafe(
+        _keep_token_fresh(), async_loop.get_loop()
+    )
+
+
+def _is_not_authorized(exception: Exception) -> bool:
+    """If Cognito rejected the refresh token, not e.g. because we're offline."""
+
+    return (
+        isinstance(exception, cognito.CognitoError)
+        and exception.code == "NotAuthorizedException"
+    )
+
+
+async def restore_session() -> bool:
+    """
+    Log in with the saved refresh token, instead of the password.
+
+    Returns:
+        If the session got restored.
+    """
+
+    saved: tuple[str, str] | None = credentials.load_credentials()
+    if saved is None or session.is_logged_in():
+        return False
+    username, refresh_token = saved
+
+    try:
+        aws_token: str = await renew(refresh_token)
+    except Exception as e:
+        rendergate_logger.error(traceback.format_exc())
+        # expired or revoked, it's of no use anymore
+        if _is_not_authorized(e):
+            credentials.delete_credentials()
+        return False
+
+    session.log_in(username, aws_token, refresh_token, token_expiry(aws_token))
+    keep_token_fresh()
+    rendergate_logger.info("Restored the saved login.")
+
+    return True
+
+
+async def _restore_session_and_jobs() -> None:
+    if await restore_session():
+        await async_loop.run_in_main_thread(job_cache.restore_jobs_of_scene)
+
+
+def restore_session_timer() -> None:
+    """
+    Timer to log in with the saved login after the addon got registered,
+    because the preferences aren't available during registration.
+    """
+
+    from ..properties.preferences import get_preferences
+
+    if not session.is_logged_in() and get_preferences().remember_login:
+        async_loop.submit(_restore_session_and_jobs())
+
+    # don't repeat
+    return None
@@ -0,0 +1,275 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+"""
+Minimal AWS Cognito client for logging in, without boto3.
+
+Talks to the JSON API of the Cognito user pool directly with the shared
+HTTP client. Supports logging in with the Secure Remote Password
+protocol (USER_SRP_AUTH), so the password never leaves Blender,
+and getting new tokens with the refresh token (REFRESH_TOKEN_AUTH).
+
+The SRP math follows the AuthenticationHelper of amazon-cognito-identity-js.
+"""
+
+
+import hmac
+import json
+import base64
+import hashlib
+import secrets
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+from . import rest_client
+
+# only for type hints, httpx is imported on first use
+if TYPE_CHECKING:
+    from httpx import Response
+
+# https://github.com/aws/amazon-cognito-identity-js/blob/master/src/AuthenticationHelper.js
+N_HEX: str = (
+    "FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD1"
+    "29024E088A67CC74020BBEA63B139B22514A08798E3404DD"
+    "EF9519B3CD3A431B302B0A6DF25F14374FE1356D6D51C245"
+    "E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED"
+    "EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3D"
+    "C2007CB8A163BF0598DA48361C55D39A69163FA8FD24CF5F"
+    "83655D23DCA3AD961C62F356208552BB9ED529077096966D"
+    "670C354E4ABC9804F1746C08CA18217C32905E462E36CE3B"
+    "E39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9"
+    "DE2BCBF6955817183995497CEA956AE515D2261898FA0510"
+    "15728E5A8AAAC42DAD33170D04507A33A85521ABDF1CBA64"
+    "ECFB850458DBEF0A8AEA71575D060C7DB3970F85A6E1E4C7"
+    "ABF5AE8CDB0933D71E8C94E04A25619DCEE3D2261AD2EE6B"
+    "F12FFA06D98A0864D87602733EC86A64521F2B18177B200C"
+    "BBE117577A615D6C770988C0BAD946E208E24FA074E5AB31"
+    "43DB5BFCE0FD108E4B82D120A93AD2CAFFFFFFFFFFFFFFFF"
+)
+G_HEX: str = "2"
+INFO_BITS: bytes = b"Caldera Derived Key"
+
+BIG_N: int = int(N_HEX, 16)
+G: int = int(G_HEX, 16)
+
+# the timestamp of the challenge response must be in english
+_DAYS: tuple[str, ...] = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS: tuple[str, ...] = (
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+)
+
+
+class CognitoError(Exception):
+    """Cognito rejected a request, e.g. because of a wrong password."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message or code)
+        self.code: str = code
+
+
+def _hex_hash(hex_string: str) -> str:
+    return hashlib.sha256(bytes.fromhex(hex_string)).hexdigest()
+
+
+def _pad_hex(value: int | str) -> str:
+    """Hex of a number, padded so it's a positive number when hashed."""
+
+    hex_string: str = value if isinstance(value, str) else f"{value:x}"
+    if len(hex_string) % 2 == 1:
+        return f"0{hex_string}"
+    if hex_string[0] in "89ABCDEFabcdef":
+        return f"00{hex_string}"
+    return hex_string
+
+
+def _hkdf(ikm: bytes, salt: bytes) -> bytes:
+    prk: bytes = hmac.new(salt, ikm, hashlib.sha256).digest()
+    return hmac.new(prk, INFO_BITS + b"\x01", hashlib.sha256).digest()[:16]
+
+
+def _timestamp(now: datetime) -> str:
+    """E.g. "Tue Mar 4 09:05:01 UTC 2025", day of the month without zero padding."""
+
+    return (
+        f"{_DAYS[now.weekday()]} {_MONTHS[now.month - 1]} {now.day} "
+        f"{now:%H:%M:%S} UTC {now.year}"
+    )
+
+
+class SRP:
+    """The client side of one SRP login."""
+
+    K: int = int(_hex_hash(f"00{N_HEX}0{G_HEX}"), 16)
+
+    def __init__(self, pool_id: str, small_a: int | None = None):
+        # the part of the pool id after the region
+        self.pool_name: str = pool_id.split("_")[1]
+        self.small_a: int = small_a or secrets.randbits(1024) % BIG_N
+        self.large_a: int = pow(G, self.small_a, BIG_N)
+        if self.large_a % BIG_N == 0:
+            raise ValueError("Safety check for A failed")
+
+    @property
+    def srp_a(self) -> str:
+        return f"{self.large_a:x}"
+
+    def _authentication_key(
+        self, username: str, password: str, server_b: int, salt: str
+    ) -> bytes:
+        u: int = int(_hex_hash(_pad_hex(self.large_a) + _pad_hex(server_b)), 16)
+        if u == 0:
+            raise ValueError("U cannot be zero.")
+
+        user_password_hash: str = hashlib.sha256(
+            f"{self.pool_name}{username}:{password}".encode("utf-8")
+        ).hexdigest()
+        x: int = int(_hex_hash(_pad_hex(salt) + user_password_hash), 16)
+        s: int = pow(server_b - self.K * pow(G, x, BIG_N), self.small_a + u * x, BIG_N)
+
+        return _hkdf(bytes.fromhex(_pad_hex(s)), bytes.fromhex(_pad_hex(f"{u:x}")))
+
+    def challenge_responses(
+        self, challenge: dict[str, str], password: str, now: datetime | None = None
+    ) -> dict[str, str]:
+        """Answer the PASSWORD_VERIFIER challenge."""
+
+        user_id: str = challenge["USER_ID_FOR_SRP"]
+        secret_block: str = challenge["SECRET_BLOCK"]
+        timestamp: str = _timestamp(now or datetime.now(timezone.utc))
+
+        key: bytes = self._authentication_key(
+            user_id, password, int(challenge["SRP_B"], 16), challenge["SALT"]
+        )
+        message: bytes = (
+            self.pool_name.encode("utf-8")
+            + user_id.encode("utf-8")
+            + base64.standard_b64decode(secret_block)
+            + timestamp.encode("utf-8")
+        )
+        signature: bytes = hmac.new(key, message, hashlib.sha256).digest()
+
+        return {
+            "TIMESTAMP": timestamp,
+            "USERNAME": user_id,
+            "PASSWORD_CLAIM_SECRET_BLOCK": secret_block,
+            "PASSWORD_CLAIM_SIGNATURE": base64.standard_b64encode(signature).decode(),
+        }
+
+
+async def _call(region: str, action: str, body: dict) -> dict:
+    """Call an action of the Cognito identity provider API."""
+
+    response: Response = await rest_client.get_client().post(
+        f"https://cognito-idp.{region}.amazonaws.com/",
+        content=json.dumps(body),
+        headers={
+            "Content-Type": "application/x-amz-json-1.1",
+            "X-Amz-Target": f"AWSCognitoIdentityProviderService.{action}",
+        },
+    )
+    try:
+        data: dict = response.json()
+    except ValueError:
+        data = {}
+
+    if response.status_code != 200:
+        # e.g. "com.amazon.coral.service#NotAuthorizedException"
+        code: str = data.get("__type", str(response.status_code)).split("#")[-1]
+        raise CognitoError(code, data.get("message", data.get("Message", "")))
+
+    return data
+
+
+async def authenticate(
+    region: str, pool_id: str, client_id: str, username: str, password: str
+) -> dict[str, str]:
+    """
+    Log in with username and password.
+
+    Returns:
+        The AuthenticationResult with the IdToken, AccessToken and RefreshToken.
+    """
+
+    srp: SRP = SRP(pool_id)
+    response: dict = await _call(
+        region,
+        "InitiateAuth",
+        {
+            "AuthFlow": "USER_SRP_AUTH",
+            "ClientId": client_id,
+            "AuthParameters": {"USERNAME": username, "SRP_A": srp.srp_a},
+        },
+    )
+
+    challenge_name: str | None = response.get("ChallengeName")
+    if challenge_name != "PASSWORD_VERIFIER":
+        raise CognitoError(
+            challenge_name, f"The {challenge_name} challenge is not supported."
+        )
+
+    response = await _call(
+        region,
+        "RespondToAuthChallenge",
+        {
+            "ChallengeName": "PASSWORD_VERIFIER",
+            "ClientId": client_id,
+            "ChallengeResponses": srp.challenge_responses(
+                response["ChallengeParameters"], password
+            ),
+        },
+    )
+
+    if "AuthenticationResult" not in response:
+        challenge_name = response.get("ChallengeName")
+        if challenge_name == "NEW_PASSWORD_REQUIRED":
+            raise CognitoError(
+                challenge_name, "Please change your password on rendergate.ch first."
+            )
+        raise CognitoError(
+            challenge_name, f"The {challenge_name} challenge is not supported."
+        )
+
+    return response["AuthenticationResult"]
+
+
+async def refresh(region: str, client_id: str, refresh_token: str) -> dict[str, str]:
+    """
+    Get new tokens with the refresh token.
+
+    Returns:
+        The AuthenticationResult with the IdToken and AccessToken.
+    """
+
+    response: dict = await _call(
+        region,
+        "InitiateAuth",
+        {
+            "AuthFlow": "REFRESH_TOKEN_AUTH",
+            "ClientId": client_id,
+            "AuthParameters": {"REFRESH_TOKEN": refresh_token},
+        },
+    )
+
+    return response["AuthenticationResult"]
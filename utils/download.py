@@ -0,0 +1,141 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Download of the rendered results of a job, by the download operator
+or in the background as soon as the job finished rendering.
+"""
+
+
+import bpy
+from pathlib import PurePath
+from typing import TYPE_CHECKING
+from bpy.types import Context
+from . import rest_client, auth
+from .tasks import Task
+from .models import Job
+from .utils import progress
+from .progress import ProgressChannel
+from .async_loop import run_in_main_thread
+from .global_vars import rendergate_logger
+from ..data import session
+
+# only for type hints, httpx is imported on first use
+if TYPE_CHECKING:
+    from httpx import Response
+
+PROGRESS_START: float = 0.1
+PROGRESS_END: float = 0.999
+
+
+async def download_job(
+    task: Task,
+    context: Context | None,
+    job: Job,
+    api_url: str,
+    download_folder: str,
+) -> tuple[set[str], str]:
+    """
+    Download the zip-file of a render job to the download folder,
+    showing the progress on the task.
+
+    Args:
+        task: The task that shows the progress.
+        context: The context of the area to redraw, None to redraw all.
+        job: The render job to download.
+        api_url: The URL of the rendergate.ch API.
+        download_folder: The folder to download to, can be relative to the blend-file.
+
+    Returns:
+        The report type and message of the result.
+    """
+
+    await progress(
+        task,
+        "progress",
+        PROGRESS_START,
+        context,
+        text="10% - Downloading...",
+    )
+
+    headers: dict = {"auth": await auth.ensure_token()}
+
+    # download render job
+    response: Response | str = await rest_client.request(
+        url=f"{api_url}/project/{job.identifier}/download",
+        headers=headers,
+        request="POST",
+    )
+
+    # error occured
+    if isinstance(response, str):
+        if response.startswith("Token expired"):
+            session.log_out()
+            return {"INFO"}, response
+        return {"ERROR"}, response
+
+    response_json: dict = response.json()
+
+    download_link: str | None = response_json.get("link", None) or None
+    if download_link is None:
+        await _not_downloaded(task, context)
+        return {"WARNING"}, f"Could not get download link. {response_json}"
+
+    # download to specified folder
+    file_path: PurePath = PurePath(
+        PurePath(await run_in_main_thread(bpy.path.abspath, download_folder))
+        / PurePath(f"{job.name}.zip")
+    )
+
+    try:
+        await rest_client.download_file(
+            download_link,
+            file_path,
+            ProgressChannel(
+                task,
+                context,
+                label=f"Download {job.name}",
+                start=PROGRESS_START,
+                end=PROGRESS_END,
+            ).update,
+        )
+    except FileNotFoundError as e:
+        await _not_downloaded(task, context)
+        return {"WARNING"}, f"The download folder does not exist. {repr(e)}"
+    except Exception as e:
+        await _not_downloaded(task, context)
+        return {"WARNING"}, f"Could not download zip-file. {repr(e)}"
+
+    rendergate_logger.info(f"Downloaded file to: {file_path}")
+
+    await progress(
+        task,
+        "progress",
+        PROGRESS_END,
+        context,
+        sleep=1,
+        text="100% - Downloaded",
+    )
+    return {"INFO"}, "Zip-file downloaded."
+
+
+async def _not_downloaded(task: Task, context: Context | None) -> None:
+    await progress(
+        task,
+        "progress",
+        PROGRESS_END,
+        context,
+        sleep=1,
+        text="100% - Not downloaded!",
+    )
@@ -11,19 +11,22 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from decimal import Decimal
 from .enums import Stage
 
+# seconds the texts of a job are cached, e.g. "Created: 5 minutes ago"
+TEXT_TTL: float = 30.0
 
-@dataclass
+
+@dataclass(slots=True, frozen=True, eq=False)
 class Job:
     identifier: str
     number: int
     name: str
-    display_name: str
-    description: str
-    created: str
+    # creation time as UTC timestamp, None if unknown
+    created_timestamp: float | None
     project_name: str
     stage: Stage
     progress: str
@@ -32,6 +35,75 @@ class Job:
     time_estimation: float
     time: float
     preview_link: str
+    # lazily created (created, display_name, description, enum item),
+    # and when they were created. Jobs are frozen and get replaced
+    # when their data changes, so only the relative creation time gets outdated.
+    _texts: tuple[str, str, str, tuple[str, str, str, int]] | None = field(
+        default=None, init=False, repr=False
+    )
+    _texts_time: float = field(default=0.0, init=False, repr=False)
 
     def __eq__(self, other):
+        if isinstance(other, Job):
+            return self.identifier == other.identifier
         return self.identifier == other
+
+    def __hash__(self):
+        return hash(self.identifier)
+
+    def _get_texts(self) -> tuple[str, str, str, tuple[str, str, str, int]]:
+        """
+        Create the texts only when they get displayed,
+        and cache them shortly, since they contain the relative creation time.
+        """
+
+        now: float = time.monotonic()
+        if self._texts is not None and now - self._texts_time < TEXT_TTL:
+            return self._texts
+
+        if self.created_timestamp is None:
+            created_ago: str = "-"
+        else:
+            # imported on first use, so it doesn't slow down registering the addon
+            import humanize
+
+            created_ago: str = humanize.naturaltime(
+                max(0.0, time.time() - self.created_timestamp)
+            )
+
+        display_name: str = f'"{self.name}" {created_ago}'
+        description: str = (
+            f"Job {self.number}\nCreated: {created_ago}\nProject: {self.project_name}\nStage: {self.stage}\nProgress: {self.progress}\nCost Estimation: ${self.cost_estimation}\nCost: {self.cost}\nTime Estimation: {self.time_estimation}\nTime: {self.time}"
+        )
+        enum_item: tuple[str, str, str, int] = (
+            self.identifier,
+            display_name,
+            description,
+            self.number,
+        )
+
+        # the only fields that change, the job is frozen otherwise
+        object.__setattr__(
+            self, "_texts", (created_ago, display_name, description, enum_item)
+        )
+        object.__setattr__(self, "_texts_time", now)
+
+        return self._texts
+
+    @property
+    def created(self) -> str:
+        return self._get_texts()[0]
+
+    @property
+    def display_name(self) -> str:
+        return self._get_texts()[1]
+
+    @property
+    def description(self) -> str:
+        return self._get_texts()[2]
+
+    @property
+    def enum_item(self) -> tuple[str, str, str, int]:
+        """The item of this job for the jobs EnumProperty."""
+
+        return self._get_texts()[3]
@@ -0,0 +1,169 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+"""
+Progress of long transfers, e.g. uploads and downloads.
+"""
+
+
+import time
+from typing import Callable
+from datetime import timedelta
+from bpy.types import Context
+from .tasks import Task
+from .utils import redraw
+from .async_loop import call_in_main_thread
+from .global_vars import rendergate_logger
+
+# how many times per second the progress gets redrawn at most
+PROGRESS_RATE: float = 10.0
+# how many times per second the progress gets logged at most
+LOG_RATE: float = 1.0
+# weight of the newest throughput sample, the rest is the history
+EWMA_ALPHA: float = 0.3
+
+MB: int = 1024 * 1024
+
+# the clock of the samples, replaced in tests
+_monotonic: Callable[[], float] = time.monotonic
+
+
+class ProgressChannel:
+    """
+    Reports the progress of a transfer to its task.
+
+    Updates are cheap and can be sent for every chunk. They are coalesced,
+    so the task gets redrawn at most `rate` times a second and logged at most
+    `log_rate` times a second, no matter how many chunks there are.
+    The throughput and the remaining time are smoothed with an
+    exponentially weighted moving average.
+    """
+
+    def __init__(
+        self,
+        task: Task,
+        context: Context,
+        label: str,
+        start: float = 0.0,
+        end: float = 1.0,
+        done: int = 0,
+        rate: float = PROGRESS_RATE,
+        log_rate: float = LOG_RATE,
+        alpha: float = EWMA_ALPHA,
+    ):
+        """
+        Args:
+            task: The task that shows the progress.
+            context: The context of the area to redraw.
+            label: What is transferred, for the log.
+            start: Progress of the task when the transfer starts.
+            end: Progress of the task when the transfer is done.
+            done: Bytes already transferred, e.g. of a resumed upload,
+                so they don't count as throughput of the first sample.
+            rate: Max redraws per second.
+            log_rate: Max log lines per second.
+            alpha: Weight of the newest throughput sample, between 0 and 1.
+        """
+
+        self.task: Task = task
+        self.context: Context = context
+        self.label: str = label
+        self.start: float = start
+        self.end: float = end
+        self.interval: float = 1.0 / rate
+        self.log_interval: float = 1.0 / log_rate
+        self.alpha: float = alpha
+
+        # bytes per second, None until there is a sample
+        self.throughput: float | None = None
+
+        now: float = _monotonic()
+        self._total: int = 0
+        self._sample_time: float = now
+        self._sample_done: int = done
+        self._log_time: float = now
+        self._value: float = start
+        self._text: str = ""
+        # if the task is already waiting to be updated in the main thread
+        self._pending: bool = False
+
+    @property
+    def eta(self) -> float | None:
+        """Estimated seconds until the transfer is done, None if unknown."""
+
+        if not self.throughput:
+            return None
+        return max(0.0, (self._total - self._sample_done) / self.throughput)
+
+    def update(self, done: int, total: int) -> None:
+        """Set the transferred and total bytes. Can be called from any thread."""
+
+        self._total = total
+        finished: bool = done >= total
+
+        now: float = _monotonic()
+        elapsed: float = now - self._sample_time
+        if elapsed < self.interval and not finished:
+            return
+
+        # smooth the throughput of the last interval
+        if elapsed > 0:
+            # a retried part goes back, that's no negative throughput
+            sample: float = max(0.0, (done - self._sample_done) / elapsed)
+            if self.throughput is None:
+                self.throughput = sample
+            else:
+                self.throughput = (
+                    self.alpha * sample + (1 - self.alpha) * self.throughput
+                )
+        self._sample_time = now
+        self._sample_done = done
+
+        share: float = done / total if total else 1.0
+        self._value = self.start + (self.end - self.start) * share
+        self._text = f"{int(self._value * 100)}% - {done / MB:.1f}/{total / MB:.1f} MB"
+        if self.throughput and not finished:
+            self._text += f" - {self.eta_text()}"
+
+        # the main thread uses the newest values when it gets to it,
+        # so there is never more than one update waiting
+        if not self._pending:
+            self._pending = True
+            call_in_main_thread(self._apply)
+
+        if now - self._log_time >= self.log_interval or finished:
+            self._log_time = now
+            rendergate_logger.info(
+                f"{self.label}: {done / MB:.1f}/{total / MB:.1f} MB, "
+                f"{(self.throughput or 0.0) / MB:.2f} MB/s, {self.eta_text()}"
+            )
+
+    def eta_text(self) -> str:
+        """The remaining time, readable."""
+
+        eta: float | None = self.eta
+        if eta is None:
+            return "time left unknown"
+        import humanize
+
+        return f"{humanize.naturaldelta(timedelta(seconds=eta))} left"
+
+    def _apply(self) -> None:
+        """Show the newest progress. Runs in the main thread."""
+
+        self._pending = False
+        self.task.progress = self._value
+        self.task.progress_text = self._text
+        redraw(self.context)
@@ -12,15 +12,173 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
 
+# httpx is imported on first use, so it doesn't slow down registering the addon
+from __future__ import annotations
+
+import math
 import asyncio
-from asyncio import AbstractEventLoop, Future
-from requests import Response, Session  # requests gets delivered with Blender 4.4
-from requests.exceptions import (
-    HTTPError,
-    Timeout,
-    ConnectionError,
-    RequestException,
-)
+from typing import Callable, TYPE_CHECKING
+from urllib.parse import urlsplit
+from asyncio import AbstractEventLoop
+from . import async_loop
+from .retry import RetryPolicy, CircuitBreaker, default_policy, parse_retry_after
+from .global_vars import rendergate_logger
+
+if TYPE_CHECKING:
+    from httpx import AsyncClient, Response
+
+TIMEOUT: float = 10.0
+# timeout for each read/write of the (large) upload parts, not for the whole upload
+UPLOAD_TIMEOUT: float = 60.0
+# Kinds of shared clients. Each has its own connection pool, so the upload
+# of a blend-file that uses all of its connections never makes
+# API calls or downloads wait for a free connection.
+API: str = "api"
+UPLOAD: str = "upload"
+# the stream of the job events, that keeps its connection open
+EVENTS: str = "events"
+# connection pool limit of each kind of client,
+# the upload pool needs a connection for each part that is uploaded at the same time
+POOL_MAX_CONNECTIONS: dict[str, int] = {
+    API: 10,
+    UPLOAD: 10,
+    EVENTS: 1,
+}
+
+# long-lived clients by kind, so connections get reused (keep-alive)
+# instead of doing a new TCP and TLS handshake for every request
+_clients: dict[str, AsyncClient] = {}
+# circuit breakers by host, to fail fast when a service is down
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_client(kind: str = API) -> AsyncClient:
+    """Get the shared async HTTP client of a kind, e.g. `API` or `UPLOAD`."""
+
+    client: AsyncClient | None = _clients.get(kind)
+    if client is None or client.is_closed:
+        from httpx import AsyncClient, Limits, Timeout
+
+        client = AsyncClient(
+            limits=Limits(
+                max_connections=POOL_MAX_CONNECTIONS[kind],
+                max_keepalive_connections=POOL_MAX_CONNECTIONS[kind],
+            ),
+            timeout=Timeout(TIMEOUT),
+        )
+        _clients[kind] = client
+
+    return client
+
+
+def close_client() -> None:
+    """Close the shared clients and their connections."""
+
+    clients: list[AsyncClient] = list(_clients.values())
+    _clients.clear()
+
+    for client in clients:
+        if client.is_closed:
+            continue
+        # the client belongs to the background loop, so close it there
+        try:
+            loop: AbstractEventLoop = async_loop.get_loop()
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout=5)
+        except Exception as e:
+            rendergate_logger.error(f"Could not close HTTP client: {repr(e)}")
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    """Get the circuit breaker of the host of the URL."""
+
+    host: str = urlsplit(url).netloc
+    breaker: CircuitBreaker | None = _circuit_breakers.get(host)
+    if breaker is None:
+        breaker = CircuitBreaker()
+        _circuit_breakers[host] = breaker
+
+    return breaker
+
+
+async def _send(
+    client: AsyncClient,
+    url: str,
+    headers: dict | None,
+    payload: dict | None,
+    files: dict | None,
+    request: str,
+) -> Response:
+    """Send a single request, raises httpx errors."""
+
+    if request == "POST":
+        return await client.post(
+            url,
+            headers=headers,
+            json=payload,
+            files=files,
+        )
+    elif request == "POST-DATA":
+        return await client.post(
+            url,
+            content=payload,
+        )
+    elif request == "PUT":
+        # streamed bodies need an explicit length,
+        # presigned S3 URLs don't accept chunked uploads
+        put_headers: dict = dict(headers or {})
+        if not isinstance(payload, (bytes, str)) and hasattr(payload, "__len__"):
+            put_headers["Content-Length"] = str(len(payload))
+        # send a streamed body from the start again when retrying
+        if hasattr(payload, "seek"):
+            payload.seek(0)
+        return await client.put(
+            url,
+            headers=put_headers,
+            content=payload,
+            timeout=UPLOAD_TIMEOUT,
+        )
+    # get
+    else:
+        return await client.get(
+            url,
+            headers=headers,
+        )
+
+
+def _is_host_failure(error: Exception) -> bool:
+    """
+    If the host couldn't be reached or didn't answer,
+    not e.g. that all connections of the local pool are busy (PoolTimeout).
+    """
+
+    import httpx
+
+    return isinstance(
+        error,
+        (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadError, httpx.ReadTimeout),
+    )
+
+
+def _response_or_error(response: Response) -> Response | str:
+    """Return the response if the request succeeded, otherwise an error string."""
+
+    if response.status_code >= 100 and response.status_code < 200:
+        return f"{response.status_code}: Informational Response: {response.text}"
+    elif response.status_code >= 200 and response.status_code < 300:
+        return response
+    # only sent for conditional requests, e.g. with an If-None-Match header
+    elif response.status_code == 304:
+        return response
+    elif response.status_code >= 300 and response.status_code < 400:
+        return f"{response.status_code}: Redirection: {response.text}"
+    elif response.status_code == 401:
+        return f"Token expired. Please log in again."
+    elif response.status_code >= 400 and response.status_code < 500:
+        return f"{response.status_code}: Client Error: {response.text}"
+    elif response.status_code >= 500 and response.status_code < 600:
+        return f"{response.status_code}: Server Error: {response.text}"
+    else:
+        return f"{response.status_code}: Unknown Response: {response.text}"
 
 
 async def request(
@@ -29,83 +187,107 @@ async def request(
     payload: dict = None,
     files: dict = None,
     request: str = "POST",
+    retry: RetryPolicy | None = None,
+    client_kind: str = API,
 ) -> Response | str:
     """Make a generic REST request to a service.
 
+    Transient errors (timeouts, connection errors, 429 and 5xx responses)
+    are retried according to the retry policy.
+    By default only idempotent requests (GET and PUT) are retried.
+
     Args:
         url: The URL of the service.
         payload: Optional data to send with the request.
         header: Optional headers for the request.
         files: Optional files to send with the request.
         post: Use the default http POST request or GET
+        retry: Optional retry policy, overrides the default of the request type.
+        client_kind: The shared client to send the request with, e.g. `UPLOAD`.
 
     Returns:
-        The response object if the request is successful, otherwise None.
+        The response object if the request is successful, otherwise an error string.
     """
 
-    loop: AbstractEventLoop = asyncio.get_event_loop()
-    session: Session = Session()
-
-    try:
-        if request == "POST":
-            future: Future = loop.run_in_executor(
-                None,
-                lambda: session.post(
-                    url,
-                    headers=headers,
-                    json=payload,
-                    files=files,
-                    timeout=10,
-                ),
-            )
-        elif request == "POST-DATA":
-            future: Future = loop.run_in_executor(
-                None,
-                lambda: session.post(
-                    url,
-                    data=payload,
-                    timeout=10,
-                ),
+    import httpx
+
+    client: AsyncClient = get_client(client_kind)
+    policy: RetryPolicy = retry or default_policy(request)
+    breaker: CircuitBreaker = get_circuit_breaker(url)
+    error: str = ""
+
+    for attempt in range(policy.max_attempts):
+        if not breaker.allow():
+            return (
+                f"Service unavailable, trying again in {math.ceil(breaker.retry_in())} seconds. "
+                f"{error}"
             )
-        elif request == "PUT":
-            future: Future = loop.run_in_executor(
-                None,
-                lambda: session.put(
-                    url,
-                    data=payload,
-                ),
+
+        retry_after: float | None = None
+        try:
+            response: Response = await _send(
+                client, url, headers, payload, files, request
             )
-        # get
+        except httpx.TransportError as e:
+            # timeouts and connection errors
+            if _is_host_failure(e):
+                breaker.record_failure()
+            error = f"Error requesting from API {repr(e)}.\n{url=}\n{payload=}\n{headers=}\n{files=}\n{request=}\n"
+        except httpx.HTTPError as e:
+            return f"Error requesting from API {repr(e)}.\n{url=}\n{payload=}\n{headers=}\n{files=}\n{request=}\n"
+        except Exception as e:
+            return f"Unknown error requesting. {repr(e)}"
         else:
-            future: Future = loop.run_in_executor(
-                None,
-                lambda: session.get(
-                    url,
-                    headers=headers,
-                    timeout=10,
-                ),
-            )
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
 
-    except Exception as e:
-        return f"Error running async loop while requesting from API {repr(e)}"
-
-    try:
-        response: Response = await future
-        if response.status_code >= 100 and response.status_code < 200:
-            return f"{response.status_code}: Informational Response: {response.text}"
-        elif response.status_code >= 200 and response.status_code < 300:
-            return response
-        elif response.status_code >= 300 and response.status_code < 400:
-            return f"{response.status_code}: Redirection: {response.text}"
-        elif response.status_code == 401:
-            return f"Token expired. Please log in again."
-        elif response.status_code >= 400 and response.status_code < 500:
-            return f"{response.status_code}: Client Error: {response.text}"
-        elif response.status_code >= 500 and response.status_code < 600:
-            return f"{response.status_code}: Server Error: {response.text}"
-        else:
-            response.raise_for_status()
-    except (HTTPError, ConnectionError, Timeout, RequestException) as e:
-        return f"Error requesting from API {repr(e)}.\n{url=}\n{payload=}\n{headers=}\n{files=}\n{request=}\n"
-    except Exception as e:
-        return f"Unknown error requesting. {repr(e)}"
+            if response.status_code not in policy.retry_statuses:
+                return _response_or_error(response)
+
+            error = _response_or_error(response)
+            if response.status_code in (429, 503):
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+        if attempt + 1 >= policy.max_attempts:
+            break
+
+        delay: float = policy.delay(attempt, retry_after)
+        rendergate_logger.warning(
+            f"{request} request failed, retrying in {delay:.1f} seconds "
+            f"({attempt + 1}/{policy.max_attempts - 1}): {error.splitlines()[0]}"
+        )
+        await asyncio.sleep(delay)
+
+    return error
+
+
+async def download_file(
+    url: str,
+    file_path: str,
+    progress_callback: Callable[[int, int], None] | None = None,
+) -> None:
+    """
+    Stream a file to disk with the shared client.
+    Raises on errors.
+
+    Args:
+        url: The URL of the file.
+        file_path: Where to save the file.
+        progress_callback: Called with (downloaded_bytes, total_bytes) after each chunk,
+            should be cheap, e.g. `ProgressChannel.update`.
+    """
+
+    client: AsyncClient = get_client()
+
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        total: int = int(response.headers.get("Content-Length", 0))
+        downloaded: int = 0
+        with open(file_path, "wb") as f:
+            async for chunk in response.aiter_bytes(chunk_size=1024 * 1024):
+                f.write(chunk)
+                downloaded += len(chunk)
+                if progress_callback is not None and total:
+                    progress_callback(downloaded, total)
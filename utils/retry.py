@@ -0,0 +1,140 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Retry policies and circuit breakers for the requests of the rest client.
+"""
+
+
+import time
+import random
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How often and how long to wait before a failed request is retried.
+
+    Waits with capped exponential backoff and full jitter,
+    or as long as the server asks for with a Retry-After header.
+    """
+
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+    # never wait longer than this, even if the server asks for it
+    max_retry_after: float = 60.0
+    retry_statuses: frozenset[int] = frozenset({408, 429, 500, 502, 503, 504})
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Seconds to wait before the next attempt, `attempt` starts at 0."""
+
+        if retry_after is not None:
+            return min(max(0.0, retry_after), self.max_retry_after)
+
+        backoff: float = min(self.max_delay, self.base_delay * 2**attempt)
+        return random.uniform(0.0, backoff)
+
+
+# requests that are not safe to send twice, e.g. paying for a render
+NO_RETRY: RetryPolicy = RetryPolicy(max_attempts=1)
+# requests that can be repeated without side effects, e.g. GET or uploading a part
+IDEMPOTENT_RETRY: RetryPolicy = RetryPolicy()
+
+
+def default_policy(request: str) -> RetryPolicy:
+    """Retry policy for a request type of the rest client."""
+
+    if request in ("GET", "PUT"):
+        return IDEMPOTENT_RETRY
+    return NO_RETRY
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header, which is either seconds or an HTTP date."""
+
+    if not value:
+        return None
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    try:
+        retry_at: datetime = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
+    """
+    Fails fast when a service is down.
+
+    After `failure_threshold` failures in a row, the circuit opens
+    and requests are refused for `reset_timeout` seconds.
+    Then one trial request is let through,
+    which closes the circuit again if it succeeds.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.failures: int = 0
+        self.opened_at: float | None = None
+        self._trial_started: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def retry_in(self) -> float:
+        """Seconds until the next trial request is allowed."""
+
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """If a request may be sent."""
+
+        if self.opened_at is None:
+            return True
+        if self.retry_in() > 0.0:
+            return False
+        # half-open, let a single trial request through,
+        # or another one if the trial never finished (e.g. got cancelled)
+        now: float = time.monotonic()
+        if self._trial_started is None or now - self._trial_started > self.reset_timeout:
+            self._trial_started = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_started is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._trial_started = None
@@ -0,0 +1,132 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+
+"""
+Running tasks of the addon by the resource they work on,
+e.g. the upload of a blend-file, the download of a job or the job list.
+
+Tasks on different resources run at the same time,
+only a second task on the same resource is rejected.
+"""
+
+
+import os
+import time
+import threading
+from dataclasses import dataclass, field
+
+# kinds of resources
+UPLOAD: str = "upload"
+DOWNLOAD: str = "download"
+RENDER: str = "render"
+# the job list, there is only one
+JOBS: str = "jobs"
+# logging in, there is only one session
+LOGIN: str = "login"
+
+
+@dataclass(eq=False)
+class Task:
+    """An operation on a resource, with its progress to show in the panels."""
+
+    resource: str
+    label: str
+    # the job the task works on, if any
+    job_id: str | None = None
+    progress: float = 0.0
+    progress_text: str = ""
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def kind(self) -> str:
+        """The kind of resource, e.g. `UPLOAD`."""
+
+        return self.resource.partition(":")[0]
+
+
+# running tasks by resource
+_tasks: dict[str, Task] = {}
+# tasks get started and finished from the main thread and the async loop thread
+_lock: threading.Lock = threading.Lock()
+
+
+def upload_resource(file_path: str) -> str:
+    """Resource of the upload of a blend-file."""
+
+    return f"{UPLOAD}:{os.path.normcase(os.path.abspath(file_path))}"
+
+
+def download_resource(job_id: str) -> str:
+    """Resource of the download of the results of a job."""
+
+    return f"{DOWNLOAD}:{job_id}"
+
+
+def render_resource(job_id: str) -> str:
+    """Resource of starting the render of a job."""
+
+    return f"{RENDER}:{job_id}"
+
+
+def start_task(task: Task) -> bool:
+    """
+    Register a task as running.
+    Returns False if another task is already running on the same resource.
+    """
+
+    with _lock:
+        if task.resource in _tasks:
+            return False
+        _tasks[task.resource] = task
+
+    return True
+
+
+def finish_task(task: Task) -> None:
+    """Remove a task, if it is still the running task of its resource."""
+
+    with _lock:
+        if _tasks.get(task.resource) is task:
+            del _tasks[task.resource]
+
+
+def get_task(resource: str) -> Task | None:
+    """The task running on the resource."""
+
+    return _tasks.get(resource)
+
+
+def is_running(resource: str) -> bool:
+    """If a task is running on the resource."""
+
+    return resource in _tasks
+
+
+def get_tasks(kind: str | None = None) -> list[Task]:
+    """All running tasks, or the tasks of a kind of resource, oldest first."""
+
+    with _lock:
+        running: list[Task] = list(_tasks.values())
+
+    if kind is None:
+        return running
+    return [task for task in running if task.kind == kind]
+
+
+def clear_tasks() -> None:
+    """Forget all tasks, e.g. when the async loop got stopped."""
+
+    with _lock:
+        _tasks.clear()
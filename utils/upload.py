@@ -0,0 +1,462 @@
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTIBILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Multipart upload of the blend-file to the presigned S3 upload URLs.
+"""
+
+
+import os
+import json
+import math
+import time
+import asyncio
+import hashlib
+import traceback
+from asyncio import Semaphore, Task
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlsplit
+from dataclasses import dataclass, asdict
+from typing import Callable, TYPE_CHECKING
+from . import rest_client
+from .retry import IDEMPOTENT_RETRY
+from .utils import get_user_data_dir
+from .global_vars import rendergate_logger
+
+# only for type hints, httpx is imported on first use
+if TYPE_CHECKING:
+    from httpx import Response
+
+MB: int = 2**20
+MIN_PART_SIZE: int = 10 * MB  # actual min of S3: 5MB
+DEFAULT_UPLOAD_CONCURRENCY: int = 4
+# every part in flight needs a connection of the upload client
+MAX_UPLOAD_CONCURRENCY: int = rest_client.POOL_MAX_CONNECTIONS[rest_client.UPLOAD]
+CHUNK_SIZE: int = 64 * 2**10  # bytes read from disk at once while streaming a part
+# don't resume with upload URLs that expire within this many seconds
+URL_EXPIRY_MARGIN: float = 300.0
+# start of the error of an upload whose URLs expired or got rejected,
+# it can't be resumed
+URLS_EXPIRED: str = "The upload links expired."
+
+
+class UploadError(Exception):
+    """A part of a multipart upload could not be uploaded."""
+
+
+class FileSlice:
+    """
+    Readable file-like view of a byte range of a file.
+
+    Used as async request body, so a part is streamed from disk in chunks
+    of at most `chunk_size` bytes, instead of being read into memory at once.
+    Memory usage therefore doesn't depend on the size of the part or file.
+
+    The optional `progress_callback` gets the number of bytes read
+    every time a chunk is read, and the negative number of bytes
+    that have to be sent again when the slice is rewound for a retry.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        offset: int,
+        length: int,
+        chunk_size: int = CHUNK_SIZE,
+        progress_callback: Callable[[int], None] | None = None,
+    ):
+        self.file_path: str = file_path
+        self.offset: int = offset
+        self.length: int = length
+        self.chunk_size: int = chunk_size
+        self.progress_callback: Callable[[int], None] | None = progress_callback
+        self._position: int = 0
+        self._file = None
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __repr__(self) -> str:
+        return f"FileSlice({self.file_path!r}, offset={self.offset}, length={self.length})"
+
+    async def __aiter__(self):
+        while True:
+            chunk: bytes = await self.aread(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def read(self, size: int = -1) -> bytes:
+        """Read at most `size` bytes of the slice, all remaining bytes if negative."""
+
+        remaining: int = self.length - self._position
+        if remaining <= 0:
+            self.close()
+            return b""
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+
+        if self._file is None:
+            self._file = open(self.file_path, "rb")
+        self._file.seek(self.offset + self._position)
+        chunk: bytes = self._file.read(size)
+        self._position += len(chunk)
+
+        if chunk and self.progress_callback is not None:
+            self.progress_callback(len(chunk))
+
+        return chunk
+
+    async def aread(self, size: int = -1) -> bytes:
+        """Read at most `size` bytes, used by httpx to stream the request body."""
+
+        return self.read(min(size, self.chunk_size) if size > 0 else self.chunk_size)
+
+    def tell(self) -> int:
+        """Position relative to the start of the slice."""
+
+        return self._position
+
+    def seek(self, position: int, whence: int = os.SEEK_SET) -> int:
+        """Move the position relative to the start of the slice."""
+
+        if whence == os.SEEK_CUR:
+            position += self._position
+        elif whence == os.SEEK_END:
+            position += self.length
+        position = min(max(0, position), self.length)
+
+        if position != self._position and self.progress_callback is not None:
+            self.progress_callback(position - self._position)
+        self._position = position
+
+        return self._position
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+@dataclass
+class UploadManifest:
+    """
+    State of a multipart upload, persisted on disk,
+    so an interrupted upload can be resumed without uploading finished parts again.
+    """
+
+    job_id: str
+    upload_id: str
+    file_path: str
+    file_size: int
+    file_mtime: float
+    upload_urls: list[str]
+    complete_url: str
+    parts: list[tuple[int, int]]
+    entity_tags: list[str | None]
+    # UTC timestamp when the first of the presigned URLs expires, None if unknown
+    urls_expire_at: float | None = None
+
+    @classmethod
+    def create(
+        cls,
+        job_id: str,
+        upload_id: str,
+        file_path: str,
+        upload_urls: list[str],
+        complete_url: str,
+    ) -> "UploadManifest":
+        """Create the manifest of a new upload of a file."""
+
+        file_size: int = os.path.getsize(file_path)
+        parts: list[tuple[int, int]] = compute_parts(file_size, len(upload_urls))
+        expiries: list[float] = [
+            expiry
+            for expiry in map(url_expiry, [*upload_urls, complete_url])
+            if expiry is not None
+        ]
+
+        return cls(
+            job_id=job_id,
+            upload_id=upload_id,
+            file_path=file_path,
+            file_size=file_size,
+            file_mtime=os.path.getmtime(file_path),
+            upload_urls=upload_urls,
+            complete_url=complete_url,
+            parts=parts,
+            entity_tags=[None for _ in parts],
+            urls_expire_at=min(expiries, default=None),
+        )
+
+    @property
+    def missing_parts(self) -> list[int]:
+        """Indices of the parts that are not uploaded yet."""
+
+        return [i for i, tag in enumerate(self.entity_tags) if tag is None]
+
+    @property
+    def uploaded_bytes(self) -> int:
+        """Size of the parts that are already uploaded."""
+
+        return sum(
+            length
+            for (_, length), tag in zip(self.parts, self.entity_tags)
+            if tag is not None
+        )
+
+    def matches_file(self) -> bool:
+        """If the file wasn't changed since the upload started."""
+
+        try:
+            return (
+                os.path.getsize(self.file_path) == self.file_size
+                and os.path.getmtime(self.file_path) == self.file_mtime
+            )
+        except OSError:
+            return False
+
+    def urls_expired(self, margin: float = URL_EXPIRY_MARGIN) -> bool:
+        """If the presigned URLs expire within the margin, so it can't be resumed."""
+
+        return (
+            self.urls_expire_at is not None
+            and self.urls_expire_at - margin <= time.time()
+        )
+
+    def save(self) -> None:
+        """Write the manifest to disk."""
+
+        manifest_path: str = _manifest_path(self.file_path)
+        temp_path: str = f"{manifest_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f)
+        # replace atomically, so a crash never leaves a half written manifest
+        os.replace(temp_path, manifest_path)
+        _manifests[self.file_path] = self
+
+    def delete(self) -> None:
+        """Remove the manifest after the upload is completed or can't be resumed."""
+
+        _manifests[self.file_path] = None
+        try:
+            os.remove(_manifest_path(self.file_path))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            rendergate_logger.error(traceback.format_exc())
+
+
+# cache of loaded manifests by file path, None if there is no manifest
+_manifests: dict[str, UploadManifest | None] = {}
+
+
+def _manifest_path(file_path: str) -> str:
+    """The path of the manifest file of an upload of the file."""
+
+    key: str = hashlib.sha1(os.path.normcase(file_path).encode("utf-8")).hexdigest()
+    return os.path.join(get_user_data_dir("uploads"), f"{key}.json")
+
+
+def find_manifest(file_path: str) -> UploadManifest | None:
+    """Get the manifest of an unfinished upload of the file, if there is one."""
+
+    if not file_path:
+        return None
+    if file_path in _manifests:
+        return _manifests[file_path]
+
+    manifest: UploadManifest | None = None
+    try:
+        with open(_manifest_path(file_path), "r", encoding="utf-8") as f:
+            manifest_data: dict = json.load(f)
+        manifest_data["parts"] = [tuple(part) for part in manifest_data["parts"]]
+        manifest = UploadManifest(**manifest_data)
+    except FileNotFoundError:
+        pass
+    except Exception:
+        rendergate_logger.error(traceback.format_exc())
+
+    _manifests[file_path] = manifest
+    return manifest
+
+
+def url_expiry(url: str | None) -> float | None:
+    """
+    When a presigned S3 URL expires.
+
+    Returns:
+        The UTC timestamp, None if the URL doesn't say.
+    """
+
+    query: dict[str, list[str]] = parse_qs(urlsplit(url or "").query)
+    try:
+        # signature version 4
+        if "X-Amz-Date" in query:
+            signed: datetime = datetime.strptime(
+                query["X-Amz-Date"][0], "%Y%m%dT%H%M%SZ"
+            ).replace(tzinfo=timezone.utc)
+            return signed.timestamp() + int(query["X-Amz-Expires"][0])
+        # signature version 2
+        if "Expires" in query:
+            return float(query["Expires"][0])
+    except (KeyError, ValueError):
+        rendergate_logger.warning(f"Could not read the expiry of {url}")
+
+    return None
+
+
+def compute_parts(file_size: int, url_count: int) -> list[tuple[int, int]]:
+    """
+    Split the file into parts for the multipart upload.
+
+    Returns:
+        A list of (offset, length) tuples, one for each part.
+    """
+
+    if url_count < 1:
+        return []
+
+    part_count: int = url_count
+    part_size: int = math.ceil(file_size / part_count)
+    if part_size < MIN_PART_SIZE:
+        part_count = max(1, math.ceil(file_size / MIN_PART_SIZE))
+        part_size = MIN_PART_SIZE
+
+    parts: list[tuple[int, int]] = []
+    for i in range(part_count):
+        offset: int = i * part_size
+        length: int = max(0, min(part_size, file_size - offset))
+        parts.append((offset, length))
+
+    return parts
+
+
+def complete_multipart_body(entity_tags: list[str]) -> str:
+    """Create the XML body for the CompleteMultipartUpload request."""
+
+    complete_body: str = (
+        '<CompleteMultipartUpload xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+    )
+    for i, entity_tag in enumerate(entity_tags):
+        complete_body += f"<Part><PartNumber>{i + 1}</PartNumber><ETag>{entity_tag}</ETag></Part>"
+    complete_body += "</CompleteMultipartUpload>"
+
+    return complete_body
+
+
+async def upload_parts(
+    file_path: str,
+    upload_urls: list[str],
+    parts: list[tuple[int, int]],
+    concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+    progress_callback: Callable[[int, int], None] | None = None,
+    entity_tags: list[str | None] | None = None,
+    part_callback: Callable[[int, str], None] | None = None,
+) -> list[str] | str:
+    """
+    Upload the parts of a file to their presigned URLs,
+    with at most `concurrency` parts in flight at the same time.
+
+    Args:
+        file_path: The path of the file to upload.
+        upload_urls: The presigned URL for each part.
+        parts: The (offset, length) of each part, see `compute_parts`.
+        concurrency: How many parts are uploaded at the same time.
+        progress_callback: Called with (uploaded_bytes, total_bytes)
+            every time a chunk of a part is sent, should be cheap,
+            e.g. `ProgressChannel.update`. Goes back if a part gets retried.
+        entity_tags: ETags of parts that are already uploaded, None for missing parts.
+            Only the missing parts get uploaded. The list is filled in place.
+        part_callback: Called with (index, etag) every time a part is finished.
+
+    Failed parts are retried by the rest client.
+    Each ETag is stored at the index of its part, so a retried part
+    always ends up with the ETag of its last successful attempt.
+
+    Returns:
+        The ETags in part order if all parts were uploaded, otherwise an error string.
+        It starts with `URLS_EXPIRED` if the upload URLs can't be used anymore.
+    """
+
+    if len(upload_urls) < len(parts):
+        return f"Not enough upload URLs ({len(upload_urls)}) for {len(parts)} parts."
+
+    if entity_tags is None:
+        entity_tags = [None for _ in parts]
+
+    semaphore: Semaphore = Semaphore(min(max(1, concurrency), MAX_UPLOAD_CONCURRENCY))
+    total: int = sum(length for _, length in parts)
+    uploaded: int = sum(
+        length for (_, length), tag in zip(parts, entity_tags) if tag is not None
+    )
+
+    def part_progress(sent: int) -> None:
+        nonlocal uploaded
+
+        uploaded += sent
+        if progress_callback is not None:
+            progress_callback(uploaded, total)
+
+    async def upload_part(index: int) -> None:
+        offset, length = parts[index]
+        async with semaphore:
+            with FileSlice(
+                file_path, offset, length, progress_callback=part_progress
+            ) as segment:
+                # transient errors are retried, the body gets rewound every attempt
+                part_response: Response | str = await rest_client.request(
+                    url=upload_urls[index],
+                    payload=segment,
+                    request="PUT",
+                    retry=IDEMPOTENT_RETRY,
+                    client_kind=rest_client.UPLOAD,
+                )
+
+        # error occured, raise so the other parts get cancelled
+        if isinstance(part_response, str):
+            # S3 rejects a presigned URL after it expired
+            if part_response.startswith("403"):
+                raise UploadError(f"{URLS_EXPIRED} Part {index + 1}: {part_response}")
+            raise UploadError(f"Part {index + 1}: {part_response}")
+
+        entity_tags[index] = part_response.headers["ETag"]
+        rendergate_logger.info(f"Part: {index} - {length} bytes")
+
+        if part_callback is not None:
+            part_callback(index, entity_tags[index])
+
+    tasks: list[Task] = [
+        asyncio.ensure_future(upload_part(i))
+        for i, tag in enumerate(entity_tags)
+        if tag is None
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except UploadError as e:
+        return str(e)
+    except Exception as e:
+        return f"Error uploading blend-file {repr(e)}"
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    return entity_tags
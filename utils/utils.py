@@ -20,8 +20,11 @@ from typing import Any, Callable
 from functools import wraps
 from bpy.types import Context
 from .global_vars import rendergate_logger
+from .async_loop import run_in_main_thread
 
 classes_to_register: list = []
+# directory for persistent addon data, resolved in the main thread
+_user_dir: str | None = None
 
 
 def class_to_register(cls):
@@ -56,9 +59,13 @@ def catch_exception(callback: Callable):
                         context = arg
                     if isinstance(arg, dict):
                         context_pointers = arg
-                # call callback function with self (func) and context
+                # call callback function with self (the operator) and context,
+                # in the main thread, because it touches bpy
+                operator: Any = args[0] if args else None
                 if callable(callback) and context:
-                    callback(func, context, context_pointers)
+                    await run_in_main_thread(
+                        callback, operator, context, context_pointers
+                    )
 
         return wrapper
 
@@ -105,29 +112,129 @@ def path_leaf(path: str) -> str:
     return tail or os.path.basename(head)
 
 
+def init_user_dir() -> None:
+    """
+    Resolve the directory for persistent addon data, e.g. when registering.
+    Must be called in the main thread, since it asks bpy for the directory.
+    """
+
+    global _user_dir
+
+    addon_package: str = __package__.rpartition(".")[0]
+    try:
+        _user_dir = bpy.utils.extension_path_user(addon_package, create=True)
+    except ValueError:
+        # installed as legacy addon, not as extension
+        _user_dir = bpy.utils.user_resource(
+            "CONFIG", path=addon_package.split(".")[-1], create=True
+        )
+
+
+def get_user_data_dir(*path: str) -> str:
+    """
+    Get a directory for persistent addon data, that is stored outside of the blend-file.
+    The directory gets created if it doesn't exist.
+    Can be called from any thread, after `init_user_dir`.
+    """
+
+    if _user_dir is None:
+        raise RuntimeError("The user data directory isn't resolved yet.")
+
+    data_dir: str = os.path.join(_user_dir, *path)
+    os.makedirs(data_dir, exist_ok=True)
+
+    return data_dir
+
+
 def is_string_blank(string: str) -> bool:
     """Returns true if the string is blank."""
 
     return not bool(string and not string.isspace())
 
 
+def redraw(context: Context = None) -> None:
+    """
+    Redraw the area of the context. Must be called in the main thread.
+    Without an area, e.g. for a background task, all properties editors get redrawn.
+    """
+
+    try:
+        area = (context or bpy.context).area
+        if area is None:
+            redraw_areas()
+        else:
+            area.tag_redraw()
+    except:
+        pass
+
+
+def redraw_areas(area_type: str = "PROPERTIES") -> None:
+    """
+    Redraw all areas of a type, e.g. after a change in the background.
+    Must be called in the main thread.
+    """
+
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == area_type:
+                area.tag_redraw()
+
+
+def _get_properties(context: Context, names: tuple[str]) -> tuple:
+    props = context.scene.rendergate_properties
+    return tuple(getattr(props, name) for name in names)
+
+
+def _set_properties(context: Context, values: dict[str, Any]) -> None:
+    props = context.scene.rendergate_properties
+    for name, value in values.items():
+        setattr(props, name, value)
+    redraw(context)
+
+
+async def get_properties(context: Context, *names: str) -> tuple:
+    """Read rendergate properties of the scene, in the main thread."""
+
+    return await run_in_main_thread(_get_properties, context, names)
+
+
+async def set_properties(context: Context, **values: Any) -> None:
+    """Set rendergate properties of the scene and redraw, in the main thread."""
+
+    await run_in_main_thread(_set_properties, context, values)
+
+
+async def report(operator: Any, report_type: set[str], message: str) -> None:
+    """Report a message of an async operator, in the main thread."""
+
+    if operator is None:
+        return
+    await run_in_main_thread(operator.report, report_type, message)
+
+
+def _set_progress(
+    obj: Any, prop_name: str, value: float, context: Context, text: str | None
+) -> None:
+    setattr(obj, prop_name, value)
+    if text is not None:
+        setattr(obj, f"{prop_name}_text", text)
+    redraw(context)
+
+
 async def progress(
     obj: Any,
     prop_name: str,
     value: float,
     context: Context = None,
     sleep: float = 0.0,
+    text: str | None = None,
 ):
-    """Set a progress property."""
-
-    setattr(obj, prop_name, value)
+    """
+    Set a progress property, in the main thread.
+    Optionally also sets its text property, named `{prop_name}_text`.
+    """
 
-    try:
-        if context:
-            context.area.tag_redraw()
-        else:
-            bpy.context.area.tag_redraw()
-    except:
-        pass
+    await run_in_main_thread(_set_progress, obj, prop_name, value, context, text)
 
-    await asyncio.sleep(sleep)
+    if sleep:
+        await asyncio.sleep(sleep)